@@ -1,6 +1,18 @@
+import os
 import re
+import csv
+import time
+import zlib
+import hashlib
+from itertools import combinations
+from concurrent.futures import ThreadPoolExecutor
 from neo4j import GraphDatabase
+from query_stats import instrument
 import pandas as pd
+from neo4j_schema import ensure_schema, check_query_plans
+from csv_stream import CHUNK_SIZE, CSV_ENCODING, iter_csv_chunks
+from graph_store import GRAPH_STORE, NODE_KEYS, open_graph_store
+from columnar_dataset import load_dataset
 
 # Neo4j connection details
 uri = "bolt://localhost:7687"
@@ -8,6 +20,22 @@ user = "neo4j"
 password = "majorproject"
 csv_file = "research_csv.csv"
 
+# Number of CSV rows written per transaction by the batched importer
+BATCH_SIZE = 1000
+
+# Worker threads (each with its own session) used by the parallel importer
+WORKERS = 4
+# Seconds a transaction keeps being retried after transient errors such as deadlocks
+MAX_RETRY_TIME = 60
+
+# Incremental mode: fingerprints of rows already in Neo4j are kept in this
+# file and those rows are skipped on the next import. None re-imports everything.
+LEDGER_FILE = None
+
+# Canonical author names written by author_resolution.py (e.g. "author_name_map.csv").
+# None imports author names as cleaned by clean_author.
+AUTHOR_MAP_FILE = None
+
 def clean_author(author):
     author = author.strip()
     author = re.sub(r'\s+', ' ', author)
@@ -15,13 +43,28 @@ def clean_author(author):
     author = author.title()
     return author
 
-def import_csv_to_neo4j(uri, user, password, csv_file):
-    # Read CSV, handle missing Document Type and Year columns
+def load_author_map(path):
+    """{name: canonical name} from an author_resolution.py mapping file"""
+    if not os.path.exists(path):
+        print(f"⚠ Author name map {path} not found, importing names as cleaned")
+        return {}
+    with open(path, encoding='utf-8', newline='') as f:
+        return {row['name']: row['canonical'] for row in csv.DictReader(f)}
+
+AUTHOR_MAP = load_author_map(AUTHOR_MAP_FILE) if AUTHOR_MAP_FILE else {}
+
+def canonical_author(author):
+    return AUTHOR_MAP.get(author, author)
+
+def read_papers(csv_file):
+    # Read CSV as text like iter_csv_chunks (an inferred float Year prints as '2020.0'),
+    # handle missing Document Type and Year columns
     try:
-        df = pd.read_csv(csv_file, encoding='ISO-8859-1', usecols=['Authors', 'Title', 'Source title', 'Document Type', 'Year'])
+        df = pd.read_csv(csv_file, encoding=CSV_ENCODING, dtype=str,
+                         usecols=['Authors', 'Title', 'Source title', 'Document Type', 'Year'])
     except Exception as e:
         print('Error reading with usecols:', e)
-        df = pd.read_csv(csv_file, encoding='ISO-8859-1')
+        df = pd.read_csv(csv_file, encoding=CSV_ENCODING, dtype=str)
         # Add Document Type column if it doesn't exist
         if 'Document Type' not in df.columns:
             df['Document Type'] = 'Unknown'
@@ -29,6 +72,17 @@ def import_csv_to_neo4j(uri, user, password, csv_file):
         if 'Year' not in df.columns:
             df['Year'] = 'Unknown'
     print('DataFrame columns:', df.columns)
+    return df
+
+PAPER_COLUMNS = ['Authors', 'Title', 'Source title', 'Document Type', 'Year']
+
+def iter_paper_chunks(csv_file, chunk_size=CHUNK_SIZE):
+    """Streaming counterpart of read_papers: yields DataFrames of chunk_size rows"""
+    return iter_csv_chunks(csv_file, chunk_size, columns=PAPER_COLUMNS,
+                           defaults={'Document Type': 'Unknown', 'Year': 'Unknown'})
+
+def import_csv_to_neo4j(uri, user, password, csv_file):
+    df = read_papers(csv_file)
 
     # Use exact column names from DataFrame
     author_col = 'Authors'
@@ -44,8 +98,9 @@ def import_csv_to_neo4j(uri, user, password, csv_file):
     authors = [a.strip() for a in authors_field.split(",") if a.strip()]
     print(authors)
 
-    driver = GraphDatabase.driver(uri, auth=(user, password))
+    driver = instrument(GraphDatabase.driver(uri, auth=(user, password)))
     with driver.session() as session:
+        prepare_schema(session)
         for index, row in df.iterrows():
             authors_field = str(row[author_col])
             if authors_field.startswith('"') and authors_field.endswith('"'):
@@ -91,7 +146,7 @@ def import_csv_to_neo4j(uri, user, password, csv_file):
 
             # Create Author nodes and link to Paper
             for author in authors:
-                author = clean_author(author.replace("'", "\\'"))
+                author = canonical_author(clean_author(author)).replace("'", "\\'")
                 if author:
                     session.run(f"MERGE (a:Author {{name: '{author}'}})")
                     session.run(f"""
@@ -102,5 +157,423 @@ def import_csv_to_neo4j(uri, user, password, csv_file):
 
     driver.close()
 
+# UNWIND statements used by the batched importer. Nodes are written before
+# relationships so every MATCH below finds the nodes of its own batch.
+NODE_QUERIES = [
+    ('papers', "UNWIND $rows AS row MERGE (p:Paper {title: row.title, year: row.year})"),
+    ('journals', "UNWIND $rows AS row MERGE (j:Journal {name: row.name})"),
+    ('doc_types', "UNWIND $rows AS row MERGE (d:DocumentType {type: row.type})"),
+    ('years', "UNWIND $rows AS row MERGE (y:Year {value: row.value})"),
+    ('authors', "UNWIND $rows AS row MERGE (a:Author {name: row.name})"),
+]
+
+RELATIONSHIP_QUERIES = [
+    ('paper_years', """
+        UNWIND $rows AS row
+        MATCH (p:Paper {title: row.title, year: row.paper_year})
+        MATCH (y:Year {value: row.year})
+        MERGE (p)-[:PUBLISHED_IN_YEAR]->(y)
+    """),
+    ('paper_journals', """
+        UNWIND $rows AS row
+        MATCH (p:Paper {title: row.title, year: row.paper_year})
+        MATCH (j:Journal {name: row.journal})
+        MERGE (p)-[:PUBLISHED_IN]->(j)
+    """),
+    ('paper_types', """
+        UNWIND $rows AS row
+        MATCH (p:Paper {title: row.title, year: row.paper_year})
+        MATCH (d:DocumentType {type: row.type})
+        MERGE (p)-[:HAS_TYPE]->(d)
+    """),
+    ('wrote', """
+        UNWIND $rows AS row
+        MATCH (a:Author {name: row.author})
+        MATCH (p:Paper {title: row.title, year: row.paper_year})
+        MERGE (a)-[:WROTE]->(p)
+    """),
+]
+
+# Parameter names of the rows sent with each statement above
+BATCH_FIELDS = {
+    'papers': ('title', 'year'),
+    'journals': ('name',),
+    'doc_types': ('type',),
+    'years': ('value',),
+    'authors': ('name',),
+    'paper_years': ('title', 'paper_year', 'year'),
+    'paper_journals': ('title', 'paper_year', 'journal'),
+    'paper_types': ('title', 'paper_year', 'type'),
+    'wrote': ('author', 'title', 'paper_year'),
+}
+
+def parse_row(authors_field, title, journal, doc_type, year):
+    """
+    Normalize one CSV row exactly like the per-row importer does,
+    returning (authors, title, journal, doc_type, year)
+    """
+    authors = apply_author_map(parse_authors(authors_field))
+    return authors, str(title), str(journal), str(doc_type), str(year)
+
+def apply_author_map(authors):
+    """Canonical names of one paper's cleaned authors"""
+    if not AUTHOR_MAP:
+        return authors
+    # Variants of one author on the same paper collapse into one name
+    return list(dict.fromkeys(canonical_author(a) for a in authors))
+
+def parse_authors(authors_field):
+    """Cleaned author names of one Authors field, before canonical names are applied"""
+    authors_field = str(authors_field)
+    if authors_field.startswith('"') and authors_field.endswith('"'):
+        authors_field = authors_field[1:-1]
+    authors = [clean_author(a) for a in authors_field.split(",")]
+    return [a for a in authors if a]
+
+def year_number(year):
+    """Year string as an int, or None for missing/unknown years"""
+    try:
+        return int(float(year))
+    except (ValueError, OverflowError):
+        return None
+
+def aggregate_coauthorships(papers):
+    """
+    Weighted COAUTHORED pairs from an iterable of (authors, year) per paper.
+    Returns {(author1, author2): [shared papers, first year, last year]} with
+    author1 < author2.
+    """
+    coauthorships = {}
+    for authors, year in papers:
+        year = year_number(year)
+        for pair in combinations(sorted(set(authors)), 2):
+            stats = coauthorships.get(pair)
+            if stats is None:
+                coauthorships[pair] = [1, year, year]
+                continue
+            stats[0] += 1
+            if year is not None:
+                stats[1] = year if stats[1] is None else min(stats[1], year)
+                stats[2] = year if stats[2] is None else max(stats[2], year)
+    return coauthorships
+
+def iter_rows(df):
+    columns = [df[column] for column in PAPER_COLUMNS]
+    for values in zip(*columns):
+        yield parse_row(*values)
+
+def iter_csv_rows(csv_file, chunk_size=CHUNK_SIZE):
+    """
+    Parsed rows of the whole file, from the prepared dataset (prepare_dataset.py)
+    when it is up to date. Otherwise the CSV is parsed: with a chunk_size only
+    that many rows are held in memory at once; None loads it in one DataFrame.
+    """
+    dataset = load_dataset(csv_file)
+    if dataset is not None:
+        for authors, title, journal, doc_type, year in dataset.iter_rows():
+            yield apply_author_map(authors), title, journal, doc_type, year
+        return
+    if chunk_size is None:
+        yield from iter_rows(read_papers(csv_file))
+        return
+    for chunk in iter_paper_chunks(csv_file, chunk_size):
+        yield from iter_rows(chunk)
+
+def row_fingerprint(authors, title, journal, doc_type, year):
+    """SHA-1 of the normalized authors, title, source title and year of a row"""
+    key = '\x1f'.join(['\x1e'.join(authors), title, journal, year])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+class ImportLedger:
+    """
+    Fingerprints of the rows already written to Neo4j, stored one per line
+    in a local file so that later imports only send new or changed rows.
+    A changed row is imported as a new one; nothing is deleted from the graph.
+    Rows skipped because an earlier import recorded them and repeats of a
+    row within this import are counted separately.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.recorded = set()
+        self.seen = set()
+        self.pending = []
+        self.skipped = 0
+        self.duplicates = 0
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.recorded = {line.strip() for line in f if line.strip()}
+
+    def is_new(self, row):
+        fingerprint = row_fingerprint(*row)
+        if fingerprint in self.recorded:
+            self.skipped += 1
+            return False
+        if fingerprint in self.seen:
+            self.duplicates += 1
+            return False
+        self.seen.add(fingerprint)
+        self.pending.append(fingerprint)
+        return True
+
+    def take_pending(self):
+        """Fingerprints of the rows in the batch iter_batches just yielded"""
+        pending, self.pending = self.pending, []
+        return pending
+
+    def record(self, fingerprints):
+        if fingerprints:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(''.join(fingerprint + '\n' for fingerprint in fingerprints))
+
+    def commit(self):
+        """Record the rows of the batch that was just written"""
+        self.record(self.take_pending())
+
+def iter_batches(rows, batch_size=BATCH_SIZE, ledger=None):
+    """
+    Group parsed rows into batches of deduplicated node and relationship rows.
+
+    The per-row importer creates one Paper per (title, year) but links
+    relationships through MATCH (p:Paper {title: ...}), i.e. to every Paper
+    with that title created so far. seen_years replays that so the batched
+    graph is identical, while each statement matches on (title, year).
+    Rows already in the ledger only update seen_years.
+    """
+    seen_years = {}
+    batch = {name: {} for name in BATCH_FIELDS}
+    batch_rows = 0
+    for row in rows:
+        authors, title, journal, doc_type, year = row
+        paper_years = seen_years.setdefault(title, [])
+        if year not in paper_years:
+            paper_years.append(year)
+        if ledger is not None and not ledger.is_new(row):
+            continue
+
+        batch['papers'][(title, year)] = None
+        batch['journals'][(journal,)] = None
+        batch['doc_types'][(doc_type,)] = None
+        batch['years'][(year,)] = None
+        for paper_year in paper_years:
+            batch['paper_years'][(title, paper_year, year)] = None
+            batch['paper_journals'][(title, paper_year, journal)] = None
+            batch['paper_types'][(title, paper_year, doc_type)] = None
+        for author in authors:
+            batch['authors'][(author,)] = None
+            for paper_year in paper_years:
+                batch['wrote'][(author, title, paper_year)] = None
+
+        batch_rows += 1
+        if batch_rows >= batch_size:
+            yield batch_rows, _batch_parameters(batch)
+            batch = {name: {} for name in BATCH_FIELDS}
+            batch_rows = 0
+    if batch_rows:
+        yield batch_rows, _batch_parameters(batch)
+
+def _batch_parameters(batch):
+    return {
+        name: [dict(zip(BATCH_FIELDS[name], key)) for key in keys]
+        for name, keys in batch.items()
+    }
+
+def prepare_schema(session):
+    """Create constraints/indexes and check the importer queries use them"""
+    ensure_schema(session)
+    queries = [(query, {'rows': []}) for _, query in NODE_QUERIES + RELATIONSHIP_QUERIES]
+    # Lookup shape used by the per-row importer
+    queries.append(("MATCH (p:Paper {title: $title}) RETURN p", {'title': ''}))
+    check_query_plans(session, queries)
+
+def write_queries(tx, queries, batch):
+    for name, query in queries:
+        if batch.get(name):
+            tx.run(query, rows=batch[name]).consume()
+
+def write_batch(tx, batch):
+    write_queries(tx, NODE_QUERIES + RELATIONSHIP_QUERIES, batch)
+
+# Label of each batch node list, and (type, start label, start fields, end
+# label, end fields) of each relationship list, for graph_store backends
+BATCH_NODES = {
+    'papers': 'Paper',
+    'journals': 'Journal',
+    'doc_types': 'DocumentType',
+    'years': 'Year',
+    'authors': 'Author',
+}
+BATCH_RELATIONSHIPS = {
+    'paper_years': ('PUBLISHED_IN_YEAR', 'Paper', ('title', 'paper_year'), 'Year', ('year',)),
+    'paper_journals': ('PUBLISHED_IN', 'Paper', ('title', 'paper_year'), 'Journal', ('journal',)),
+    'paper_types': ('HAS_TYPE', 'Paper', ('title', 'paper_year'), 'DocumentType', ('type',)),
+    'wrote': ('WROTE', 'Author', ('author',), 'Paper', ('title', 'paper_year')),
+}
+
+def store_operations(batch):
+    """Translate a batch into graph store upserts, nodes before relationships"""
+    operations = [('nodes', label, batch[name]) for name, label in BATCH_NODES.items()]
+    for name, (rel_type, start_label, start_fields, end_label, end_fields) in BATCH_RELATIONSHIPS.items():
+        start_keys, end_keys = NODE_KEYS[start_label], NODE_KEYS[end_label]
+        rows = [{
+            'start': {key: row[field] for key, field in zip(start_keys, start_fields)},
+            'end': {key: row[field] for key, field in zip(end_keys, end_fields)},
+            'properties': {},
+        } for row in batch[name]]
+        operations.append(('edges', rel_type, start_label, end_label, rows))
+    return operations
+
+# Fields hashed to pick a worker: node rows by their own key, relationship
+# rows by their Paper so one paper's relationships stay on one worker
+PARTITION_FIELDS = {
+    'papers': ('title', 'year'),
+    'journals': ('name',),
+    'doc_types': ('type',),
+    'years': ('value',),
+    'authors': ('name',),
+    'paper_years': ('title', 'paper_year'),
+    'paper_journals': ('title', 'paper_year'),
+    'paper_types': ('title', 'paper_year'),
+    'wrote': ('title', 'paper_year'),
+}
+
+def partition_batch(batch, names, workers):
+    """Split the named row lists into one sub-batch per worker by stable key hash"""
+    parts = [{name: [] for name in names} for _ in range(workers)]
+    for name in names:
+        fields = PARTITION_FIELDS[name]
+        for row in batch[name]:
+            key = '\x1f'.join(row[field] for field in fields)
+            parts[zlib.crc32(key.encode('utf-8')) % workers][name].append(row)
+    return [part for part in parts if any(part.values())]
+
+def run_partitions(pool, driver, queries, parts):
+    """Write each partition in its own session/transaction, retrying transient errors"""
+    attempts = []
+
+    def work(part):
+        def write(tx):
+            attempts.append(1)
+            write_queries(tx, queries, part)
+        with driver.session() as session:
+            session.execute_write(write)
+
+    for future in [pool.submit(work, part) for part in parts]:
+        future.result()
+    return len(attempts) - len(parts)
+
+def import_csv_to_neo4j_parallel(uri, user, password, csv_file, workers=WORKERS,
+                                 batch_size=BATCH_SIZE, chunk_size=CHUNK_SIZE, ledger_file=LEDGER_FILE,
+                                 driver=None):
+    """
+    Multi-threaded variant of import_csv_to_neo4j_batched. Every batch is
+    written in two phases: nodes partitioned by key hash, so no two workers
+    MERGE the same node, then relationships partitioned by paper. Deadlocks
+    in the second phase are retried by execute_write. driver is an open
+    driver with a prepared schema to use instead of connecting (closed at the end).
+    """
+    node_names = [name for name, _ in NODE_QUERIES]
+    relationship_names = [name for name, _ in RELATIONSHIP_QUERIES]
+
+    if driver is None:
+        driver = instrument(GraphDatabase.driver(uri, auth=(user, password),
+                                      max_connection_pool_size=max(100, workers),
+                                      max_transaction_retry_time=MAX_RETRY_TIME))
+        with driver.session() as session:
+            prepare_schema(session)
+
+    ledger = ImportLedger(ledger_file) if ledger_file else None
+    total_rows = 0
+    retries = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for batch_rows, batch in iter_batches(iter_csv_rows(csv_file, chunk_size), batch_size, ledger):
+            retries += run_partitions(pool, driver, NODE_QUERIES,
+                                      partition_batch(batch, node_names, workers))
+            retries += run_partitions(pool, driver, RELATIONSHIP_QUERIES,
+                                      partition_batch(batch, relationship_names, workers))
+            if ledger:
+                ledger.commit()
+            total_rows += batch_rows
+            elapsed = time.perf_counter() - start
+            print(f"  {total_rows} rows imported ({total_rows / elapsed:.0f} rows/sec, {retries} retries)")
+    driver.close()
+
+    elapsed = time.perf_counter() - start
+    rate = total_rows / elapsed if elapsed > 0 else 0
+    print(f"✓ Imported {total_rows} rows with {workers} workers in {elapsed:.1f}s "
+          f"({rate:.0f} rows/sec, {retries} transaction retries)")
+    report_skipped(ledger)
+    return total_rows
+
+def report_skipped(ledger):
+    if ledger:
+        print(f"  Skipped {ledger.skipped} rows already recorded in {ledger.path}")
+        if ledger.duplicates:
+            print(f"  Skipped {ledger.duplicates} repeated rows of this CSV")
+
+def import_csv_to_neo4j_batched(uri, user, password, csv_file, batch_size=BATCH_SIZE,
+                                chunk_size=CHUNK_SIZE, ledger_file=LEDGER_FILE):
+    """
+    Batched alternative to import_csv_to_neo4j: builds the same graph with a
+    handful of UNWIND statements per explicit write transaction.
+    The CSV is streamed in chunks of chunk_size rows (None reads it whole).
+    With a ledger_file only rows not imported before are sent.
+    """
+    driver = instrument(GraphDatabase.driver(uri, auth=(user, password)))
+    ledger = ImportLedger(ledger_file) if ledger_file else None
+    total_rows = 0
+    with driver.session() as session:
+        prepare_schema(session)
+        start = time.perf_counter()
+        for batch_rows, batch in iter_batches(iter_csv_rows(csv_file, chunk_size), batch_size, ledger):
+            session.execute_write(write_batch, batch)
+            if ledger:
+                ledger.commit()
+            total_rows += batch_rows
+            elapsed = time.perf_counter() - start
+            print(f"  {total_rows} rows imported ({total_rows / elapsed:.0f} rows/sec)")
+    driver.close()
+
+    elapsed = time.perf_counter() - start
+    rate = total_rows / elapsed if elapsed > 0 else 0
+    print(f"✓ Imported {total_rows} rows in {elapsed:.1f}s ({rate:.0f} rows/sec)")
+    report_skipped(ledger)
+    return total_rows
+
+def import_csv_to_store(store, csv_file, batch_size=BATCH_SIZE, chunk_size=CHUNK_SIZE,
+                        ledger_file=LEDGER_FILE):
+    """
+    Same import as import_csv_to_neo4j_batched into any graph_store backend
+    (e.g. the in-memory one when no database is available). The caller
+    closes the store, which saves an in-memory graph.
+    """
+    ledger = ImportLedger(ledger_file) if ledger_file else None
+    total_rows = 0
+    store.prepare()
+    start = time.perf_counter()
+    for batch_rows, batch in iter_batches(iter_csv_rows(csv_file, chunk_size), batch_size, ledger):
+        store.write(store_operations(batch))
+        if ledger:
+            ledger.commit()
+        total_rows += batch_rows
+        elapsed = time.perf_counter() - start
+        print(f"  {total_rows} rows imported ({total_rows / elapsed:.0f} rows/sec)")
+
+    elapsed = time.perf_counter() - start
+    rate = total_rows / elapsed if elapsed > 0 else 0
+    print(f"✓ Imported {total_rows} rows into the {type(store).__name__} in {elapsed:.1f}s ({rate:.0f} rows/sec)")
+    report_skipped(ledger)
+    return total_rows
+
 if __name__ == "__main__":
-    import_csv_to_neo4j(uri, user, password, csv_file)
\ No newline at end of file
+    if GRAPH_STORE != 'neo4j':
+        store = open_graph_store(uri, user, password)
+        try:
+            import_csv_to_store(store, csv_file)
+        finally:
+            store.close()
+    elif WORKERS > 1:
+        import_csv_to_neo4j_parallel(uri, user, password, csv_file)
+    else:
+        import_csv_to_neo4j_batched(uri, user, password, csv_file)
\ No newline at end of file
@@ -0,0 +1,168 @@
+import sys
+import time
+import asyncio
+from neo4j import AsyncGraphDatabase, GraphDatabase
+from query_stats import instrument, instrument_async
+from KG_v2_neo4j import (uri, user, password, csv_file, BATCH_SIZE, CHUNK_SIZE, LEDGER_FILE,
+                         NODE_QUERIES, RELATIONSHIP_QUERIES, ImportLedger, iter_batches,
+                         iter_csv_rows, prepare_schema, report_skipped,
+                         import_csv_to_neo4j_batched)
+
+# Write transactions in flight at the same time
+CONCURRENCY = 4
+# Parsed batches waiting for a writer; parsing pauses while the queue is full
+QUEUE_SIZE = 8
+
+async def write_queries_async(tx, queries, batch):
+    for name, query in queries:
+        if batch[name]:
+            result = await tx.run(query, rows=batch[name])
+            await result.consume()
+
+class NodeWatermark:
+    """
+    Sequence numbers of the batches whose nodes are committed. A batch's
+    relationships MATCH Papers created by earlier batches (same title, other
+    year), so they are written only once every batch up to it has its nodes.
+    """
+
+    def __init__(self):
+        self.committed = set()
+        self.next = 0
+        self.condition = asyncio.Condition()
+
+    async def commit(self, sequence):
+        async with self.condition:
+            self.committed.add(sequence)
+            while self.next in self.committed:
+                self.committed.remove(self.next)
+                self.next += 1
+            self.condition.notify_all()
+
+    async def wait(self, sequence):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.next > sequence)
+
+async def produce(queue, batches, ledger, writers):
+    """Parse CSV rows into numbered batches in a worker thread and queue them"""
+    loop = asyncio.get_running_loop()
+    sequence = 0
+    while True:
+        item = await loop.run_in_executor(None, next, batches, None)
+        if item is None:
+            break
+        fingerprints = ledger.take_pending() if ledger else []
+        await queue.put((sequence, *item, fingerprints))
+        sequence += 1
+    for _ in range(writers):
+        await queue.put(None)
+
+async def write(driver, queue, ledger, progress, watermark):
+    """
+    Take batches off the queue and write each in two transactions: its nodes,
+    then, once the nodes of all earlier batches are committed, its relationships.
+    Batches are queued in order, so every earlier node transaction is already
+    running and the wait cannot deadlock.
+    """
+    async with driver.session() as session:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            sequence, batch_rows, batch, fingerprints = item
+            await session.execute_write(write_queries_async, NODE_QUERIES, batch)
+            await watermark.commit(sequence)
+            await watermark.wait(sequence)
+            await session.execute_write(write_queries_async, RELATIONSHIP_QUERIES, batch)
+            if ledger:
+                ledger.record(fingerprints)
+            progress['rows'] += batch_rows
+            elapsed = time.perf_counter() - progress['start']
+            print(f"  {progress['rows']} rows imported ({progress['rows'] / elapsed:.0f} rows/sec)")
+
+async def import_async(uri, user, password, csv_file, concurrency, batch_size, chunk_size, ledger_file,
+                       driver=None):
+    """Run the producer and writers; driver is an open async driver to use instead of connecting (closed at the end)"""
+    ledger = ImportLedger(ledger_file) if ledger_file else None
+    batches = iter_batches(iter_csv_rows(csv_file, chunk_size), batch_size, ledger)
+    queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    progress = {'rows': 0, 'start': time.perf_counter()}
+    watermark = NodeWatermark()
+
+    if driver is None:
+        driver = instrument_async(AsyncGraphDatabase.driver(uri, auth=(user, password)))
+    try:
+        tasks = [asyncio.create_task(produce(queue, batches, ledger, concurrency))]
+        tasks += [asyncio.create_task(write(driver, queue, ledger, progress, watermark))
+                  for _ in range(concurrency)]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+    finally:
+        await driver.close()
+    return progress['rows'], ledger
+
+def import_csv_to_neo4j_async(uri, user, password, csv_file, concurrency=CONCURRENCY,
+                              batch_size=BATCH_SIZE, chunk_size=CHUNK_SIZE, ledger_file=LEDGER_FILE):
+    """
+    Drop-in alternative to import_csv_to_neo4j_batched built on the async
+    driver. Parsing and batch building overlap with up to `concurrency`
+    write transactions; the bounded queue applies backpressure to parsing.
+    Nodes are committed before any relationship that MATCHes them (see
+    NodeWatermark), so the graph equals the batched import's.
+    """
+    with instrument(GraphDatabase.driver(uri, auth=(user, password))) as driver:
+        with driver.session() as session:
+            prepare_schema(session)
+
+    start = time.perf_counter()
+    total_rows, ledger = asyncio.run(
+        import_async(uri, user, password, csv_file, concurrency, batch_size, chunk_size, ledger_file)
+    )
+    elapsed = time.perf_counter() - start
+    rate = total_rows / elapsed if elapsed > 0 else 0
+    print(f"✓ Imported {total_rows} rows with {concurrency} concurrent transactions "
+          f"in {elapsed:.1f}s ({rate:.0f} rows/sec)")
+    report_skipped(ledger)
+    return total_rows
+
+def clear_imported_graph(uri, user, password):
+    with instrument(GraphDatabase.driver(uri, auth=(user, password))) as driver:
+        with driver.session() as session:
+            session.run("""
+                MATCH (n) WHERE n:Author OR n:Paper OR n:Journal OR n:DocumentType OR n:Year
+                CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS
+            """).consume()
+
+def benchmark(uri, user, password, csv_file):
+    """
+    Time the synchronous batched importer against the async one on an empty
+    graph each. WARNING: deletes all Author, Paper, Journal, DocumentType and
+    Year nodes before each run.
+    """
+    results = []
+    runs = [
+        ('sync batched', lambda: import_csv_to_neo4j_batched(uri, user, password, csv_file, ledger_file=None)),
+        (f'async x{CONCURRENCY}', lambda: import_csv_to_neo4j_async(uri, user, password, csv_file, ledger_file=None)),
+    ]
+    for name, run in runs:
+        clear_imported_graph(uri, user, password)
+        start = time.perf_counter()
+        rows = run()
+        results.append((name, rows, time.perf_counter() - start))
+
+    print("\n" + "=" * 60)
+    print(f"IMPORT BENCHMARK ({csv_file})")
+    print("=" * 60)
+    baseline = results[0][2]
+    for name, rows, elapsed in results:
+        print(f"  {name:<14} {elapsed:8.2f}s  {rows / elapsed:8.0f} rows/sec  {baseline / elapsed:5.2f}x")
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["benchmark"]:
+        benchmark(uri, user, password, csv_file)
+    else:
+        import_csv_to_neo4j_async(uri, user, password, csv_file)
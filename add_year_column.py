@@ -1,27 +1,173 @@
+import os
+import re
+import csv
+import time
+import tempfile
+import unicodedata
+from shutil import copymode
 import pandas as pd
+from csv_stream import CHUNK_SIZE, CSV_ENCODING, csv_columns, iter_csv_chunks
 
-# Read both CSV files
-print("Reading research_csv.csv...")
-df1 = pd.read_csv('research_csv.csv', encoding='ISO-8859-1')
-print(f"Original columns: {df1.columns.tolist()}")
-print(f"Total rows: {len(df1)}")
-
-print("\nReading research_csv_2.csv...")
-df2 = pd.read_csv('research_csv_2.csv', encoding='ISO-8859-1')
-print(f"Columns in research_csv_2: {df2.columns.tolist()}")
-
-# Add the Year column from df2 to df1
-# Assuming the rows are in the same order
-if len(df1) <= len(df2):
-    df1['Year'] = df2['Year'][:len(df1)]
-else:
-    print("Warning: research_csv has more rows than research_csv_2!")
-    df1['Year'] = df2['Year']
-
-# Save the updated CSV
-df1.to_csv('research_csv.csv', index=False, encoding='ISO-8859-1')
-
-print("\n✓ Year column added successfully!")
-print(f"Updated columns: {df1.columns.tolist()}")
-print("\nFirst few rows with Year:")
-print(df1[['Authors', 'Title', 'Year']].head())
+# File enriched in place, and the export the columns are copied from
+TARGET_FILE = 'research_csv.csv'
+SOURCE_FILE = 'research_csv_2.csv'
+# Columns copied from SOURCE_FILE (added at the end of TARGET_FILE if missing)
+JOIN_COLUMNS = ['Year']
+# Rows are matched on these columns after normalize_key
+KEY_COLUMNS = ['Title', 'Source title']
+# 'key': hash join on KEY_COLUMNS; 'position': the old row-by-row copy (both files must be in the same order)
+JOIN_MODE = 'key'
+# Unmatched and ambiguous target rows are listed here (None: only counted)
+REPORT_FILE = 'add_year_column_report.csv'
+
+NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+def as_text(value):
+    """The text of a CSV_ENCODING value whose bytes are utf-8, otherwise the value itself"""
+    try:
+        return value.encode(CSV_ENCODING).decode('utf-8')
+    except UnicodeError:
+        return value
+
+def normalize_key(*values):
+    """Case, accents, punctuation and whitespace insensitive key of a row"""
+    parts = []
+    for value in values:
+        value = unicodedata.normalize('NFKD', '' if pd.isna(value) else as_text(str(value)))
+        value = ''.join(c for c in value if not unicodedata.combining(c)).casefold()
+        parts.append(NON_ALNUM.sub(' ', value).strip())
+    return '\x1f'.join(parts)
+
+def chunk_keys(chunk):
+    return [normalize_key(*values) for values in zip(*(chunk[c] for c in KEY_COLUMNS))]
+
+def build_index(source_file, encoding, columns, chunk_size, wanted=None):
+    """
+    {key: values of columns} for the source rows (only keys in wanted, when given).
+    A key whose rows carry different values is ambiguous and maps to None.
+    """
+    index = {}
+    for chunk in iter_csv_chunks(source_file, chunk_size, encoding, columns=KEY_COLUMNS + columns):
+        values = zip(*(chunk[c] for c in columns))
+        for key, row in zip(chunk_keys(chunk), values):
+            if wanted is not None and key not in wanted:
+                continue
+            if key not in index:
+                index[key] = row
+            elif index[key] is not None and index[key] != row:
+                index[key] = None
+    return index
+
+def add_columns_by_key(target_file=TARGET_FILE, source_file=SOURCE_FILE, columns=JOIN_COLUMNS,
+                       chunk_size=CHUNK_SIZE, report_file=REPORT_FILE):
+    """
+    Copy columns from source_file into target_file for rows with the same
+    normalized KEY_COLUMNS, in one streaming pass over the larger file.
+
+    The index is built from the smaller file: all of the source's keys when
+    it is the smaller one, otherwise only the keys the target needs (one
+    extra pass over the smaller target). The target is then streamed in
+    chunks of chunk_size rows into a temporary file that replaces it only
+    when complete. Both files are decoded as CSV_ENCODING, which writes
+    every byte back unchanged. Unmatched and ambiguous rows keep their
+    current value (empty for a new column). Returns {'matched', 'unmatched', 'ambiguous'}.
+    """
+    start = time.perf_counter()
+    target_columns = csv_columns(target_file)
+    missing = [c for c in KEY_COLUMNS if c not in target_columns]
+    if missing:
+        raise KeyError(f"Columns not found in {target_file}: {missing}")
+
+    if os.path.getsize(source_file) <= os.path.getsize(target_file):
+        index = build_index(source_file, CSV_ENCODING, columns, chunk_size)
+    else:
+        wanted = set()
+        for chunk in iter_csv_chunks(target_file, chunk_size, columns=KEY_COLUMNS):
+            wanted.update(chunk_keys(chunk))
+        index = build_index(source_file, CSV_ENCODING, columns, chunk_size, wanted)
+    print(f"✓ Indexed {len(index)} keys from {source_file}")
+
+    counts = {'matched': 0, 'unmatched': 0, 'ambiguous': 0}
+    examples = []
+    directory = os.path.dirname(os.path.abspath(target_file))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.add_columns_', suffix='.csv.tmp')
+    report = open(report_file, 'w', encoding='utf-8', newline='') if report_file else None
+    try:
+        if report:
+            report_writer = csv.writer(report)
+            report_writer.writerow(['row', 'status'] + KEY_COLUMNS)
+        with os.fdopen(fd, 'w', encoding=CSV_ENCODING, newline='') as out:
+            row = 0
+            for i, chunk in enumerate(iter_csv_chunks(target_file, chunk_size)):
+                found = []
+                for key, title_values in zip(chunk_keys(chunk), zip(*(chunk[c] for c in KEY_COLUMNS))):
+                    values = index.get(key)
+                    status = 'matched' if values else 'ambiguous' if key in index else 'unmatched'
+                    counts[status] += 1
+                    if status != 'matched':
+                        if report:
+                            report_writer.writerow([row, status, *title_values])
+                        if len(examples) < 5:
+                            examples.append((row, status, title_values[0]))
+                    found.append(values)
+                    row += 1
+                for j, column in enumerate(columns):
+                    current = chunk[column] if column in chunk.columns else pd.Series(pd.NA, index=chunk.index, dtype=object)
+                    chunk[column] = [v[j] if v else old for v, old in zip(found, current)]
+                out.write(chunk.to_csv(index=False, header=(i == 0)))
+            out.flush()
+            os.fsync(out.fileno())
+        # mkstemp creates the file as 0600; keep the target's permissions
+        copymode(target_file, temp_path)
+        os.replace(temp_path, target_file)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    finally:
+        if report:
+            report.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✓ {', '.join(columns)} added to {target_file} in {elapsed:.1f}s: {counts['matched']} rows matched, "
+          f"{counts['unmatched']} unmatched, {counts['ambiguous']} ambiguous")
+    for row, status, title in examples:
+        print(f"  ⚠ row {row} {status}: {title}")
+    if report and (counts['unmatched'] or counts['ambiguous']):
+        print(f"Unmatched and ambiguous rows listed in: {report_file}")
+    return counts
+
+def add_columns_by_position(target_file=TARGET_FILE, source_file=SOURCE_FILE):
+    """The original alignment: copies Year row by row, assuming both files are in the same order"""
+    # Read both CSV files
+    print(f"Reading {target_file}...")
+    df1 = pd.read_csv(target_file, encoding='ISO-8859-1')
+    print(f"Original columns: {df1.columns.tolist()}")
+    print(f"Total rows: {len(df1)}")
+
+    print(f"\nReading {source_file}...")
+    df2 = pd.read_csv(source_file, encoding='ISO-8859-1')
+    print(f"Columns in {source_file}: {df2.columns.tolist()}")
+
+    # Add the Year column from df2 to df1
+    # Assuming the rows are in the same order
+    if len(df1) <= len(df2):
+        df1['Year'] = df2['Year'][:len(df1)]
+    else:
+        print(f"Warning: {target_file} has more rows than {source_file}!")
+        df1['Year'] = df2['Year']
+
+    # Save the updated CSV
+    df1.to_csv(target_file, index=False, encoding='ISO-8859-1')
+
+if __name__ == "__main__":
+    if JOIN_MODE == 'position':
+        add_columns_by_position()
+    else:
+        add_columns_by_key()
+
+    print("\n✓ Year column added successfully!")
+    df1 = pd.read_csv(TARGET_FILE, encoding=CSV_ENCODING, nrows=5)
+    print(f"Updated columns: {df1.columns.tolist()}")
+    print("\nFirst few rows with Year:")
+    print(df1[['Authors', 'Title', 'Year']].head())
@@ -1,45 +1,37 @@
 import pandas as pd
 import networkx as nx
 import matplotlib.pyplot as plt
-from collections import defaultdict
 import json
+from csv_stream import CHUNK_SIZE, csv_columns, publication_year_counts
+from columnar_dataset import load_dataset
 
-# Read the CSV file
+# Use the prepared dataset (prepare_dataset.py) if up to date, else read the CSV in chunks of CHUNK_SIZE rows
 csv_file = "research_csv.csv"
-df = pd.read_csv(csv_file, encoding='ISO-8859-1')
+dataset = load_dataset(csv_file)
 
-print(f"Loaded {len(df)} papers from {csv_file}")
-print(f"Columns: {df.columns.tolist()}\n")
+# Dictionary to store publication-year-paper counts
+if dataset is not None:
+    pub_year_counts, papers_loaded = dataset.publication_year_counts()
+else:
+    pub_year_counts, papers_loaded = publication_year_counts(csv_file, CHUNK_SIZE)
+
+print(f"Loaded {papers_loaded} papers from {csv_file}")
+print(f"Columns: {dataset.columns if dataset is not None else csv_columns(csv_file)}\n")
 
 # Create a bipartite graph: Publications and Years
 G = nx.Graph()
 
-# Dictionary to store publication-year-paper counts
-pub_year_counts = defaultdict(lambda: defaultdict(int))
-publication_papers = defaultdict(lambda: defaultdict(list))
-
-# Process each paper
-for index, row in df.iterrows():
-    journal = str(row['Source title']).strip()
-    year = str(row['Year']).strip()
-    title = str(row['Title']).strip()
-    
-    # Count papers per publication per year
-    pub_year_counts[year][journal] += 1
-    publication_papers[year][journal].append(title)
-    
-    # Add nodes and edges to the graph
-    year_node = f"Year_{year}"
-    pub_node = f"Pub_{journal}"
-    
-    G.add_node(year_node, node_type='year', label=year)
-    G.add_node(pub_node, node_type='publication', label=journal)
-    
-    # Edge weight = number of papers
-    if G.has_edge(year_node, pub_node):
-        G[year_node][pub_node]['weight'] += 1
-    else:
-        G.add_edge(year_node, pub_node, weight=1)
+for year, publications in pub_year_counts.items():
+    for journal, count in publications.items():
+        # Add nodes and edges to the graph
+        year_node = f"Year_{year}"
+        pub_node = f"Pub_{journal}"
+
+        G.add_node(year_node, node_type='year', label=year)
+        G.add_node(pub_node, node_type='publication', label=journal)
+
+        # Edge weight = number of papers
+        G.add_edge(year_node, pub_node, weight=count)
 
 print("=" * 80)
 print("YEAR-WISE PUBLICATION COUNTS")
@@ -84,7 +76,7 @@ output_data = {
     'summary': {
         'total_years': len(pub_year_counts),
         'total_unique_publications': len(set(pub for year_data in pub_year_counts.values() for pub in year_data.keys())),
-        'total_papers': len(df)
+        'total_papers': papers_loaded
     }
 }
 
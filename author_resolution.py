@@ -0,0 +1,156 @@
+import re
+import sys
+import csv
+import time
+import random
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+import numpy as np
+from columnar_dataset import load_dataset
+from KG_v2_neo4j import csv_file, CHUNK_SIZE, iter_paper_chunks, parse_authors
+
+# Mapping table read by the importers (AUTHOR_MAP_FILE in KG_v2_neo4j.py)
+MAP_FILE = "author_name_map.csv"
+
+# An initials token: "P", "P.", "P.V.N", "J.-P", "É." (names are title-cased by clean_author)
+INITIALS_TOKEN = re.compile(r'[^\W\d_](?:[.\-]+[^\W\d_])*\.?')
+NON_WORD = re.compile(r'[^\w\s]')
+
+def name_key(name):
+    """
+    (normalized surname, initials) of a cleaned name such as "Kumar P.V.N",
+    or None when the name has no trailing initials or nothing but initials.
+    Accents, punctuation and case are ignored in the surname.
+    """
+    tokens = name.split(' ')
+    end = len(tokens)
+    while end > 0 and INITIALS_TOKEN.fullmatch(tokens[end - 1]):
+        end -= 1
+    if end == 0 or end == len(tokens):
+        return None
+    initials = ''.join(c for token in tokens[end:] for c in token if c.isalpha()).upper()
+    surname = unicodedata.normalize('NFKD', ' '.join(tokens[:end]))
+    surname = ''.join(c for c in surname if not unicodedata.combining(c))
+    surname = ' '.join(NON_WORD.sub(' ', surname).split()).casefold()
+    return surname, initials
+
+def resolve_block(variants):
+    """
+    variants: {initials: Counter of names} for one surname + first initial.
+    Initials that are a prefix of exactly one maximal initials string in the
+    block ("P" and "PV" when "PVN" is the only longer one) resolve to it;
+    a prefix of two different ones ("P" with "PVN" and "PK") is ambiguous
+    and only its own formatting variants are merged.
+    Returns {name: canonical name}.
+    """
+    ordered = sorted(variants)
+    # Extensions of ordered[i] follow it contiguously; it is maximal if the next one is not one
+    maximal = [i for i, initials in enumerate(ordered)
+               if i + 1 == len(ordered) or not ordered[i + 1].startswith(initials)]
+
+    # Most frequent spelling of each initials string, ties broken by the longest then alphabetically
+    display = {
+        initials: min(names.items(), key=lambda item: (-item[1], -len(item[0]), item[0]))[0]
+        for initials, names in variants.items()
+    }
+
+    mapping = {}
+    for i, initials in enumerate(ordered):
+        end = bisect_left(ordered, initials + '\U0010ffff', i)  # after every extension, accented ones too
+        first = bisect_left(maximal, i)
+        if first + 1 < len(maximal) and maximal[first + 1] < end:
+            target = initials  # more than one longer variant: ambiguous
+        else:
+            target = ordered[maximal[first]]
+        canonical = display[target]
+        for name in variants[initials]:
+            if name != canonical:
+                mapping[name] = canonical
+    return mapping
+
+def resolve_author_names(name_counts):
+    """
+    Canonical-name mapping for {cleaned name: occurrences}. Names are only
+    compared within their (surname, first initial) block, so the work grows
+    with n log n in the number of distinct names rather than n^2.
+    """
+    blocks = defaultdict(lambda: defaultdict(Counter))
+    for name, count in name_counts.items():
+        key = name_key(name)
+        if key is not None:
+            surname, initials = key
+            blocks[(surname, initials[0])][initials][name] += count
+
+    mapping = {}
+    for variants in blocks.values():
+        if len(variants) > 1 or any(len(names) > 1 for names in variants.values()):
+            mapping.update(resolve_block(variants))
+    return mapping, len(blocks)
+
+def count_author_names(csv_file, chunk_size=CHUNK_SIZE):
+    dataset = load_dataset(csv_file)
+    if dataset is not None:
+        counts = np.bincount(dataset.arrays['wrote_author'], minlength=len(dataset.vocab['author']))
+        return Counter(dict(zip(dataset.vocab['author'], counts.tolist())))
+    name_counts = Counter()
+    for chunk in iter_paper_chunks(csv_file, chunk_size):
+        for authors_field in chunk['Authors']:
+            name_counts.update(parse_authors(authors_field))
+    return name_counts
+
+def write_author_map(mapping, path=MAP_FILE):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['name', 'canonical'])
+        writer.writerows(sorted(mapping.items()))
+
+def build_author_map(csv_file, path=MAP_FILE, chunk_size=CHUNK_SIZE):
+    """Count author names in the CSV, resolve variants and write the mapping table"""
+    start = time.perf_counter()
+    name_counts = count_author_names(csv_file, chunk_size)
+    mapping, blocks = resolve_author_names(name_counts)
+    write_author_map(mapping, path)
+
+    canonical = len(set(name_counts) - set(mapping))
+    print(f"✓ {len(name_counts)} distinct author names in {blocks} blocks, "
+          f"{len(mapping)} mapped to a canonical name ({canonical} Author nodes after import) "
+          f"in {time.perf_counter() - start:.1f}s")
+    for name, target in sorted(mapping.items())[:10]:
+        print(f"  {name} -> {target}")
+    print(f"Mapping saved to: {path}")
+    print(f"Set AUTHOR_MAP_FILE = \"{path}\" in KG_v2_neo4j.py to apply it on import.")
+    return mapping
+
+def synthetic_names(n, seed=0):
+    """n distinct names spread over surname blocks, with initials variants"""
+    rng = random.Random(seed)
+    letters = 'ABCDEFGHIJKLMNOPRSTVY'
+    names = set()
+    while len(names) < n:
+        surname = f"Surname{rng.randrange(n // 4 + 1)}"
+        initials = ''.join(rng.choice(letters) for _ in range(rng.randint(1, 3)))
+        style = rng.randrange(3)
+        if style == 0:
+            names.add(f"{surname} {'.'.join(initials)}")
+        elif style == 1:
+            names.add(f"{surname} {' '.join(initials)}")
+        else:
+            names.add(f"{surname} {initials[0]}")
+    return Counter(names)
+
+def benchmark(sizes=(250_000, 500_000, 1_000_000)):
+    """Resolution time on synthetic distinct names; per-name time should stay flat"""
+    for n in sizes:
+        name_counts = synthetic_names(n)
+        start = time.perf_counter()
+        mapping, blocks = resolve_author_names(name_counts)
+        elapsed = time.perf_counter() - start
+        print(f"  {n:>9,} names  {blocks:>9,} blocks  {len(mapping):>9,} mapped  "
+              f"{elapsed:6.2f}s  {elapsed / n * 1e6:5.2f} us/name")
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["benchmark"]:
+        benchmark()
+    else:
+        build_author_map(csv_file)
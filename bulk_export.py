@@ -0,0 +1,119 @@
+import csv
+import os
+import time
+from collections import defaultdict
+from KG_v2_neo4j import (csv_file, BATCH_SIZE, CHUNK_SIZE, iter_csv_rows, iter_batches,
+                         aggregate_coauthorships)
+
+# Directory receiving the neo4j-admin import files
+EXPORT_DIR = "neo4j_import"
+
+# (batch rows, file, header, label, key fields) for every node type
+NODE_FILES = [
+    ('authors', 'authors.csv', [':ID(Author)', 'name', ':LABEL'], 'Author', ('name',)),
+    ('papers', 'papers.csv', [':ID(Paper)', 'title', 'year', ':LABEL'], 'Paper', ('title', 'year')),
+    ('journals', 'journals.csv', [':ID(Journal)', 'name', ':LABEL'], 'Journal', ('name',)),
+    ('doc_types', 'document_types.csv', [':ID(DocumentType)', 'type', ':LABEL'], 'DocumentType', ('type',)),
+    ('years', 'years.csv', [':ID(Year)', 'value', ':LABEL'], 'Year', ('value',)),
+]
+
+# (batch rows, file, type, start label, start key, end label, end key) for every relationship
+RELATIONSHIP_FILES = [
+    ('wrote', 'wrote.csv', 'WROTE', 'Author', ('author',), 'Paper', ('title', 'paper_year')),
+    ('paper_journals', 'published_in.csv', 'PUBLISHED_IN', 'Paper', ('title', 'paper_year'), 'Journal', ('journal',)),
+    ('paper_types', 'has_type.csv', 'HAS_TYPE', 'Paper', ('title', 'paper_year'), 'DocumentType', ('type',)),
+    ('paper_years', 'published_in_year.csv', 'PUBLISHED_IN_YEAR', 'Paper', ('title', 'paper_year'), 'Year', ('year',)),
+]
+
+COAUTHORED_FILE = 'coauthored.csv'
+COAUTHORED_HEADER = [':START_ID(Author)', ':END_ID(Author)', 'weight:int', 'firstYear:int', 'lastYear:int', ':TYPE']
+
+def export_bulk_import(csv_file, export_dir=EXPORT_DIR, batch_size=BATCH_SIZE, chunk_size=CHUNK_SIZE):
+    """
+    Write deduplicated node and relationship CSVs for `neo4j-admin database import`.
+
+    Rows go through the same parsing and batching as import_csv_to_neo4j_batched,
+    so the graph matches a transactional import, plus weighted COAUTHORED edges.
+    Node IDs are integers assigned in first-seen order, so the same input
+    always produces the same files. Files are written while the CSV streams,
+    but the ID maps and the (start, end) ID pairs of every relationship type
+    stay in memory until the end: the pairs drop duplicates across batches,
+    and the WROTE pairs also give the COAUTHORED edges. Memory therefore grows
+    with the number of nodes and relationships, not with the CSV size.
+    """
+    os.makedirs(export_dir, exist_ok=True)
+    start = time.perf_counter()
+
+    files = []
+    def open_writer(name, header):
+        f = open(os.path.join(export_dir, name), 'w', encoding='utf-8', newline='')
+        files.append(f)
+        writer = csv.writer(f)
+        writer.writerow(header)
+        return writer
+
+    node_ids = {label: {} for _, _, _, label, _ in NODE_FILES}
+    node_writers = {name: open_writer(file_name, header) for name, file_name, header, _, _ in NODE_FILES}
+    relationship_writers = {}
+    relationship_pairs = {}
+    for name, file_name, rel_type, start_label, _, end_label, _ in RELATIONSHIP_FILES:
+        header = [f':START_ID({start_label})', f':END_ID({end_label})', ':TYPE']
+        relationship_writers[name] = open_writer(file_name, header)
+        relationship_pairs[name] = set()
+
+    total_rows = 0
+    try:
+        for batch_rows, batch in iter_batches(iter_csv_rows(csv_file, chunk_size), batch_size):
+            for name, _, _, label, fields in NODE_FILES:
+                ids = node_ids[label]
+                for row in batch[name]:
+                    key = tuple(row[field] for field in fields)
+                    if key not in ids:
+                        ids[key] = len(ids)
+                        node_writers[name].writerow([ids[key], *key, label])
+
+            for name, _, rel_type, start_label, start_fields, end_label, end_fields in RELATIONSHIP_FILES:
+                start_ids, end_ids = node_ids[start_label], node_ids[end_label]
+                pairs = relationship_pairs[name]
+                for row in batch[name]:
+                    pair = (start_ids[tuple(row[field] for field in start_fields)],
+                            end_ids[tuple(row[field] for field in end_fields)])
+                    if pair not in pairs:
+                        pairs.add(pair)
+                        relationship_writers[name].writerow([*pair, rel_type])
+
+            total_rows += batch_rows
+
+        # Coauthors are the authors sharing a Paper node through WROTE
+        paper_authors = defaultdict(list)
+        for author_id, paper_id in relationship_pairs['wrote']:
+            paper_authors[paper_id].append(author_id)
+        paper_years = {paper_id: year for (_, year), paper_id in node_ids['Paper'].items()}
+        coauthorships = aggregate_coauthorships(
+            (authors, paper_years[paper_id]) for paper_id, authors in paper_authors.items()
+        )
+        writer = open_writer(COAUTHORED_FILE, COAUTHORED_HEADER)
+        for (author1, author2), (weight, first_year, last_year) in sorted(coauthorships.items()):
+            writer.writerow([author1, author2, weight, first_year, last_year, 'COAUTHORED'])
+    finally:
+        for f in files:
+            f.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✓ Exported {total_rows} rows in {elapsed:.1f}s to {export_dir}/")
+    for _, file_name, _, label, _ in NODE_FILES:
+        print(f"  {label}: {len(node_ids[label])} nodes ({file_name})")
+    for name, file_name, rel_type, *_ in RELATIONSHIP_FILES:
+        print(f"  {rel_type}: {len(relationship_pairs[name])} relationships ({file_name})")
+    print(f"  COAUTHORED: {len(coauthorships)} relationships ({COAUTHORED_FILE})")
+
+    print("\nLoad into an empty database (Neo4j stopped) with:")
+    arguments = [f"--nodes={export_dir}/{file_name}" for _, file_name, *_ in NODE_FILES]
+    arguments += [f"--relationships={export_dir}/{file_name}" for _, file_name, *_ in RELATIONSHIP_FILES]
+    arguments.append(f"--relationships={export_dir}/{COAUTHORED_FILE}")
+    print("neo4j-admin database import full neo4j --id-type=integer --multiline-fields=true \\\n  "
+          + " \\\n  ".join(arguments))
+    return total_rows
+
+if __name__ == "__main__":
+    export_bulk_import(csv_file)
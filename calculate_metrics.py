@@ -1,125 +1,101 @@
 import pandas as pd
 import numpy as np
-from neo4j import GraphDatabase
+from graph_store import open_graph_store
 from collections import Counter
 import os
+import json
+from csv_stream import CHUNK_SIZE, authors_per_paper_stats
+from columnar_dataset import load_dataset
 
 # Neo4j connection details
 NEO4J_URI = "bolt://localhost:7687"
 NEO4J_USER = "neo4j"
 NEO4J_PASSWORD = "majorproject"
 
-def fetch_graph_metrics():
-    """Fetch comprehensive graph metrics from Neo4j"""
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+def fetch_graph_metrics(store=None):
+    """Fetch comprehensive graph metrics from the graph store (Neo4j by default)"""
+    own_store = store is None
+    if own_store:
+        store = open_graph_store(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
     metrics = {}
     
-    with driver.session() as session:
-        # Basic node counts
-        print("Fetching node counts...")
-        metrics['author_count'] = session.run("MATCH (a:Author) RETURN count(a) AS cnt").single()['cnt']
-        metrics['paper_count'] = session.run("MATCH (p:Paper) RETURN count(p) AS cnt").single()['cnt']
-        metrics['journal_count'] = session.run("MATCH (j:Journal) RETURN count(j) AS cnt").single()['cnt']
-        
-        # Check if Coauthorship nodes exist
-        try:
-            metrics['coauthorship_count'] = session.run("MATCH (c:Coauthorship) RETURN count(c) AS cnt").single()['cnt']
-        except:
-            metrics['coauthorship_count'] = 0
-        
-        # Relationship counts
-        print("Fetching relationship counts...")
-        metrics['wrote_count'] = session.run("MATCH ()-[r:WROTE]->() RETURN count(r) AS cnt").single()['cnt']
-        metrics['published_in_count'] = session.run("MATCH ()-[r:PUBLISHED_IN]->() RETURN count(r) AS cnt").single()['cnt']
-        
-        try:
-            metrics['coauthored_count'] = session.run("MATCH ()-[r:COAUTHORED]->() RETURN count(r) AS cnt").single()['cnt']
-        except:
-            metrics['coauthored_count'] = 0
-        
-        # Author degree statistics (papers per author)
-        print("Calculating author degree statistics...")
-        result = session.run("""
-            MATCH (a:Author)-[:WROTE]->(p:Paper)
-            RETURN a.name AS author, count(p) AS papers
-        """)
-        author_papers = [r['papers'] for r in result]
-        
-        metrics['mean_author_degree'] = np.mean(author_papers) if author_papers else 0
-        metrics['median_author_degree'] = np.median(author_papers) if author_papers else 0
-        metrics['max_author_degree'] = max(author_papers) if author_papers else 0
-        
-        # Top 10 authors by paper count
-        print("Fetching top authors...")
-        result = session.run("""
-            MATCH (a:Author)-[:WROTE]->(p:Paper)
-            RETURN a.name AS author, count(p) AS papers, a.communityId AS community
-            ORDER BY papers DESC
-            LIMIT 10
-        """)
-        metrics['top_authors'] = [dict(r) for r in result]
-        
-        # Community statistics
-        print("Calculating community statistics...")
-        result = session.run("""
-            MATCH (a:Author)
-            WHERE a.communityId IS NOT NULL
-            RETURN a.communityId AS community, count(a) AS size
-            ORDER BY size DESC
-        """)
-        communities = [r['size'] for r in result]
-        
-        if communities:
-            metrics['num_communities'] = len(communities)
-            metrics['largest_community'] = max(communities)
-            metrics['median_community_size'] = int(np.median(communities))
-            metrics['mean_community_size'] = np.mean(communities)
-            metrics['singleton_communities'] = sum(1 for s in communities if s == 1)
-            metrics['large_communities'] = sum(1 for s in communities if s > 10)
-        else:
-            metrics['num_communities'] = 0
-            metrics['largest_community'] = 0
-            metrics['median_community_size'] = 0
-            metrics['mean_community_size'] = 0
-            metrics['singleton_communities'] = 0
-            metrics['large_communities'] = 0
-        
-        # Top 5 communities
-        result = session.run("""
-            MATCH (a:Author)
-            WHERE a.communityId IS NOT NULL
-            RETURN a.communityId AS community, count(a) AS size
-            ORDER BY size DESC
-            LIMIT 5
-        """)
-        metrics['top_communities'] = [dict(r) for r in result]
-        
-        # Network density (for author collaboration network)
-        print("Calculating network density...")
-        n = metrics['author_count']
-        if metrics['coauthored_count'] > 0:
-            # Density = 2*edges / (n*(n-1)) for undirected graph
-            metrics['network_density'] = (2 * metrics['coauthored_count']) / (n * (n - 1)) if n > 1 else 0
-        else:
-            # Approximate using WROTE relationships
-            metrics['network_density'] = 0.0  # Would need COAUTHOR edges
-        
-        # Try to get modularity if available from GDS
-        try:
-            result = session.run("""
-                CALL gds.graph.exists('authorGraph') YIELD exists
-                RETURN exists
-            """)
-            if result.single()['exists']:
-                # Try to get stored modularity
-                print("Graph projection exists, but modularity not directly accessible without re-running")
-                metrics['modularity'] = None
-            else:
-                metrics['modularity'] = None
-        except:
-            metrics['modularity'] = None
+    # Basic node counts
+    print("Fetching node counts...")
+    metrics['author_count'] = store.count_nodes('Author')
+    metrics['paper_count'] = store.count_nodes('Paper')
+    metrics['journal_count'] = store.count_nodes('Journal')
     
-    driver.close()
+    # Check if Coauthorship nodes exist
+    try:
+        metrics['coauthorship_count'] = store.count_nodes('Coauthorship')
+    except:
+        metrics['coauthorship_count'] = 0
+    
+    # Relationship counts
+    print("Fetching relationship counts...")
+    metrics['wrote_count'] = store.count_relationships('WROTE')
+    metrics['published_in_count'] = store.count_relationships('PUBLISHED_IN')
+    
+    try:
+        metrics['coauthored_count'] = store.count_relationships('COAUTHORED')
+    except:
+        metrics['coauthored_count'] = 0
+    
+    # Author degree statistics (papers per author)
+    print("Calculating author degree statistics...")
+    degrees = store.author_degrees()
+    author_papers = degrees['papers'].tolist()
+    
+    metrics['mean_author_degree'] = np.mean(author_papers) if author_papers else 0
+    metrics['median_author_degree'] = np.median(author_papers) if author_papers else 0
+    metrics['max_author_degree'] = max(author_papers) if author_papers else 0
+    
+    # Top 10 authors by paper count
+    print("Fetching top authors...")
+    top_authors = degrees.sort_values('papers', ascending=False, kind='stable').head(10)
+    metrics['top_authors'] = top_authors.to_dict('records')
+    
+    # Community statistics
+    print("Calculating community statistics...")
+    community_sizes = store.community_sizes()
+    communities = community_sizes['size'].tolist()
+    
+    if communities:
+        metrics['num_communities'] = len(communities)
+        metrics['largest_community'] = max(communities)
+        metrics['median_community_size'] = int(np.median(communities))
+        metrics['mean_community_size'] = np.mean(communities)
+        metrics['singleton_communities'] = sum(1 for s in communities if s == 1)
+        metrics['large_communities'] = sum(1 for s in communities if s > 10)
+    else:
+        metrics['num_communities'] = 0
+        metrics['largest_community'] = 0
+        metrics['median_community_size'] = 0
+        metrics['mean_community_size'] = 0
+        metrics['singleton_communities'] = 0
+        metrics['large_communities'] = 0
+    
+    # Top 5 communities
+    metrics['top_communities'] = community_sizes.head(5).to_dict('records')
+    
+    # Network density (for author collaboration network)
+    print("Calculating network density...")
+    n = metrics['author_count']
+    if metrics['coauthored_count'] > 0:
+        # Density = 2*edges / (n*(n-1)) for undirected graph
+        metrics['network_density'] = (2 * metrics['coauthored_count']) / (n * (n - 1)) if n > 1 else 0
+    else:
+        # Approximate using WROTE relationships
+        metrics['network_density'] = 0.0  # Would need COAUTHOR edges
+    
+    # Try to get modularity if available from GDS
+    if store.graph_projection_exists('authorGraph'):
+        # Try to get stored modularity
+        print("Graph projection exists, but modularity not directly accessible without re-running")
+    metrics['modularity'] = None
+    
+    if own_store:
+        store.close()
     return metrics
 
 def analyze_csv_data():
@@ -129,14 +105,13 @@ def analyze_csv_data():
     # Analyze research_csv.csv
     if os.path.exists('research_csv.csv'):
         print("\nAnalyzing research_csv.csv...")
-        df = pd.read_csv('research_csv.csv', encoding='utf-8')
         
-        # Authors per paper
-        authors_per_paper = df['Authors'].str.split(',').apply(len)
-        csv_metrics['mean_authors_per_paper'] = authors_per_paper.mean()
-        csv_metrics['median_authors_per_paper'] = authors_per_paper.median()
-        csv_metrics['max_authors_per_paper'] = authors_per_paper.max()
-        csv_metrics['min_authors_per_paper'] = authors_per_paper.min()
+        # Authors per paper (prepared dataset if up to date, else streamed in chunks of CHUNK_SIZE rows)
+        dataset = load_dataset('research_csv.csv')
+        if dataset is not None:
+            csv_metrics.update(dataset.authors_per_paper_stats())
+        else:
+            csv_metrics.update(authors_per_paper_stats('research_csv.csv', CHUNK_SIZE))
     
     # Analyze predicted_coauthorships.csv
     if os.path.exists('predicted_coauthorships.csv'):
@@ -166,6 +141,12 @@ def analyze_csv_data():
         # High scoring pairs (> 0.7)
         csv_metrics['high_score_pairs'] = len(df_pred[df_pred['average_score'] > 0.7])
     
+    # Temporal evaluation written by evaluate_link_prediction.py
+    if os.path.exists('link_prediction_evaluation.json'):
+        print("Analyzing link_prediction_evaluation.json...")
+        with open('link_prediction_evaluation.json', encoding='utf-8') as f:
+            csv_metrics['link_prediction_evaluation'] = json.load(f)
+    
     # Analyze community_detection_table.csv
     if os.path.exists('community_detection_table.csv'):
         print("Analyzing community_detection_table.csv...")
@@ -230,8 +211,10 @@ def print_results(metrics, csv_metrics):
         comm = author['community'] if author['community'] is not None else 'N/A'
         print(f"   {i}. {author['author']}: {author['papers']} papers (Community: {comm})")
     
-    if 'total_author_pairs' in csv_metrics:
+    if 'total_author_pairs' in csv_metrics or 'link_prediction_evaluation' in csv_metrics:
         print("\n4. LINK PREDICTION PERFORMANCE")
+    
+    if 'total_author_pairs' in csv_metrics:
         print(f"   - Total author pairs evaluated: {csv_metrics['total_author_pairs']:,}")
         print(f"\n   Cosine similarity:")
         print(f"   - Mean: {csv_metrics['cosine_mean']:.4f}")
@@ -254,6 +237,16 @@ def print_results(metrics, csv_metrics):
         for i, pred in enumerate(csv_metrics['top_predictions'], 1):
             print(f"   {i}. {pred['author1']} <-> {pred['author2']}")
             print(f"      Cosine: {pred['cosine_similarity']:.4f}, Jaccard: {pred['jaccard_similarity']:.4f}, Avg: {pred['average_score']:.4f}")
+    
+    if 'link_prediction_evaluation' in csv_metrics:
+        evaluation = csv_metrics['link_prediction_evaluation']
+        print(f"\n   Temporal evaluation (train: papers up to {evaluation['split_year']}, "
+              f"test: {evaluation['future_pairs']} new coauthor pairs after it):")
+        for method, result in evaluation['methods'].items():
+            precision = ', '.join(f"P@{key.rsplit('_', 1)[1]}: {value:.3f}"
+                                  for key, value in result.items() if key.startswith('precision_at_'))
+            print(f"   - {method}: AUC {result['auc']:.4f}, {precision}, MRR {result['mrr']:.4f} "
+                  f"({result['seconds']:.3f}s, {result['peak_mb']:.1f} MB peak)")
 
 def save_to_file(metrics, csv_metrics):
     """Save metrics to a text file"""
@@ -285,6 +278,16 @@ def save_to_file(metrics, csv_metrics):
             f.write(f"Cosine mean: {csv_metrics['cosine_mean']:.4f}\n")
             f.write(f"Jaccard mean: {csv_metrics['jaccard_mean']:.4f}\n")
             f.write(f"Average score mean: {csv_metrics['avg_score_mean']:.4f}\n")
+        
+        if 'link_prediction_evaluation' in csv_metrics:
+            evaluation = csv_metrics['link_prediction_evaluation']
+            f.write(f"\nTEMPORAL EVALUATION (split year {evaluation['split_year']}, "
+                    f"{evaluation['future_pairs']} future pairs):\n")
+            for method, result in evaluation['methods'].items():
+                precision = ', '.join(f"P@{key.rsplit('_', 1)[1]} {value:.4f}"
+                                      for key, value in result.items() if key.startswith('precision_at_'))
+                f.write(f"{method}: AUC {result['auc']:.4f}, {precision}, MRR {result['mrr']:.4f}, "
+                        f"{result['seconds']:.3f}s, {result['peak_mb']:.1f} MB peak\n")
     
     print(f"\nMetrics saved to: calculated_metrics.txt")
 
@@ -293,7 +296,7 @@ if __name__ == "__main__":
         print("Starting metric calculation...")
         print("This may take a few minutes depending on graph size.\n")
         
-        # Fetch from Neo4j
+        # Fetch from the graph store
         metrics = fetch_graph_metrics()
         
         # Analyze CSVs
@@ -0,0 +1,117 @@
+import os
+import json
+import time
+from collections import Counter
+import numpy as np
+import pandas as pd
+from csv_stream import CSV_ENCODING, histogram_stats
+
+# Directory holding the parsed, columnar copy of the CSV (written by prepare_dataset.py)
+DATASET_DIR = "dataset"
+METADATA_FILE = "metadata.json"
+
+# Interned string columns: vocabulary <name>.json, codes per paper in paper_<name>.npy
+VOCABULARIES = ['title', 'journal', 'doc_type', 'year', 'author']
+PAPER_ARRAYS = ['paper_title', 'paper_journal', 'paper_doc_type', 'paper_year', 'paper_author_parts']
+# Exploded author-paper table: one entry per (paper row, cleaned author) in file order
+WROTE_ARRAYS = ['wrote_paper', 'wrote_author']
+
+def source_signature(csv_file):
+    """What a dataset must have been built from to be reused for csv_file"""
+    stat = os.stat(csv_file)
+    return {'source': os.path.abspath(csv_file), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+class Dataset:
+    """
+    Memory-mapped columns of a prepared CSV. Every CSV row is one paper;
+    strings are integer codes into per-column vocabularies, exposed as
+    pandas categoricals.
+    """
+
+    def __init__(self, dataset_dir=DATASET_DIR):
+        self.dataset_dir = dataset_dir
+        with open(os.path.join(dataset_dir, METADATA_FILE), encoding='utf-8') as f:
+            self.metadata = json.load(f)
+        self.vocab = {}
+        for name in VOCABULARIES:
+            with open(os.path.join(dataset_dir, f'{name}.json'), encoding='utf-8') as f:
+                self.vocab[name] = json.load(f)
+        self.arrays = {
+            name: np.load(os.path.join(dataset_dir, f'{name}.npy'), mmap_mode='r')
+            for name in PAPER_ARRAYS + WROTE_ARRAYS
+        }
+
+    @property
+    def columns(self):
+        return self.metadata['columns']
+
+    def __len__(self):
+        return self.metadata['rows']
+
+    def categorical(self, name, codes):
+        return pd.Categorical.from_codes(np.asarray(codes), categories=pd.Index(self.vocab[name], dtype=object))
+
+    def papers(self):
+        """One row per paper: title, journal, doc_type, year (categoricals) and author_parts"""
+        return pd.DataFrame({
+            name: self.categorical(name, self.arrays[f'paper_{name}'])
+            for name in ['title', 'journal', 'doc_type', 'year']
+        } | {'author_parts': self.arrays['paper_author_parts']})
+
+    def author_papers(self):
+        """Exploded author-paper table: paper row number and author (categorical)"""
+        return pd.DataFrame({
+            'paper': self.arrays['wrote_paper'],
+            'author': self.categorical('author', self.arrays['wrote_author']),
+        })
+
+    def iter_rows(self):
+        """(authors, title, journal, doc_type, year) per paper, as parse_row returns them before author mapping"""
+        names = self.vocab['author']
+        authors = [names[code] for code in self.arrays['wrote_author'].tolist()]
+        offsets = np.searchsorted(self.arrays['wrote_paper'], np.arange(len(self) + 1)).tolist()
+        columns = [
+            [self.vocab[name][code] for code in self.arrays[f'paper_{name}'].tolist()]
+            for name in ['title', 'journal', 'doc_type', 'year']
+        ]
+        for paper, (title, journal, doc_type, year) in enumerate(zip(*columns)):
+            yield authors[offsets[paper]:offsets[paper + 1]], title, journal, doc_type, year
+
+    def publication_year_counts(self):
+        """Same result as csv_stream.publication_year_counts, from the codes"""
+        years = [year.strip() for year in self.vocab['year']]
+        journals = [journal.strip() for journal in self.vocab['journal']]
+        pairs = pd.DataFrame({
+            'year': pd.Categorical(np.asarray(years, dtype=object)[self.arrays['paper_year']]),
+            'journal': pd.Categorical(np.asarray(journals, dtype=object)[self.arrays['paper_journal']]),
+        })
+        pub_year_counts = {}
+        counts = pairs.groupby(['year', 'journal'], sort=False, observed=True).size()
+        for (year, journal), count in counts.items():
+            pub_year_counts.setdefault(year, {})[journal] = int(count)
+        return pub_year_counts, len(self)
+
+    def authors_per_paper_stats(self):
+        """Same result as csv_stream.authors_per_paper_stats"""
+        parts, papers = np.unique(self.arrays['paper_author_parts'], return_counts=True)
+        return histogram_stats(Counter(dict(zip(parts.tolist(), papers.tolist()))))
+
+def load_dataset(csv_file, dataset_dir=DATASET_DIR):
+    """The prepared dataset for csv_file, or None if there is none or the CSV changed since"""
+    path = os.path.join(dataset_dir, METADATA_FILE)
+    if not os.path.exists(path) or not os.path.exists(csv_file):
+        return None
+    with open(path, encoding='utf-8') as f:
+        metadata = json.load(f)
+    if {key: metadata.get(key) for key in ('source', 'size', 'mtime_ns')} != source_signature(csv_file):
+        print(f"⚠ {dataset_dir}/ was prepared from a different version of {csv_file}; reading the CSV")
+        return None
+    if metadata.get('encoding') != CSV_ENCODING:
+        print(f"⚠ {dataset_dir}/ decoded {csv_file} as {metadata.get('encoding')}, not {CSV_ENCODING}; "
+              f"reading the CSV until prepare_dataset.py is rerun")
+        return None
+    start = time.perf_counter()
+    dataset = Dataset(dataset_dir)
+    print(f"Loaded prepared dataset {dataset_dir}/ ({len(dataset)} papers) "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return dataset
@@ -1,5 +1,5 @@
 import re
-from neo4j import GraphDatabase
+from graph_store import open_graph_store
 import pandas as pd
 
 # Neo4j connection details
@@ -7,30 +7,24 @@ uri = "bolt://localhost:7687"
 user = "neo4j"
 password = "majorproject"
 
-def create_journal_year_relationships(uri, user, password):
+def create_journal_year_relationships(uri, user, password, store=None):
     """
     Creates relationships from Journal nodes to Year nodes
     with a count property showing number of papers
     """
-    driver = GraphDatabase.driver(uri, auth=(user, password))
+    own_store = store is None
+    if own_store:
+        store = open_graph_store(uri, user, password)
     
-    with driver.session() as session:
-        # Create PUBLISHED_IN_YEAR relationships from Journal to Year with paper count
-        query = """
-        MATCH (j:Journal)<-[:PUBLISHED_IN]-(p:Paper)-[:PUBLISHED_IN_YEAR]->(y:Year)
-        WITH j, y, COUNT(p) AS paperCount
-        MERGE (j)-[r:PUBLISHED_IN_YEAR]->(y)
-        SET r.paperCount = paperCount
-        RETURN j.name AS Journal, y.value AS Year, paperCount
-        """
-        
-        result = session.run(query)
-        
-        print("Created Journal->Year relationships with paper counts:")
-        for record in result:
-            print(f"  {record['Journal']} -> {record['Year']}: {record['paperCount']} papers")
+    # Create PUBLISHED_IN_YEAR relationships from Journal to Year with paper count
+    links = store.link_journal_years()
     
-    driver.close()
+    print("Created Journal->Year relationships with paper counts:")
+    for record in links:
+        print(f"  {record['Journal']} -> {record['Year']}: {record['paperCount']} papers")
+    
+    if own_store:
+        store.close()
     print("\n✓ Journal-Year relationships created successfully!")
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+from collections import Counter, defaultdict
+import pandas as pd
+
+# Rows held in memory at once by the streaming readers
+CHUNK_SIZE = 50000
+# Encoding every CSV reader uses. The importer has always decoded the CSV as
+# ISO-8859-1, and graph names, ledger fingerprints and author maps depend on
+# it; it also decodes any bytes, and writing back as ISO-8859-1 restores them.
+CSV_ENCODING = 'ISO-8859-1'
+
+def csv_columns(csv_file, encoding=CSV_ENCODING):
+    """Read only the header row"""
+    return pd.read_csv(csv_file, encoding=encoding, nrows=0).columns.tolist()
+
+def iter_csv_chunks(csv_file, chunk_size=CHUNK_SIZE, encoding=CSV_ENCODING, columns=None, defaults=None):
+    """
+    Yield the CSV as DataFrames of at most chunk_size rows.
+
+    Values are read as text, so a chunk boundary cannot change how a column
+    is typed (and therefore printed) the way per-chunk dtype inference would.
+    Columns listed in defaults but missing from the file are filled with the
+    default value, like the in-memory readers do.
+    """
+    defaults = defaults or {}
+    usecols = None
+    missing = []
+    if columns is not None:
+        present = set(csv_columns(csv_file, encoding))
+        usecols = [c for c in columns if c in present]
+        missing = [c for c in columns if c not in present]
+        unknown = [c for c in missing if c not in defaults]
+        if unknown:
+            raise KeyError(f"Columns not found in {csv_file}: {unknown}")
+
+    reader = pd.read_csv(csv_file, encoding=encoding, usecols=usecols, dtype=str, chunksize=chunk_size)
+    for chunk in reader:
+        for column in missing:
+            chunk[column] = defaults[column]
+        yield chunk
+
+def publication_year_counts(csv_file, chunk_size=CHUNK_SIZE, encoding=CSV_ENCODING):
+    """
+    Count papers per publication per year, chunk by chunk.
+    Returns ({year: {journal: count}}, total_papers) keyed exactly like the
+    str(...).strip() values used by the year analysis scripts.
+    """
+    pub_year_counts = defaultdict(lambda: defaultdict(int))
+    total_papers = 0
+    for chunk in iter_csv_chunks(csv_file, chunk_size, encoding, columns=['Source title', 'Year']):
+        for journal, year in zip(chunk['Source title'], chunk['Year']):
+            pub_year_counts[str(year).strip()][str(journal).strip()] += 1
+        total_papers += len(chunk)
+    return pub_year_counts, total_papers
+
+def authors_per_paper_stats(csv_file, chunk_size=CHUNK_SIZE, encoding=CSV_ENCODING):
+    """
+    Mean/median/max/min of comma-separated author fields per paper.
+    Only a histogram of counts is kept, so memory does not grow with the file.
+    """
+    histogram = Counter()
+    for chunk in iter_csv_chunks(csv_file, chunk_size, encoding, columns=['Authors']):
+        histogram.update(chunk['Authors'].str.split(',').apply(len).tolist())
+    return histogram_stats(histogram)
+
+def histogram_stats(histogram):
+    """Mean/median/max/min authors per paper from {author count: papers}"""
+    total = sum(histogram.values())
+    if total == 0:
+        return {}
+    counts = sorted(histogram)
+    middle = [(total - 1) // 2, total // 2]
+    middle_values = []
+    seen = 0
+    for count in counts:
+        seen += histogram[count]
+        while middle and middle[0] < seen:
+            middle_values.append(count)
+            middle.pop(0)
+    return {
+        'mean_authors_per_paper': sum(c * n for c, n in histogram.items()) / total,
+        'median_authors_per_paper': sum(middle_values) / 2,
+        'max_authors_per_paper': counts[-1],
+        'min_authors_per_paper': counts[0],
+    }
@@ -0,0 +1,229 @@
+import sys
+import json
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.preprocessing import normalize
+from KG_v2_neo4j import csv_file, iter_csv_rows, year_number
+import predict_coauthorship as pc
+
+# Train on papers up to SPLIT_YEAR, evaluate on coauthor pairs first seen after it
+SPLIT_YEAR = 2022
+# Cut-offs for precision@k over the global ranking of candidate pairs
+PRECISION_AT = (10, 50, 100)
+# Results read by calculate_metrics.py
+EVALUATION_FILE = 'link_prediction_evaluation.json'
+# Memory for the dense score blocks while evaluating
+MEMORY_BUDGET_MB = pc.MEMORY_BUDGET_MB
+# Bytes per author pair of a block: its score, the masks and the temporary
+# copies of the MRR ranking (about 52 MB for 512 x 2,290 pairs)
+BYTES_PER_PAIR = 48
+
+def author_paper_years(csv_file):
+    """Author-paper-journal rows with the paper's year, parsed like the importer"""
+    records = []
+    for authors, title, journal, doc_type, year in iter_csv_rows(csv_file):
+        year = year_number(year)
+        records.extend((author, title, journal, year) for author in authors)
+    return pd.DataFrame(records, columns=['author', 'paper', 'journal', 'year'])
+
+def temporal_split(df, split_year=SPLIT_YEAR):
+    """
+    Features and coauthorships of papers up to split_year, and the new
+    coauthor pairs (both authors already known, not yet coauthors) of the
+    papers after it, as sparse authors x authors matrices. Papers without
+    a year belong to neither side; they are left out and counted.
+    """
+    undated = df['year'].isna()
+    undated_papers = int(df.loc[undated, 'paper'].nunique())
+    df = df[~undated]
+    train = df[df['year'] <= split_year]
+    test = df[df['year'] > split_year]
+    feature_matrix, authors = pc.build_feature_matrix(train)
+    train_coauthors = pc.coauthor_adjacency(train, authors)
+    future = pc.coauthor_adjacency(test[test['author'].isin(authors)], authors).astype(np.int8)
+    future = (future - future.multiply(train_coauthors)).tocsr()
+    future.eliminate_zeros()
+    split = {
+        'split_year': split_year,
+        'train_papers': int(train['paper'].nunique()),
+        'test_papers': int(test['paper'].nunique()),
+        'train_authors': len(authors),
+        'future_pairs': int(future.nnz // 2),
+        'undated_papers': undated_papers,
+    }
+    return feature_matrix, authors, train_coauthors, future != 0, split
+
+def pairs_to_matrix(rows, columns, values, n):
+    return sparse.csr_matrix((values, (rows, columns)), shape=(n, n))
+
+def similarity_scores(feature_matrix, coauthors):
+    """Exact cosine, Jaccard and their average for every pair sharing a feature"""
+    n = feature_matrix.shape[0]
+    binary = (feature_matrix != 0).astype(np.int64)
+    normalized = normalize(sparse.csr_matrix(feature_matrix, dtype=np.float64))
+    cardinality = np.asarray(binary.sum(axis=1)).ravel()
+    rows, columns, cos, jac, avg = pc.row_scores(normalized, binary, cardinality, np.arange(n))
+    return {name: pairs_to_matrix(rows, columns, values, n)
+            for name, values in (('cosine', cos), ('jaccard', jac), ('average', avg))}
+
+def lsh_similarity_scores(feature_matrix, coauthors):
+    """Average score of the MinHash LSH candidates only (0 for pairs LSH never proposes)"""
+    n = feature_matrix.shape[0]
+    binary = (feature_matrix != 0).astype(np.int64)
+    normalized = normalize(sparse.csr_matrix(feature_matrix, dtype=np.float64))
+    cardinality = np.asarray(binary.sum(axis=1)).ravel()
+    chunks = list(pc.lsh_candidate_scores(normalized, binary, cardinality))
+    rows, columns, avg = (np.concatenate([chunk[i] for chunk in chunks]) if chunks else np.empty(0, dtype=dtype)
+                          for i, dtype in ((0, np.int64), (1, np.int64), (4, np.float64)))
+    return {'average (lsh)': pairs_to_matrix(rows, columns, avg, n)}
+
+def graph_scores(feature_matrix, coauthors):
+    """Common neighbours, Adamic-Adar and resource allocation (sparse) and preferential attachment (degrees)"""
+    scores, degree = pc.topological_scores(coauthors)
+    scores['preferential_attachment'] = degree
+    return scores
+
+# Scorers timed as one unit, each returning {method: sparse score matrix or degree vector}
+SCORERS = {
+    'similarity (exact)': similarity_scores,
+    'similarity (lsh)': lsh_similarity_scores,
+    'coauthor graph': graph_scores,
+}
+
+def score_block(scores, start, end):
+    """Dense scores of authors start..end-1 against everyone"""
+    if sparse.issparse(scores):
+        return scores[start:end].toarray()
+    return np.outer(scores[start:end], scores).astype(np.float64)
+
+def block_size(n, memory_budget_mb=MEMORY_BUDGET_MB):
+    """Authors per dense block so that a block against all n authors fits the memory budget"""
+    return max(int(memory_budget_mb * 1e6 / BYTES_PER_PAIR / max(n, 1)), 1)
+
+def candidate_blocks(scores, train_coauthors, future, block_rows):
+    """
+    Dense blocks of block_rows authors against everyone: (rows, scores,
+    positive, negative, upper), where upper marks each pair once (j > i).
+    """
+    n = future.shape[0]
+    for start in range(0, n, block_rows):
+        end = min(start + block_rows, n)
+        rows = np.arange(start, end)
+        eligible = ~train_coauthors[start:end].toarray()
+        eligible[rows - start, rows] = False
+        positive = future[start:end].toarray()
+        upper = np.arange(n)[None, :] > rows[:, None]
+        yield rows, score_block(scores, start, end), positive, eligible & ~positive, upper
+
+def evaluate_scores(scores, train_coauthors, future, ks=PRECISION_AT, block_rows=None):
+    """
+    AUC, precision@k and MRR of one score source. Candidates are all pairs
+    of training authors that are not yet coauthors; positives are future.
+    AUC counts, for every positive and negative pair, how often the
+    positive scores higher (ties count half). Precision@k counts pairs tied
+    at the k-th best score by their share of positives. An author's
+    reciprocal rank is that of its best-scoring future coauthor among the
+    negatives (ties count half).
+
+    Two passes over blocks of block_rows authors (block_size by default):
+    the first keeps the positive scores and the max(ks) best candidate
+    scores, the second counts each negative against them. Only the future
+    pairs are held, not the O(n²) negatives. Without positives or negatives
+    every metric is NaN.
+    """
+    block_rows = block_rows or block_size(future.shape[0])
+    positive_scores, best, reciprocal = [np.empty(0)], np.empty(0), []
+    top = max(ks, default=0)
+    candidates = 0
+    for rows, block, positive, negative, upper in candidate_blocks(scores, train_coauthors, future, block_rows):
+        positive_scores.append(block[positive & upper])
+        candidates += int(((positive | negative) & upper).sum())
+        best = np.concatenate([best, block[(positive | negative) & upper]])
+        if len(best) > top:
+            best = np.partition(best, len(best) - top)[len(best) - top:]
+
+        has_future = positive.any(axis=1)
+        best_future = np.where(positive, block, -np.inf).max(axis=1)[has_future, None]
+        others = np.where(negative, block, np.nan)[has_future]
+        rank = 1 + (others > best_future).sum(axis=1) + (others == best_future).sum(axis=1) / 2
+        reciprocal.append(1 / rank)
+
+    positives = np.sort(np.concatenate(positive_scores))
+    if len(positives) == 0 or len(positives) == candidates:
+        return {'auc': np.nan, **{f'precision_at_{k}': np.nan for k in ks}, 'mrr': np.nan}
+    best = np.sort(best)[::-1]
+    thresholds = {k: best[min(k, len(best)) - 1] for k in ks}
+    above = dict.fromkeys(ks, 0)
+    above_positive = dict.fromkeys(ks, 0)
+    tied = dict.fromkeys(ks, 0)
+    tied_positive = dict.fromkeys(ks, 0)
+    wins = ties = negative_count = 0
+    for rows, block, positive, negative, upper in candidate_blocks(scores, train_coauthors, future, block_rows):
+        negatives = block[negative & upper]
+        low = np.searchsorted(positives, negatives, side='left')
+        high = np.searchsorted(positives, negatives, side='right')
+        wins += int((len(positives) - high).sum())
+        ties += int((high - low).sum())
+        negative_count += len(negatives)
+        block_positives = block[positive & upper]
+        for k, threshold in thresholds.items():
+            above_positive[k] += int((block_positives > threshold).sum())
+            above[k] += int((block_positives > threshold).sum() + (negatives > threshold).sum())
+            tied_positive[k] += int((block_positives == threshold).sum())
+            tied[k] += int((block_positives == threshold).sum() + (negatives == threshold).sum())
+
+    result = {'auc': (wins + ties / 2) / (len(positives) * negative_count)}
+    for k in ks:
+        cut = min(k, len(positives) + negative_count)
+        share = (cut - above[k]) * tied_positive[k] / tied[k]
+        result[f'precision_at_{k}'] = (above_positive[k] + share) / cut
+    result['mrr'] = float(np.concatenate(reciprocal).mean())
+    return result
+
+def evaluate(df, split_year=SPLIT_YEAR, scorers=SCORERS):
+    """Temporal split, then every scorer's wall time, peak traced memory and ranking quality"""
+    feature_matrix, authors, train_coauthors, future, split = temporal_split(df, split_year)
+    print(f"✓ Train: papers up to {split_year} ({split['train_papers']} papers, {split['train_authors']} authors); "
+          f"test: {split['future_pairs']} new coauthor pairs in {split['test_papers']} later papers")
+    if split['undated_papers']:
+        print(f"⚠ {split['undated_papers']} papers without a year left out")
+    methods = {}
+    if not split['future_pairs']:
+        print(f"⚠ No positives after split year {split_year}: AUC, precision@k and MRR are NaN")
+    if not split['train_authors']:
+        scorers = {}
+    for scorer_name, scorer in scorers.items():
+        tracemalloc.start()
+        start = time.perf_counter()
+        scores = scorer(feature_matrix, train_coauthors)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        for method, method_scores in scores.items():
+            methods[method] = {'scorer': scorer_name, 'seconds': elapsed, 'peak_mb': peak / 1e6,
+                               **evaluate_scores(method_scores, train_coauthors, future)}
+    return {**split, 'methods': methods}
+
+def print_evaluation(evaluation):
+    if not evaluation['methods']:
+        return
+    ks = [key for key in next(iter(evaluation['methods'].values())) if key.startswith('precision_at_')]
+    header = f"  {'method':<25} {'AUC':>6} " + ' '.join(f"{'P@' + k.rsplit('_', 1)[1]:>6}" for k in ks)
+    print(header + f" {'MRR':>6} {'time':>8} {'peak':>9}")
+    for method, result in evaluation['methods'].items():
+        print(f"  {method:<25} {result['auc']:6.3f} " + ' '.join(f"{result[k]:6.3f}" for k in ks) +
+              f" {result['mrr']:6.3f} {result['seconds']:7.3f}s {result['peak_mb']:6.1f} MB")
+
+def main(csv_file=csv_file, split_year=SPLIT_YEAR):
+    evaluation = evaluate(author_paper_years(csv_file), split_year)
+    print_evaluation(evaluation)
+    with open(EVALUATION_FILE, 'w', encoding='utf-8') as f:
+        json.dump(evaluation, f, indent=2)
+    print(f"Evaluation saved to: {EVALUATION_FILE}")
+    return evaluation
+
+if __name__ == "__main__":
+    main(csv_file, int(sys.argv[1]) if sys.argv[1:] else SPLIT_YEAR)
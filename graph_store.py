@@ -0,0 +1,414 @@
+import os
+import pickle
+from array import array
+from itertools import chain, islice
+import numpy as np
+import pandas as pd
+from neo4j import GraphDatabase
+from neo4j_schema import ensure_schema, check_query_plans
+from query_stats import instrument
+
+# Storage backend used by the scripts: "neo4j" or "memory"
+GRAPH_STORE = os.environ.get('KG_GRAPH_STORE', 'neo4j')
+# File the in-memory graph is loaded from and saved to, so separate scripts share it
+MEMORY_STORE_FILE = os.environ.get('KG_MEMORY_STORE_FILE', 'graph_store.pkl')
+# Records per round trip when streaming large reads (also ids per name lookup)
+FETCH_SIZE = 10_000
+
+# Properties identifying a node of each label (what MERGE matches on)
+NODE_KEYS = {
+    'Author': ('name',),
+    'Paper': ('title', 'year'),
+    'Journal': ('name',),
+    'DocumentType': ('type',),
+    'Year': ('value',),
+    'PublicationCount': ('id',),
+}
+
+def node_key(label, properties):
+    return tuple(properties[key] for key in NODE_KEYS[label])
+
+# author_paper_journal() columns: the label of the node and the property returned for it
+TRIPLE_COLUMNS = {'author': ('Author', 'name'), 'paper': ('Paper', 'title'), 'journal': ('Journal', 'name')}
+AUTHOR_PAPER_JOURNAL = "MATCH (a:Author)-[:WROTE]->(p:Paper)-[:PUBLISHED_IN]->(j:Journal)"
+
+def author_paper_journal_frame(store):
+    """
+    author_paper_journal() from the store's code arrays: each distinct node's
+    name is looked up once, and every row shares that string object
+    """
+    codes, node_ids = store.author_paper_journal_ids()
+    columns = {}
+    for column, (label, property) in TRIPLE_COLUMNS.items():
+        columns[column] = store.node_names(label, node_ids[column], property)[codes[column]]
+    return pd.DataFrame(columns, columns=list(TRIPLE_COLUMNS))
+
+def open_graph_store(uri, user, password, backend=None):
+    """Open the configured backend; close() it when done (the memory store saves on close)"""
+    backend = backend or GRAPH_STORE
+    if backend == 'neo4j':
+        return Neo4jGraphStore(uri, user, password)
+    if backend == 'memory':
+        return InMemoryGraphStore(MEMORY_STORE_FILE)
+    raise ValueError(f"Unknown graph store backend: {backend}")
+
+class Neo4jGraphStore:
+    """Graph store backed by a Neo4j server"""
+
+    def __init__(self, uri, user, password):
+        self.driver = instrument(GraphDatabase.driver(uri, auth=(user, password)))
+
+    def prepare(self, queries=()):
+        """Create the schema and EXPLAIN-check the given (query, parameters) pairs"""
+        with self.driver.session() as session:
+            ensure_schema(session)
+            if queries:
+                check_query_plans(session, queries)
+
+    def write(self, operations):
+        """
+        Apply ('nodes', label, rows) and ('edges', type, start_label, end_label, rows)
+        upserts in one write transaction. Node rows are property maps
+        containing the label's key; edge rows are {'start': key map,
+        'end': key map, 'properties': map}.
+        """
+        def work(tx):
+            for operation in operations:
+                if operation[-1]:
+                    tx.run(self._statement(operation), rows=operation[-1]).consume()
+        with self.driver.session() as session:
+            session.execute_write(work)
+
+    def upsert_nodes(self, label, rows):
+        self.write([('nodes', label, rows)])
+
+    def upsert_edges(self, rel_type, start_label, end_label, rows):
+        self.write([('edges', rel_type, start_label, end_label, rows)])
+
+    @staticmethod
+    def _statement(operation):
+        if operation[0] == 'nodes':
+            _, label, _ = operation
+            key = ', '.join(f"{k}: row.{k}" for k in NODE_KEYS[label])
+            return f"UNWIND $rows AS row MERGE (n:{label} {{{key}}}) SET n += row"
+        _, rel_type, start_label, end_label, _ = operation
+        start_key = ', '.join(f"{k}: row.start.{k}" for k in NODE_KEYS[start_label])
+        end_key = ', '.join(f"{k}: row.end.{k}" for k in NODE_KEYS[end_label])
+        return f"""
+            UNWIND $rows AS row
+            MATCH (a:{start_label} {{{start_key}}})
+            MATCH (b:{end_label} {{{end_key}}})
+            MERGE (a)-[r:{rel_type}]->(b)
+            SET r += row.properties
+        """
+
+    def count_nodes(self, label):
+        with self.driver.session() as session:
+            return session.run(f"MATCH (n:{label}) RETURN count(n) AS cnt").single()['cnt']
+
+    def count_relationships(self, rel_type):
+        with self.driver.session() as session:
+            return session.run(f"MATCH ()-[r:{rel_type}]->() RETURN count(r) AS cnt").single()['cnt']
+
+    def author_paper_journal(self):
+        return author_paper_journal_frame(self)
+
+    def author_paper_journal_ids(self):
+        """
+        Every Author-WROTE->Paper-PUBLISHED_IN->Journal path as int64 code
+        arrays {'author', 'paper', 'journal'}, plus each column's element ids
+        by code. The result is streamed FETCH_SIZE records at a time; each
+        block's element ids are interned to codes as it arrives and the
+        blocks are concatenated at the end. No per-record dicts or names are
+        built; node_names resolves the element ids.
+        """
+        def work(tx):
+            result = tx.run(f"{AUTHOR_PAPER_JOURNAL} RETURN elementId(a), elementId(p), elementId(j)")
+            interned = [{} for _ in TRIPLE_COLUMNS]
+            blocks = []
+            records = 0
+            width = len(TRIPLE_COLUMNS)
+            while values := list(chain.from_iterable(islice(result, FETCH_SIZE))):
+                records += len(values) // width
+                block = np.empty((width, len(values) // width), dtype=np.int64)
+                for i, ids in enumerate(interned):
+                    # Factorize the block, then intern only its distinct element ids
+                    local, unique = pd.factorize(np.array(values[i::width], dtype=object))
+                    block[i] = np.array([ids.setdefault(element_id, len(ids)) for element_id in unique],
+                                        dtype=np.int64)[local]
+                blocks.append(block)
+            codes = np.concatenate(blocks, axis=1) if blocks else np.empty((width, 0), dtype=np.int64)
+            if codes.shape[1] != records:
+                raise RuntimeError(f"Streamed {records} paths but collected {codes.shape[1]}")
+            return codes, [np.array(list(ids), dtype=object) for ids in interned]
+        with self.driver.session(fetch_size=FETCH_SIZE) as session:
+            codes, node_ids = session.execute_read(work)
+        return dict(zip(TRIPLE_COLUMNS, codes)), dict(zip(TRIPLE_COLUMNS, node_ids))
+
+    def node_names(self, label, ids, property='name'):
+        """The property of each element id (object array aligned with ids), looked up FETCH_SIZE ids per query"""
+        query = f"""
+            UNWIND $ids AS node_id
+            MATCH (n:{label}) WHERE elementId(n) = node_id
+            RETURN node_id, n.{property}
+        """
+        ids = np.asarray(ids, dtype=object).tolist()
+        values = np.empty(len(ids), dtype=object)
+        with self.driver.session(fetch_size=FETCH_SIZE) as session:
+            for start in range(0, len(ids), FETCH_SIZE):
+                batch = ids[start:start + FETCH_SIZE]
+                names = dict(session.run(query, ids=batch))
+                values[start:start + len(batch)] = [names.get(node_id) for node_id in batch]
+        return values
+
+    def author_degrees(self):
+        """Papers per author (authors with at least one WROTE) and their community"""
+        with self.driver.session() as session:
+            result = session.run("""
+                MATCH (a:Author)-[:WROTE]->(p:Paper)
+                RETURN a.name AS author, count(p) AS papers, a.communityId AS community
+            """)
+            data = [r.data() for r in result]
+        return pd.DataFrame({
+            'author': [r['author'] for r in data],
+            'papers': np.array([r['papers'] for r in data], dtype=np.int64),
+            'community': pd.Series([r['community'] for r in data], dtype=object),
+        })
+
+    def community_sizes(self):
+        with self.driver.session() as session:
+            result = session.run("""
+                MATCH (a:Author)
+                WHERE a.communityId IS NOT NULL
+                RETURN a.communityId AS community, count(a) AS size
+                ORDER BY size DESC
+            """)
+            data = [r.data() for r in result]
+        return pd.DataFrame(data, columns=['community', 'size'])
+
+    def graph_projection_exists(self, name):
+        """True/False if GDS is installed, None otherwise"""
+        try:
+            with self.driver.session() as session:
+                return session.run("CALL gds.graph.exists($name) YIELD exists RETURN exists",
+                                   name=name).single()['exists']
+        except Exception:
+            return None
+
+    def link_journal_years(self):
+        """Create Journal-[:PUBLISHED_IN_YEAR {paperCount}]->Year and return the counts"""
+        query = """
+        MATCH (j:Journal)<-[:PUBLISHED_IN]-(p:Paper)-[:PUBLISHED_IN_YEAR]->(y:Year)
+        WITH j, y, COUNT(p) AS paperCount
+        MERGE (j)-[r:PUBLISHED_IN_YEAR]->(y)
+        SET r.paperCount = paperCount
+        RETURN j.name AS Journal, y.value AS Year, paperCount
+        """
+        with self.driver.session() as session:
+            return [r.data() for r in session.run(query)]
+
+    def create_publication_counts(self):
+        """Replace PublicationCount nodes, one per Journal-Year link, and return them"""
+        query = """
+        MATCH (j:Journal)-[r:PUBLISHED_IN_YEAR]->(y:Year)
+        WITH j, y, r.paperCount AS count
+        MERGE (pc:PublicationCount {
+            id: j.name + '_' + y.value,
+            displayName: toString(count),
+            count: count,
+            journalName: j.name,
+            year: y.value
+        })
+        MERGE (pc)-[:IN_YEAR]->(y)
+        SET pc.count = count
+        RETURN pc.displayName AS Display, pc.journalName AS Journal,
+               pc.year AS Year, pc.count AS Count
+        """
+        with self.driver.session() as session:
+            session.run("MATCH (pc:PublicationCount) DETACH DELETE pc")
+            return [r.data() for r in session.run(query)]
+
+    def close(self):
+        self.driver.close()
+
+class InMemoryGraphStore:
+    """
+    In-process stand-in for Neo4j. Nodes get dense integer ids per label and
+    relationships are kept as parallel start/end id arrays per
+    (type, start label, end label), so reads are NumPy/pandas operations.
+    With a path the graph is loaded on open and saved on close.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.nodes = {}
+        self.edges = {}
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                self.nodes, self.edges = pickle.load(f)
+
+    def prepare(self, queries=()):
+        pass
+
+    def _node_table(self, label):
+        table = self.nodes.get(label)
+        if table is None:
+            table = self.nodes[label] = {'index': {}, 'keys': [], 'properties': []}
+        return table
+
+    def _edge_table(self, rel_type, start_label, end_label):
+        table = self.edges.get((rel_type, start_label, end_label))
+        if table is None:
+            table = self.edges[(rel_type, start_label, end_label)] = {
+                'start': array('q'), 'end': array('q'), 'index': {}, 'properties': [],
+            }
+        return table
+
+    def write(self, operations):
+        for operation in operations:
+            if operation[0] == 'nodes':
+                self.upsert_nodes(operation[1], operation[2])
+            else:
+                self.upsert_edges(*operation[1:])
+
+    def upsert_nodes(self, label, rows):
+        table = self._node_table(label)
+        index = table['index']
+        for row in rows:
+            key = node_key(label, row)
+            node_id = index.get(key)
+            if node_id is None:
+                node_id = index[key] = len(table['keys'])
+                table['keys'].append(key)
+                table['properties'].append({})
+            table['properties'][node_id].update(row)
+
+    def upsert_edges(self, rel_type, start_label, end_label, rows):
+        start_index = self._node_table(start_label)['index']
+        end_index = self._node_table(end_label)['index']
+        table = self._edge_table(rel_type, start_label, end_label)
+        for row in rows:
+            # MATCH semantics: skip rows whose endpoints do not exist
+            start = start_index.get(node_key(start_label, row['start']))
+            end = end_index.get(node_key(end_label, row['end']))
+            if start is None or end is None:
+                continue
+            edge_id = table['index'].get((start, end))
+            if edge_id is None:
+                edge_id = table['index'][(start, end)] = len(table['start'])
+                table['start'].append(start)
+                table['end'].append(end)
+                table['properties'].append({})
+            table['properties'][edge_id].update(row.get('properties', {}))
+
+    def delete_label(self, label):
+        """DETACH DELETE every node with the label"""
+        self.nodes.pop(label, None)
+        for key in [key for key in self.edges if label in key[1:]]:
+            del self.edges[key]
+
+    def _edge_arrays(self, rel_type, start_label, end_label):
+        table = self.edges.get((rel_type, start_label, end_label))
+        if table is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return (np.frombuffer(table['start'], dtype=np.int64),
+                np.frombuffer(table['end'], dtype=np.int64))
+
+    def _key_values(self, label, position=0):
+        table = self.nodes.get(label)
+        return np.array([key[position] for key in table['keys']] if table else [], dtype=object)
+
+    def count_nodes(self, label):
+        table = self.nodes.get(label)
+        return len(table['keys']) if table else 0
+
+    def count_relationships(self, rel_type):
+        return sum(len(table['start']) for key, table in self.edges.items() if key[0] == rel_type)
+
+    def author_paper_journal(self):
+        return author_paper_journal_frame(self)
+
+    def author_paper_journal_ids(self):
+        authors, papers = self._edge_arrays('WROTE', 'Author', 'Paper')
+        published, journals = self._edge_arrays('PUBLISHED_IN', 'Paper', 'Journal')
+        wrote = pd.DataFrame({'author': authors, 'paper': papers})
+        published_in = pd.DataFrame({'paper': published, 'journal': journals})
+        triples = wrote.merge(published_in, on='paper')
+        codes, node_ids = {}, {}
+        for column in TRIPLE_COLUMNS:
+            node_ids[column], codes[column] = np.unique(triples[column].to_numpy(), return_inverse=True)
+        return codes, node_ids
+
+    def node_names(self, label, ids, property='name'):
+        if property in NODE_KEYS[label]:
+            return self._key_values(label, NODE_KEYS[label].index(property))[ids]
+        properties = self.nodes[label]['properties']
+        return np.array([properties[i].get(property) for i in ids], dtype=object)
+
+    def author_degrees(self):
+        authors, _ = self._edge_arrays('WROTE', 'Author', 'Paper')
+        counts = np.bincount(authors, minlength=self.count_nodes('Author'))
+        author_ids = np.flatnonzero(counts)
+        properties = self.nodes['Author']['properties'] if 'Author' in self.nodes else []
+        return pd.DataFrame({
+            'author': self._key_values('Author')[author_ids],
+            'papers': counts[author_ids],
+            'community': pd.Series([properties[i].get('communityId') for i in author_ids], dtype=object),
+        })
+
+    def community_sizes(self):
+        properties = self.nodes['Author']['properties'] if 'Author' in self.nodes else []
+        communities = pd.Series([p.get('communityId') for p in properties], dtype=object).dropna()
+        sizes = communities.value_counts()
+        return pd.DataFrame({'community': sizes.index, 'size': sizes.to_numpy()}, columns=['community', 'size'])
+
+    def graph_projection_exists(self, name):
+        return None
+
+    def journal_year_counts(self):
+        papers, journals = self._edge_arrays('PUBLISHED_IN', 'Paper', 'Journal')
+        year_papers, years = self._edge_arrays('PUBLISHED_IN_YEAR', 'Paper', 'Year')
+        paths = pd.DataFrame({'paper': papers, 'journal': journals}).merge(
+            pd.DataFrame({'paper': year_papers, 'year': years}), on='paper')
+        return paths.groupby(['journal', 'year'], sort=False).size().reset_index(name='paperCount')
+
+    def link_journal_years(self):
+        counts = self.journal_year_counts()
+        journal_names = self._key_values('Journal')[counts['journal'].to_numpy()]
+        year_values = self._key_values('Year')[counts['year'].to_numpy()]
+        rows = [
+            {'start': {'name': journal}, 'end': {'value': year}, 'properties': {'paperCount': int(count)}}
+            for journal, year, count in zip(journal_names, year_values, counts['paperCount'])
+        ]
+        self.upsert_edges('PUBLISHED_IN_YEAR', 'Journal', 'Year', rows)
+        return [{'Journal': row['start']['name'], 'Year': row['end']['value'],
+                 'paperCount': row['properties']['paperCount']} for row in rows]
+
+    def create_publication_counts(self):
+        self.delete_label('PublicationCount')
+        table = self.edges.get(('PUBLISHED_IN_YEAR', 'Journal', 'Year'))
+        if table is None:
+            return []
+        journals, years = self._edge_arrays('PUBLISHED_IN_YEAR', 'Journal', 'Year')
+        journal_names = self._key_values('Journal')[journals]
+        year_values = self._key_values('Year')[years]
+        nodes, links, created = [], [], []
+        for journal, year, properties in zip(journal_names, year_values, table['properties']):
+            count = properties.get('paperCount')
+            node = {'id': journal + '_' + year, 'displayName': str(count), 'count': count,
+                    'journalName': journal, 'year': year}
+            nodes.append(node)
+            links.append({'start': {'id': node['id']}, 'end': {'value': year}, 'properties': {}})
+            created.append({'Display': node['displayName'], 'Journal': journal, 'Year': year, 'Count': count})
+        self.upsert_nodes('PublicationCount', nodes)
+        self.upsert_edges('IN_YEAR', 'PublicationCount', 'Year', links)
+        return created
+
+    def save(self, path=None):
+        path = path or self.path
+        with open(path, 'wb') as f:
+            pickle.dump((self.nodes, self.edges), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def close(self):
+        if self.path:
+            self.save()
@@ -1,5 +1,7 @@
-import csv
 from neo4j import GraphDatabase
+from query_stats import instrument
+from neo4j_schema import ensure_schema, check_query_plans
+from KG_v2_neo4j import aggregate_coauthorships, iter_csv_rows
 
 # Update these with your Neo4j connection details
 NEO4J_URI = "bolt://localhost:7687"
@@ -8,56 +10,102 @@ NEO4J_PASSWORD = "majorproject"
 
 CSV_PATH = "research_csv.csv"
 
-def create_graph():
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+# Author pairs written per COAUTHORED transaction
+BATCH_SIZE = 5000
+
+# Direct, weighted author-author edge (author1 < author2); weight = shared papers
+COAUTHORED_QUERY = """
+UNWIND $rows AS row
+MATCH (a:Author {name: row.author1})
+MATCH (b:Author {name: row.author2})
+MERGE (a)-[c:COAUTHORED]->(b)
+SET c.weight = row.weight, c.firstYear = row.first_year, c.lastYear = row.last_year
+"""
+
+# Lookups run for every row, checked with EXPLAIN before importing
+HOT_QUERIES = [
+    ("MERGE (j:Journal {name: $journal})", {'journal': ''}),
+    ("MERGE (p:Paper {title: $title}) SET p.document_type = $doc_type", {'title': '', 'doc_type': ''}),
+    ("MATCH (p:Paper {title: $title}), (j:Journal {name: $journal}) "
+     "MERGE (p)-[:PUBLISHED_IN]->(j)", {'title': '', 'journal': ''}),
+    ("MERGE (a:Author {name: $author})", {'author': ''}),
+    ("MATCH (a:Author {name: $author}), (p:Paper {title: $title}) "
+     "MERGE (a)-[:WROTE]->(p)", {'author': '', 'title': ''}),
+    (COAUTHORED_QUERY, {'rows': []}),
+]
+
+def write_coauthorships(tx, rows):
+    tx.run(COAUTHORED_QUERY, rows=rows).consume()
+
+def create_coauthored_edges(session, paper_authors, paper_years):
+    """
+    Replace the per-paper Coauthorship nodes with one COAUTHORED relationship
+    per author pair, computed client-side and written in UNWIND batches
+    """
+    session.run(
+        "MATCH (c:Coauthorship) "
+        "CALL { WITH c DETACH DELETE c } IN TRANSACTIONS OF 10000 ROWS"
+    ).consume()
+
+    coauthorships = aggregate_coauthorships(
+        (authors, paper_years[title]) for title, authors in paper_authors.items()
+    )
+    rows = [
+        {'author1': author1, 'author2': author2, 'weight': weight,
+         'first_year': first_year, 'last_year': last_year}
+        for (author1, author2), (weight, first_year, last_year) in coauthorships.items()
+    ]
+    for i in range(0, len(rows), BATCH_SIZE):
+        session.execute_write(write_coauthorships, rows[i:i + BATCH_SIZE])
+    print(f"Created {len(rows)} weighted COAUTHORED relationships")
+
+def create_graph(csv_file=CSV_PATH, driver=None):
+    """
+    Per-row import of the CSV, parsed and with canonical author names like
+    KG_v2_neo4j.py, followed by the COAUTHORED edges. driver is an open
+    driver with a prepared schema to use instead of connecting (closed at the end).
+    """
+    if driver is None:
+        driver = instrument(GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD)))
+        with driver.session() as session:
+            ensure_schema(session)
+            check_query_plans(session, HOT_QUERIES)
+    paper_authors = {}
+    paper_years = {}
     with driver.session() as session:
-        with open(CSV_PATH, encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                title = row["Title"].strip()
-                journal = row["Source title"].strip()
-                doc_type = row["Document Type"].strip()
-                authors = [a.strip() for a in row["Authors"].split(",") if a.strip()]
+        for authors, title, journal, doc_type, year in iter_csv_rows(csv_file):
+            paper_authors.setdefault(title, set()).update(authors)
+            paper_years.setdefault(title, year)
 
-                # Create Journal node
+            # Create Journal node
+            session.run(
+                "MERGE (j:Journal {name: $journal})",
+                journal=journal
+            )
+            # Create Paper node
+            session.run(
+                "MERGE (p:Paper {title: $title}) SET p.document_type = $doc_type",
+                title=title, doc_type=doc_type
+            )
+            # Create relationship Paper-PUBLISHED_IN->Journal
+            session.run(
+                "MATCH (p:Paper {title: $title}), (j:Journal {name: $journal}) "
+                "MERGE (p)-[:PUBLISHED_IN]->(j)",
+                title=title, journal=journal
+            )
+            # Create Author nodes and relationships
+            for author in authors:
                 session.run(
-                    "MERGE (j:Journal {name: $journal})",
-                    journal=journal
+                    "MERGE (a:Author {name: $author})",
+                    author=author
                 )
-                # Create Paper node
                 session.run(
-                    "MERGE (p:Paper {title: $title}) SET p.document_type = $doc_type",
-                    title=title, doc_type=doc_type
+                    "MATCH (a:Author {name: $author}), (p:Paper {title: $title}) "
+                    "MERGE (a)-[:WROTE]->(p)",
+                    author=author, title=title
                 )
-                # Create relationship Paper-PUBLISHED_IN->Journal
-                session.run(
-                    "MATCH (p:Paper {title: $title}), (j:Journal {name: $journal}) "
-                    "MERGE (p)-[:PUBLISHED_IN]->(j)",
-                    title=title, journal=journal
-                )
-                # Create Author nodes and relationships
-                for author in authors:
-                    session.run(
-                        "MERGE (a:Author {name: $author})",
-                        author=author
-                    )
-                    session.run(
-                        "MATCH (a:Author {name: $author}), (p:Paper {title: $title}) "
-                        "MERGE (a)-[:WROTE]->(p)",
-                        author=author, title=title
-                    )
-                # Create Coauthorship node for each paper
-                session.run(
-                    "MERGE (c:Coauthorship {title: $title, journal: $journal, document_type: $doc_type})",
-                    title=title, journal=journal, doc_type=doc_type
-                )
-                # Connect each author to the Coauthorship node
-                for author in authors:
-                    session.run(
-                        "MATCH (a:Author {name: $author}), (c:Coauthorship {title: $title}) "
-                        "MERGE (a)-[:COAUTHORED]->(c)",
-                        author=author, title=title
-                    )
+
+        create_coauthored_edges(session, paper_authors, paper_years)
     driver.close()
 
 if __name__ == "__main__":
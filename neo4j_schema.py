@@ -0,0 +1,110 @@
+from neo4j.exceptions import Neo4jError
+
+# Uniqueness constraints (each one is backed by an index Neo4j creates for it)
+CONSTRAINTS = [
+    ('author_name_unique', 'Author', 'name'),
+    ('journal_name_unique', 'Journal', 'name'),
+    ('document_type_unique', 'DocumentType', 'type'),
+    ('year_value_unique', 'Year', 'value'),
+    ('publication_count_id_unique', 'PublicationCount', 'id'),
+]
+
+# Plain lookup indexes. Paper.title cannot be unique: KG_v2_neo4j.py creates
+# one Paper per (title, year) and the dataset has titles published twice.
+INDEXES = [
+    ('paper_title', 'Paper', ('title',)),
+    ('paper_title_year', 'Paper', ('title', 'year')),
+]
+
+# Plan operators that mean a MATCH/MERGE is not using an index
+SCAN_OPERATORS = ('NodeByLabelScan', 'AllNodesScan')
+
+def ensure_schema(session):
+    """
+    Create the constraints and indexes used by the importers (if missing)
+    and wait until they are online. Returns the list of missing entries.
+    """
+    for name, label, prop in CONSTRAINTS:
+        try:
+            session.run(
+                f"CREATE CONSTRAINT {name} IF NOT EXISTS "
+                f"FOR (n:{label}) REQUIRE n.{prop} IS UNIQUE"
+            ).consume()
+        except Neo4jError as e:
+            # e.g. an older plain index on the same property, or duplicate values
+            print(f"⚠ Could not create constraint {name}: {e.message}")
+            print(f"  Falling back to a lookup index on :{label}({prop})")
+            session.run(
+                f"CREATE INDEX {name} IF NOT EXISTS FOR (n:{label}) ON (n.{prop})"
+            ).consume()
+
+    for name, label, props in INDEXES:
+        properties = ', '.join(f"n.{prop}" for prop in props)
+        session.run(
+            f"CREATE INDEX {name} IF NOT EXISTS FOR (n:{label}) ON ({properties})"
+        ).consume()
+
+    session.run("CALL db.awaitIndexes(300)").consume()
+    return verify_schema(session)
+
+def verify_schema(session):
+    """Check that every required property has an ONLINE index and print the result"""
+    online = set()
+    result = session.run("""
+        SHOW INDEXES YIELD labelsOrTypes, properties, state
+        WHERE state = 'ONLINE' AND labelsOrTypes IS NOT NULL
+        RETURN labelsOrTypes, properties
+    """)
+    for record in result:
+        for label in record['labelsOrTypes']:
+            online.add((label, tuple(record['properties'])))
+
+    unique = set()
+    result = session.run("""
+        SHOW CONSTRAINTS YIELD labelsOrTypes, properties, type
+        WHERE type IN ['UNIQUENESS', 'NODE_PROPERTY_UNIQUENESS']
+        RETURN labelsOrTypes, properties
+    """)
+    for record in result:
+        for label in record['labelsOrTypes']:
+            unique.add((label, tuple(record['properties'])))
+
+    missing = []
+    for name, label, prop in CONSTRAINTS:
+        if (label, (prop,)) not in online:
+            missing.append(f":{label}({prop})")
+        elif (label, (prop,)) not in unique:
+            print(f"⚠ :{label}({prop}) is indexed but not unique")
+    for name, label, props in INDEXES:
+        if (label, tuple(props)) not in online:
+            missing.append(f":{label}({', '.join(props)})")
+
+    if missing:
+        print("⚠ Missing indexes:", ', '.join(missing))
+    else:
+        print(f"✓ Schema ready ({len(CONSTRAINTS)} constraints, {len(INDEXES)} indexes online)")
+    return missing
+
+def plan_operators(plan):
+    """Yield every operator type in an EXPLAIN plan tree"""
+    yield plan['operatorType']
+    for child in plan.get('children', []):
+        yield from plan_operators(child)
+
+def check_query_plans(session, queries):
+    """
+    EXPLAIN each (query, parameters) pair and report queries whose plan
+    falls back to a label or all-nodes scan. Returns the offending queries.
+    """
+    scanning = []
+    for query, parameters in queries:
+        summary = session.run("EXPLAIN " + query, parameters).consume()
+        operators = list(plan_operators(summary.plan))
+        scans = [op for op in operators if op.startswith(SCAN_OPERATORS)]
+        if scans:
+            scanning.append(query)
+            print(f"⚠ Query plan uses {', '.join(scans)}:")
+            print("  " + ' '.join(query.split()))
+    if not scanning:
+        print(f"✓ All {len(queries)} hot importer queries use index lookups")
+    return scanning
@@ -1,30 +1,26 @@
 import pandas as pd
 import networkx as nx
 import matplotlib.pyplot as plt
-from collections import defaultdict
 import json
 import math
+from csv_stream import CHUNK_SIZE, publication_year_counts
+from columnar_dataset import load_dataset
 
-# Read the CSV file
+# Use the prepared dataset (prepare_dataset.py) if up to date, else read the CSV in chunks of CHUNK_SIZE rows
 csv_file = "research_csv.csv"
-df = pd.read_csv(csv_file, encoding='ISO-8859-1')
+dataset = load_dataset(csv_file)
 
-print(f"Loaded {len(df)} papers from {csv_file}\n")
+# Dictionary to store publication-year-paper counts
+if dataset is not None:
+    pub_year_counts, papers_loaded = dataset.publication_year_counts()
+else:
+    pub_year_counts, papers_loaded = publication_year_counts(csv_file, CHUNK_SIZE)
+
+print(f"Loaded {papers_loaded} papers from {csv_file}\n")
 
 # Create a graph: Year -> Count nodes (where count represents paper count)
 G = nx.DiGraph()
 
-# Dictionary to store publication-year-paper counts
-pub_year_counts = defaultdict(lambda: defaultdict(int))
-
-# Process each paper
-for index, row in df.iterrows():
-    journal = str(row['Source title']).strip()
-    year = str(row['Year']).strip()
-    
-    # Count papers per publication per year
-    pub_year_counts[year][journal] += 1
-
 # Create nodes and edges
 count_node_details = []
 
@@ -1,57 +1,195 @@
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import tracemalloc
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
-from neo4j import GraphDatabase
+from scipy import sparse
+from graph_store import open_graph_store, InMemoryGraphStore
 from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.preprocessing import MultiLabelBinarizer
+from sklearn.preprocessing import MultiLabelBinarizer, normalize
 from itertools import combinations
 import numpy as np
+from KG_v2_neo4j import csv_file, import_csv_to_store
 
 # Neo4j connection details
 NEO4J_URI = "bolt://localhost:7687"
 NEO4J_USER = "neo4j"
 NEO4J_PASSWORD = "majorproject"
 
-def fetch_author_paper_journal():
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-    query = """
-    MATCH (a:Author)-[:WROTE]->(p:Paper)-[:PUBLISHED_IN]->(j:Journal)
-    RETURN a.name AS author, p.title AS paper, j.name AS journal
-    """
-    with driver.session() as session:
-        result = session.run(query)
-        data = [r.data() for r in result]
-    driver.close()
-    return pd.DataFrame(data)
+# Keep only each author's TOP_K best-scoring partners and/or the TOP_N best pairs
+# overall scoring above MIN_SCORE. Both None writes every author pair (n(n-1)/2 rows).
+TOP_K = None
+TOP_N = None
+MIN_SCORE = 0.0
+# Top-k mode scores authors in row tiles sized so that all tiles in flight stay
+# within MEMORY_BUDGET_MB, across WORKERS processes
+MEMORY_BUDGET_MB = 256
+WORKERS = os.cpu_count() or 1
+# Measured peak bytes per candidate entry while a tile is scored and ranked (about 60)
+BYTES_PER_CANDIDATE = 128
+# Leave out pairs who already wrote a paper together (only new links are predicted)
+EXCLUDE_COAUTHORS = True
+# Add common neighbours, Adamic-Adar, resource allocation and preferential
+# attachment over the coauthor graph as columns of the predictions
+TOPOLOGICAL_SCORES = True
+
+# Incremental mode (needs TOP_K): the feature matrix, author index and each
+# author's ranked partners are kept in STATE_DIR, and a run only rescores the
+# authors whose paper/journal sets changed. Lists hold LIST_DEPTH * TOP_K
+# partners so most unchanged authors can be patched without rescoring.
+INCREMENTAL = False
+STATE_DIR = 'link_prediction_state'
+LIST_DEPTH = 2
+
+# Top-k candidates: 'exact' scores every pair sharing a feature, 'lsh' only pairs
+# whose MinHash signatures (LSH_BANDS * LSH_ROWS hashes) agree on a whole band.
+# More bands or fewer rows per band raise recall and the number of pairs scored.
+CANDIDATES = 'exact'
+LSH_BANDS = 32
+LSH_ROWS = 1
+# Bucket members each author is paired with, bounding the cost of crowded buckets
+LSH_MAX_BUCKET = 100
+MINHASH_PRIME = (1 << 31) - 1
+
+def fetch_author_paper_journal(store=None):
+    own_store = store is None
+    if own_store:
+        store = open_graph_store(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    df = store.author_paper_journal()
+    if own_store:
+        store.close()
+    return df
 
 def build_feature_matrix(df):
     # Each author: set of papers and journals
     author_papers = df.groupby('author')['paper'].apply(set)
     author_journals = df.groupby('author')['journal'].apply(set)
-    # One-hot encode papers and journals
-    mlb_paper = MultiLabelBinarizer()
-    mlb_journal = MultiLabelBinarizer()
+    # One-hot encode papers and journals (sparse: one stored entry per author-paper / author-journal pair)
+    mlb_paper = MultiLabelBinarizer(sparse_output=True)
+    mlb_journal = MultiLabelBinarizer(sparse_output=True)
     paper_matrix = mlb_paper.fit_transform(author_papers)
     journal_matrix = mlb_journal.fit_transform(author_journals)
     # Concatenate features
-    feature_matrix = np.hstack([paper_matrix, journal_matrix])
+    feature_matrix = sparse.hstack([paper_matrix, journal_matrix], format='csr')
     authors = author_papers.index.tolist()
     return feature_matrix, authors
 
-def compute_similarity_table(feature_matrix, authors):
-    # Cosine similarity
-    cos_sim = cosine_similarity(feature_matrix)
-    # Jaccard similarity (for binary vectors)
+def coauthor_adjacency(df, authors):
+    """Sparse boolean authors x authors matrix of existing coauthorships (a shared paper)"""
+    author_codes = pd.Categorical(df['author'], categories=authors).codes
+    paper_codes, papers = pd.factorize(df['paper'])
+    incidence = sparse.csr_matrix((np.ones(len(df), dtype=np.int64), (author_codes, paper_codes)),
+                                  shape=(len(authors), len(papers)))
+    adjacency = (incidence @ incidence.T).tocsr() != 0
+    adjacency.setdiag(False)
+    adjacency.eliminate_zeros()
+    return adjacency
+
+def pair_keys(adjacency):
+    """Sorted row * n + column keys of the nonzero entries, for searchsorted lookups"""
+    coo = adjacency.tocoo()
+    return np.sort(coo.row.astype(np.int64) * adjacency.shape[0] + coo.col)
+
+def search_keys(sorted_keys, keys):
+    """Position of each key in sorted_keys and whether it is there"""
+    position = np.minimum(np.searchsorted(sorted_keys, keys), max(len(sorted_keys) - 1, 0))
+    found = sorted_keys[position] == keys if len(sorted_keys) else np.zeros(len(keys), dtype=bool)
+    return position, found
+
+def contains(sorted_keys, keys):
+    return search_keys(sorted_keys, keys)[1]
+
+def topological_scores(coauthors):
+    """
+    Link-prediction scores over the coauthor graph for its two-hop pairs:
+    common neighbours A², Adamic-Adar A·diag(1/log d)·A and resource
+    allocation A·D⁻¹·A, as sparse matrices of the same pattern (diagonal
+    removed), plus the degree vector for preferential attachment d_i·d_j.
+    Memory follows the number of two-hop pairs.
+    """
+    adjacency = coauthors.astype(np.float64).tocsr()
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    # A common neighbour is adjacent to both authors, so its degree is at least 2
+    adamic_weights = np.zeros(len(degree))
+    adamic_weights[degree > 1] = 1 / np.log(degree[degree > 1])
+    resource_weights = np.zeros(len(degree))
+    resource_weights[degree > 0] = 1 / degree[degree > 0]
+
+    scores = {}
+    for name, middle in (('common_neighbours', None), ('adamic_adar', adamic_weights),
+                         ('resource_allocation', resource_weights)):
+        left = adjacency if middle is None else adjacency.multiply(middle[None, :]).tocsr()
+        product = (left @ adjacency).tocsr()
+        product.setdiag(0)
+        product.eliminate_zeros()
+        product.sort_indices()
+        scores[name] = product
+    return scores, degree
+
+def add_topological_scores(table, authors, coauthors):
+    """Adds the topological_scores columns for the table's pairs (0 for pairs more than two hops apart)"""
+    n = len(authors)
+    scores, degree = topological_scores(coauthors)
+    first = pd.Categorical(table['author1'], categories=authors).codes.astype(np.int64)
+    second = pd.Categorical(table['author2'], categories=authors).codes.astype(np.int64)
+    wanted = first * n + second
+    for name, product in scores.items():
+        # product has sorted indices, so its keys come out already in the order of product.data
+        position, found = search_keys(pair_keys(product), wanted)
+        values = np.zeros(len(wanted))
+        values[found] = product.data[position[found]]
+        table[name] = values
+    table['common_neighbours'] = table['common_neighbours'].astype(np.int64)
+    table['preferential_attachment'] = (degree[first] * degree[second]).astype(np.int64)
+    return table
+
+def jaccard_similarity_loop(feature_matrix):
+    """Reference pairwise Jaccard, one Python-level comparison per (i, j)"""
+    if sparse.issparse(feature_matrix):
+        feature_matrix = feature_matrix.toarray()
     def jaccard(u, v):
         intersection = np.logical_and(u, v).sum()
         union = np.logical_or(u, v).sum()
         return intersection / union if union > 0 else 0
-    jac_sim = np.zeros_like(cos_sim)
-    for i in range(len(authors)):
-        for j in range(len(authors)):
+    n = feature_matrix.shape[0]
+    jac_sim = np.zeros((n, n))
+    for i in range(n):
+        for j in range(n):
             jac_sim[i, j] = jaccard(feature_matrix[i], feature_matrix[j])
+    return jac_sim
+
+def jaccard_similarity(feature_matrix):
+    """
+    Pairwise Jaccard of the rows' nonzero sets: |A ∩ B| is the sparse product
+    X·Xᵀ of the binarized rows and |A ∪ B| = |A| + |B| - |A ∩ B|.
+    Same values as jaccard_similarity_loop.
+    """
+    binary = (sparse.csr_matrix(feature_matrix) != 0).astype(np.int64)
+    intersection = (binary @ binary.T).toarray()
+    cardinality = np.asarray(binary.sum(axis=1)).ravel()
+    union = cardinality[:, None] + cardinality[None, :] - intersection
+    jac_sim = np.zeros(intersection.shape)
+    np.divide(intersection, union, out=jac_sim, where=union > 0)
+    return jac_sim
+
+def compute_similarity_table(feature_matrix, authors, coauthors=None):
+    # Cosine similarity
+    cos_sim = cosine_similarity(feature_matrix)
+    # Jaccard similarity (for binary vectors)
+    jac_sim = jaccard_similarity(feature_matrix)
     # Average similarity
     avg_sim = (cos_sim + jac_sim) / 2
     # Build table for possible future links (exclude existing coauthorships)
     pairs = list(combinations(range(len(authors)), 2))
+    if coauthors is not None:
+        first, second = np.triu_indices(len(authors), k=1)
+        new = ~np.asarray(coauthors[first, second]).ravel()
+        pairs = list(zip(first[new].tolist(), second[new].tolist()))
     rows = []
     for i, j in pairs:
         rows.append({
@@ -63,13 +201,630 @@ def compute_similarity_table(feature_matrix, authors):
         })
     return pd.DataFrame(rows)
 
-def main():
-    df = fetch_author_paper_journal()
+def tile_scores(normalized, binary, cardinality, start, end):
+    """
+    (row, column, cosine, jaccard, average) for the pairs of authors start..end-1
+    that share at least one feature; all others score 0. Values equal the
+    corresponding entries of compute_similarity_table.
+    """
+    return row_scores(normalized, binary, cardinality, np.arange(start, end))
+
+def row_scores(normalized, binary, cardinality, row_ids):
+    """tile_scores for any sorted array of author rows"""
+    cosine = (normalized[row_ids] @ normalized.T).tocsr()
+    intersection = (binary[row_ids] @ binary.T).tocsr()
+    cosine.sort_indices()
+    intersection.sort_indices()
+    rows = np.repeat(row_ids, np.diff(intersection.indptr))
+    columns = intersection.indices
+    union = cardinality[rows] + cardinality[columns] - intersection.data
+    jaccard = intersection.data / union
+    return rows, columns, cosine.data, jaccard, (cosine.data + jaccard) / 2
+
+def tile_bounds(binary, memory_budget_mb=MEMORY_BUDGET_MB, workers=WORKERS):
+    """
+    (start, end) row tiles whose candidate entries fit the memory budget. A
+    row's entries in X·Xᵀ are at most the summed degrees of its features, so
+    tiles are cut where that running sum reaches the per-tile share of the
+    budget (2 * workers tiles are in flight). A row alone over budget is its own tile.
+    """
+    degree = np.asarray(binary.sum(axis=0)).ravel()
+    per_tile = max(memory_budget_mb * 1e6 / BYTES_PER_CANDIDATE / (2 * workers), 1)
+    return row_bounds(np.cumsum(binary @ degree), per_tile)
+
+def row_bounds(work, per_tile):
+    """(start, end) row ranges cut where the running sum work reaches per_tile"""
+    bounds = []
+    start = 0
+    n = len(work)
+    while start < n:
+        base = work[start - 1] if start else 0
+        end = max(int(np.searchsorted(work, base + per_tile, side='right')), start + 1)
+        bounds.append((start, min(end, n)))
+        start = end
+    return bounds
+
+def select_candidates(rows, columns, cos, jac, avg, n, k, min_score, coauthor_keys):
+    """
+    Candidates above min_score that are not existing coauthors, cut to each
+    row's best k. rows must hold every candidate of the rows they contain.
+    """
+    # Without a per-author limit every pair is taken from its lower-numbered author only
+    keep = (avg > min_score) & ((columns > rows) if k is None else (columns != rows))
+    if coauthor_keys is not None:
+        keep &= ~contains(coauthor_keys, rows.astype(np.int64) * n + columns)
+    rows, columns, cos, jac, avg = rows[keep], columns[keep], cos[keep], jac[keep], avg[keep]
+    if k is not None:
+        # Best k per row: order by row, then score descending, then column
+        order = np.lexsort((columns, -avg, rows))
+        rows, columns, cos, jac, avg = rows[order], columns[order], cos[order], jac[order], avg[order]
+        first = np.searchsorted(rows, rows)
+        keep = np.arange(len(rows)) - first < k
+        rows, columns, cos, jac, avg = rows[keep], columns[keep], cos[keep], jac[keep], avg[keep]
+    return rows, columns, cos, jac, avg
+
+# Matrices and settings of the current top-k run, set in each worker by init_tile_worker
+_tile_context = {}
+
+def init_tile_worker(context):
+    _tile_context.update(context)
+
+def score_tile(start, end):
+    """Selected candidates of authors start..end-1 (runs in a worker process)"""
+    c = _tile_context
+    scores = tile_scores(c['normalized'], c['binary'], c['cardinality'], start, end)
+    return select_candidates(*scores, c['n'], c['k'], c['min_score'], c['coauthor_keys'])
+
+def exact_candidates(context, bounds, workers=WORKERS):
+    """Selected candidates per tile, in tile order; with workers > 1 tiles run in a process pool"""
+    if workers <= 1:
+        init_tile_worker(context)
+        for start, end in bounds:
+            yield score_tile(start, end)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_tile_worker, initargs=(context,)) as pool:
+        pending = deque()
+        for start, end in bounds:
+            pending.append(pool.submit(score_tile, start, end))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def pair_scores(normalized, binary, cardinality, first, second):
+    """(cosine, jaccard, average) of the author pairs (first[i], second[i])"""
+    cosine = np.asarray(normalized[first].multiply(normalized[second]).sum(axis=1)).ravel()
+    intersection = np.asarray(binary[first].multiply(binary[second]).sum(axis=1)).ravel()
+    jaccard = intersection / (cardinality[first] + cardinality[second] - intersection)
+    return cosine, jaccard, (cosine + jaccard) / 2
+
+def sorted_unique(keys):
+    """np.unique for large int64 arrays via one sort (faster than its hash-based path here)"""
+    keys = np.sort(keys)
+    return keys[np.r_[True, keys[1:] != keys[:-1]]] if len(keys) else keys
+
+def minhash_signatures(binary, num_perm, seed=0):
+    """
+    n x num_perm MinHash signatures of the rows' feature sets, one universal
+    hash (a * x + b) mod p per permutation. Rows without features keep p.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, MINHASH_PRIME, num_perm)
+    b = rng.integers(0, MINHASH_PRIME, num_perm)
+    signatures = np.full((binary.shape[0], num_perm), MINHASH_PRIME, dtype=np.int64)
+    nonempty = np.diff(binary.indptr) > 0
+    starts = binary.indptr[:-1][nonempty]
+    features = binary.indices.astype(np.int64)
+    for p in range(num_perm):
+        signatures[nonempty, p] = np.minimum.reduceat((a[p] * features + b[p]) % MINHASH_PRIME, starts)
+    return signatures
+
+def lsh_candidate_pairs(signatures, bands=LSH_BANDS, rows=LSH_ROWS, max_bucket=LSH_MAX_BUCKET):
+    """
+    Sorted i * n + j keys (i < j) of authors whose signatures agree on all
+    rows of at least one band. Within a bucket each author is paired with
+    the next max_bucket - 1 members, so a huge bucket costs O(size) pairs.
+    """
+    n = signatures.shape[0]
+    usable = np.flatnonzero(signatures[:, 0] != MINHASH_PRIME)
+    keys = np.empty(0, dtype=np.int64)
+    for band in range(bands):
+        bucket = np.zeros(len(usable), dtype=np.uint64)
+        for column in range(band * rows, (band + 1) * rows):
+            bucket = bucket * np.uint64(0x100000001B3) + signatures[usable, column].astype(np.uint64)
+        order = np.argsort(bucket, kind='stable')
+        bucket = bucket[order]
+        found = []
+        for offset in range(1, max_bucket):
+            same = bucket[offset:] == bucket[:-offset]
+            if not same.any():
+                break
+            first, second = usable[order[:-offset][same]], usable[order[offset:][same]]
+            found.append(np.minimum(first, second).astype(np.int64) * n + np.maximum(first, second))
+        keys = sorted_unique(np.concatenate([keys] + found))
+    return keys
+
+def lsh_candidate_scores(normalized, binary, cardinality, bands=LSH_BANDS, rows=LSH_ROWS,
+                         max_bucket=LSH_MAX_BUCKET, memory_budget_mb=MEMORY_BUDGET_MB):
+    """
+    Exact scores of the LSH candidate pairs, one chunk per range of authors,
+    holding both directions of each of their pairs so every author's
+    candidates are complete for the per-author selection. Ranges are cut so
+    a chunk's candidates fit memory_budget_mb; only the candidate keys are
+    held for the whole run.
+    """
+    n = binary.shape[0]
+    keys = lsh_candidate_pairs(minhash_signatures(binary, bands * rows), bands, rows, max_bucket)
+    first, second = np.divmod(keys, n)
+    # keys are sorted by first; by_second lists the same pairs sorted by second
+    by_second = np.argsort(second, kind='stable')
+    sorted_second = second[by_second]
+    degree = np.bincount(first, minlength=n) + np.bincount(second, minlength=n)
+    per_chunk = max(memory_budget_mb * 1e6 / BYTES_PER_CANDIDATE, 1)
+    for start, end in row_bounds(np.cumsum(degree), per_chunk):
+        low, high = np.searchsorted(first, (start, end))
+        forward = (first[low:high], second[low:high])
+        scores = pair_scores(normalized, binary, cardinality, *forward)
+        # first < second, so a pair seen from its second author has its first in
+        # this range (scored above) or before it (scored again here)
+        inner = forward[1] < end
+        earlier = by_second[slice(*np.searchsorted(sorted_second, (start, end)))]
+        earlier = earlier[first[earlier] < start]
+        earlier_scores = pair_scores(normalized, binary, cardinality, second[earlier], first[earlier])
+        if high > low or len(earlier):
+            yield (np.concatenate([forward[0], forward[1][inner], second[earlier]]),
+                   np.concatenate([forward[1], forward[0][inner], first[earlier]]),
+                   *(np.concatenate([values, values[inner], more]) for values, more in zip(scores, earlier_scores)))
+
+def top_k_similarity_table(feature_matrix, authors, k=TOP_K, top_n=TOP_N, min_score=MIN_SCORE,
+                           coauthors=None, candidates=CANDIDATES, lsh_bands=LSH_BANDS, lsh_rows=LSH_ROWS,
+                           memory_budget_mb=MEMORY_BUDGET_MB, workers=WORKERS):
+    """
+    Same columns as compute_similarity_table, for the best pairs only: each
+    author's k highest-scoring partners (k=None: all partners) and, with
+    top_n, the top_n pairs overall. Only pairs scoring above min_score and
+    sharing a feature are candidates. With candidates='exact' scores come
+    from sparse products over row tiles sized by tile_bounds from
+    memory_budget_mb, scored and ranked in a pool of workers processes, so
+    no n x n matrix is ever allocated; with 'lsh' only pairs sharing a
+    MinHash LSH bucket are scored (approximate, linear in the number of
+    authors), in chunks sized from the same budget. Pairs in the coauthors
+    adjacency are dropped before ranking.
+    """
+    n = len(authors)
+    binary = (sparse.csr_matrix(feature_matrix) != 0).astype(np.int64)
+    normalized = normalize(sparse.csr_matrix(feature_matrix, dtype=np.float64))
+    cardinality = np.asarray(binary.sum(axis=1)).ravel()
+    coauthor_keys = pair_keys(coauthors) if coauthors is not None else None
+    if candidates == 'lsh':
+        chunks = (select_candidates(*scores, n, k, min_score, coauthor_keys)
+                  for scores in lsh_candidate_scores(normalized, binary, cardinality, lsh_bands, lsh_rows,
+                                                      memory_budget_mb=memory_budget_mb))
+    else:
+        context = {'normalized': normalized, 'binary': binary, 'cardinality': cardinality,
+                   'n': n, 'k': k, 'min_score': min_score, 'coauthor_keys': coauthor_keys}
+        chunks = exact_candidates(context, tile_bounds(binary, memory_budget_mb, workers), workers)
+
+    def merge(parts):
+        # A pair picked by both of its authors is kept once
+        keys, index = np.unique(np.concatenate([part[0] for part in parts]), return_index=True)
+        scores = [np.concatenate([part[i] for part in parts])[index] for i in (1, 2, 3)]
+        if top_n is not None and len(keys) > top_n:
+            best = np.sort(np.argpartition(-scores[2], top_n - 1)[:top_n])
+            keys = keys[best]
+            scores = [values[best] for values in scores]
+        return [(keys, *scores)]
+
+    parts = [(np.empty(0, dtype=np.int64), np.empty(0), np.empty(0), np.empty(0))]
+    held = 0
+    for rows, columns, cos, jac, avg in chunks:
+        parts.append((np.minimum(rows, columns).astype(np.int64) * n + np.maximum(rows, columns), cos, jac, avg))
+        held += len(rows)
+        if top_n is not None and held > 2 * top_n:
+            parts = merge(parts)
+            held = len(parts[0][0])
+    keys, *scores = merge(parts)[0]
+
+    authors = np.asarray(authors, dtype=object)
+    table = pd.DataFrame({
+        'author1': authors[keys // n],
+        'author2': authors[keys % n],
+        'cosine_similarity': scores[0],
+        'jaccard_similarity': scores[1],
+        'average_score': scores[2],
+    })
+    return table.sort_values('average_score', ascending=False, kind='stable', ignore_index=True)
+
+def author_feature_incidence(df, authors=(), features=()):
+    """
+    Binary authors x features CSR matrix of df (features are 'paper:<title>'
+    and 'journal:<name>'). Known authors and features keep their index; new
+    ones are appended in sorted order. Returns (binary, authors, features).
+    """
+    row_features = [('paper:' + df['paper'].astype(str)).to_numpy(), ('journal:' + df['journal'].astype(str)).to_numpy()]
+    authors = pd.Index(authors, dtype=object)
+    authors = authors.append(pd.Index(np.sort(df['author'][~df['author'].isin(authors)].unique()), dtype=object))
+    features = pd.Index(features, dtype=object)
+    found = pd.unique(np.concatenate(row_features))
+    features = features.append(pd.Index(np.sort(found[~pd.Index(found).isin(features)]), dtype=object))
+    author_codes = np.tile(authors.get_indexer(df['author']), 2)
+    feature_codes = np.concatenate([features.get_indexer(values) for values in row_features])
+    binary = sparse.csr_matrix((np.ones(len(author_codes), dtype=np.int64), (author_codes, feature_codes)),
+                               shape=(len(authors), len(features)))
+    binary = (binary != 0).astype(np.int64)
+    binary.sort_indices()
+    return binary, authors.tolist(), features.tolist()
+
+def rank_within(owners):
+    """Position of every entry within its owner's run (owners sorted)"""
+    return np.arange(len(owners)) - np.searchsorted(owners, owners)
+
+def ranked_lists(row_ids, normalized, binary, cardinality, depth, min_score, coauthor_keys):
+    """
+    Every candidate of row_ids (sorted by owner, score descending, partner)
+    and the first depth of them per owner, with complete = fewer than depth.
+    """
+    n = binary.shape[0]
+    every = select_candidates(*row_scores(normalized, binary, cardinality, row_ids), n, n, min_score, coauthor_keys)
+    keep = rank_within(every[0]) < depth
+    counts = np.bincount(every[0][keep], minlength=n)[row_ids]
+    return every, tuple(values[keep] for values in every), counts < depth, counts
+
+def build_prediction_state(df, k, depth=LIST_DEPTH, min_score=MIN_SCORE, exclude=EXCLUDE_COAUTHORS,
+                           memory_budget_mb=MEMORY_BUDGET_MB, workers=WORKERS):
+    """Features, author index and every author's depth * k best partners, scored from scratch"""
+    binary, authors, features = author_feature_incidence(df)
+    n = len(authors)
+    normalized = normalize(binary.astype(np.float64))
+    cardinality = np.asarray(binary.sum(axis=1)).ravel()
+    coauthor_keys = pair_keys(coauthor_adjacency(df, authors)) if exclude else None
+    context = {'normalized': normalized, 'binary': binary, 'cardinality': cardinality,
+               'n': n, 'k': depth * k, 'min_score': min_score, 'coauthor_keys': coauthor_keys}
+    parts = list(exact_candidates(context, tile_bounds(binary, memory_budget_mb, workers), workers))
+    lists = tuple(np.concatenate([part[i] for part in parts]) for i in range(5))
+    counts = np.bincount(lists[0], minlength=n)
+    return {
+        'settings': {'k': k, 'depth': depth, 'min_score': min_score, 'exclude': exclude},
+        'authors': authors, 'features': features, 'binary': binary, 'lists': lists,
+        'complete': counts < depth * k,
+        # Leading entries of each list known to be the true best partners
+        'certified': counts,
+    }
+
+def update_prediction_state(state, df):
+    """
+    Bring state up to date with df, rescoring only what changed: authors
+    whose feature rows differ (new, changed or gone) get their row rescored
+    and their list rebuilt. Every other author's list drops those authors
+    and merges in their new scores, which the rescored rows already hold.
+    Only a list whose certified prefix falls below k while partners beyond
+    its depth are unknown is rescored in full. Returns the changed authors.
+    """
+    settings = state['settings']
+    k, depth = settings['k'], settings['depth'] * settings['k']
+    binary, authors, features = author_feature_incidence(df, state['authors'], state['features'])
+    n, n_old = len(authors), len(state['authors'])
+    old = state['binary'].copy()
+    old.resize(binary.shape)
+    changed = np.flatnonzero((binary != old).getnnz(axis=1))
+    normalized = normalize(binary.astype(np.float64))
+    cardinality = np.asarray(binary.sum(axis=1)).ravel()
+    coauthor_keys = pair_keys(coauthor_adjacency(df, authors)) if settings['exclude'] else None
+    score = lambda rows: ranked_lists(rows, normalized, binary, cardinality, depth, settings['min_score'], coauthor_keys)
+
+    complete = np.concatenate([state['complete'], np.ones(n - n_old, dtype=bool)])
+    certified = np.concatenate([state['certified'], np.zeros(n - n_old, dtype=np.int64)])
+    owner, partner, cos, jac, avg = state['lists']
+    is_changed = np.zeros(n, dtype=bool)
+    is_changed[changed] = True
+
+    every, changed_lists, changed_complete, changed_counts = score(changed)
+    complete[changed], certified[changed] = changed_complete, changed_counts
+    # The rescored rows seen from the other side: new entries for unchanged owners
+    incoming = ~is_changed[every[1]]
+    incoming = (every[1][incoming], every[0][incoming], *(values[incoming] for values in every[2:]))
+
+    affected = np.zeros(n, dtype=bool)
+    affected[owner[is_changed[partner]]] = True
+    affected[incoming[0]] = True
+    affected &= ~is_changed
+    kept = affected[owner] & ~is_changed[partner]
+    certain = (rank_within(owner) < certified[owner]) | complete[owner]
+    merged = tuple(np.concatenate([values[kept], new]) for values, new in zip((owner, partner, cos, jac, avg), incoming))
+    certain = np.r_[certain[kept], np.zeros(len(incoming[0]), dtype=bool)]
+    order = np.lexsort((merged[1], -merged[4], merged[0]))
+    merged = tuple(values[order] for values in merged)
+    certain = certain[order]
+    rank = rank_within(merged[0])
+    # Everything up to the last previously certified entry is certain; later
+    # entries may rank below partners that were never stored
+    last_certain = np.full(n, -1)
+    np.maximum.at(last_certain, merged[0][certain], rank[certain])
+    owners = np.flatnonzero(affected)
+    counts = np.bincount(merged[0], minlength=n)[owners]
+    certified[owners] = np.minimum(np.where(complete[owners], counts, last_certain[owners] + 1), depth)
+    complete[owners] &= counts < depth
+    keep = rank < depth
+    merged = tuple(values[keep] for values in merged)
+
+    # Lists that can no longer certify k partners are rescored in full
+    stale = owners[~complete[owners] & (certified[owners] < k)]
+    _, stale_lists, stale_complete, stale_counts = score(stale)
+    complete[stale], certified[stale] = stale_complete, stale_counts
+    is_stale = np.zeros(n, dtype=bool)
+    is_stale[stale] = True
+    merged_keep = ~is_stale[merged[0]]
+
+    untouched = ~affected[owner] & ~is_changed[owner]
+    pieces = [tuple(values[untouched] for values in (owner, partner, cos, jac, avg)),
+              tuple(values[merged_keep] for values in merged), changed_lists, stale_lists]
+    lists = tuple(np.concatenate([piece[i] for piece in pieces]) for i in range(5))
+    order = np.argsort(lists[0], kind='stable')
+    state.update({
+        'authors': authors, 'features': features, 'binary': binary,
+        'lists': tuple(values[order] for values in lists),
+        'complete': complete, 'certified': certified,
+    })
+    print(f"✓ {len(changed)} authors changed, {len(owners)} rankings patched, {len(stale)} rescored in full")
+    return changed
+
+def state_table(state):
+    """Prediction table of the state's lists: each author's k best partners, pairs kept once"""
+    authors = np.asarray(state['authors'], dtype=object)
+    n = len(authors)
+    owner, partner, cos, jac, avg = state['lists']
+    best = rank_within(owner) < state['settings']['k']
+    pairs = np.minimum(owner[best], partner[best]).astype(np.int64) * n + np.maximum(owner[best], partner[best])
+    keys, index = np.unique(pairs, return_index=True)
+    table = pd.DataFrame({
+        'author1': authors[keys // n],
+        'author2': authors[keys % n],
+        'cosine_similarity': cos[best][index],
+        'jaccard_similarity': jac[best][index],
+        'average_score': avg[best][index],
+    })
+    return table.sort_values('average_score', ascending=False, kind='stable', ignore_index=True)
+
+def save_prediction_state(state, state_dir=STATE_DIR):
+    """Write the state to a temporary directory next to state_dir, then swap it in"""
+    parent = os.path.dirname(os.path.abspath(state_dir))
+    temp_dir = tempfile.mkdtemp(dir=parent, prefix='.link_prediction_state_')
+    try:
+        with open(os.path.join(temp_dir, 'index.json'), 'w', encoding='utf-8') as f:
+            json.dump({'settings': state['settings'], 'authors': state['authors'], 'features': state['features']},
+                      f, ensure_ascii=False)
+        sparse.save_npz(os.path.join(temp_dir, 'features.npz'), state['binary'])
+        np.savez(os.path.join(temp_dir, 'rankings.npz'), *state['lists'],
+                 complete=state['complete'], certified=state['certified'])
+        if os.path.exists(state_dir):
+            shutil.rmtree(state_dir)
+        os.replace(temp_dir, state_dir)
+    except BaseException:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+
+def load_prediction_state(state_dir=STATE_DIR):
+    """The saved state, or None if there is none"""
+    if not os.path.exists(os.path.join(state_dir, 'index.json')):
+        return None
+    with open(os.path.join(state_dir, 'index.json'), encoding='utf-8') as f:
+        state = json.load(f)
+    state['binary'] = sparse.load_npz(os.path.join(state_dir, 'features.npz')).tocsr()
+    with np.load(os.path.join(state_dir, 'rankings.npz')) as rankings:
+        state['lists'] = tuple(rankings[f'arr_{i}'] for i in range(5))
+        state['complete'] = rankings['complete']
+        state['certified'] = rankings['certified']
+    return state
+
+def incremental_predictions(df, k=TOP_K, state_dir=STATE_DIR):
+    """Top-k predictions from the saved state, updated for df (built from scratch on the first run)"""
+    if k is None:
+        raise ValueError("Incremental link prediction needs TOP_K")
+    settings = {'k': k, 'depth': LIST_DEPTH, 'min_score': MIN_SCORE, 'exclude': EXCLUDE_COAUTHORS}
+    start = time.perf_counter()
+    state = load_prediction_state(state_dir)
+    if state is None or state['settings'] != settings:
+        print(f"Building link prediction state in {state_dir}/")
+        state = build_prediction_state(df, k)
+    else:
+        update_prediction_state(state, df)
+    save_prediction_state(state, state_dir)
+    print(f"✓ Link prediction state up to date in {time.perf_counter() - start:.2f}s")
+    return state_table(state), state['authors']
+
+def main(store=None):
+    df = fetch_author_paper_journal(store)
+    if INCREMENTAL:
+        sim_table, authors = incremental_predictions(df, TOP_K)
+        if TOPOLOGICAL_SCORES:
+            sim_table = add_topological_scores(sim_table, authors, coauthor_adjacency(df, authors))
+        sim_table.to_csv('predicted_coauthorships.csv', index=False)
+        print(sim_table.head(20))
+        return
     feature_matrix, authors = build_feature_matrix(df)
-    sim_table = compute_similarity_table(feature_matrix, authors)
-    sim_table = sim_table.sort_values('average_score', ascending=False)
+    coauthors = coauthor_adjacency(df, authors)
+    excluded = coauthors if EXCLUDE_COAUTHORS else None
+    if excluded is not None:
+        print(f"Excluding {coauthors.nnz // 2} existing coauthor pairs")
+    if TOP_K is not None or TOP_N is not None or CANDIDATES == 'lsh':
+        sim_table = top_k_similarity_table(feature_matrix, authors, coauthors=excluded)
+    else:
+        sim_table = compute_similarity_table(feature_matrix, authors, excluded)
+        sim_table = sim_table.sort_values('average_score', ascending=False)
+    if TOPOLOGICAL_SCORES:
+        sim_table = add_topological_scores(sim_table, authors, coauthors)
     sim_table.to_csv('predicted_coauthorships.csv', index=False)
     print(sim_table.head(20))
 
+def synthetic_author_papers(n_authors, seed=0):
+    """Author-paper-journal rows shaped like the real graph: 1-4 papers per author"""
+    rng = np.random.default_rng(seed)
+    papers_per_author = rng.integers(1, 5, n_authors)
+    authors = np.repeat(np.arange(n_authors), papers_per_author)
+    papers = rng.integers(0, max(n_authors // 2, 1), len(authors))
+    journals = papers % max(n_authors // 10, 1)
+    return pd.DataFrame({
+        'author': [f'Author {a}' for a in authors],
+        'paper': [f'Paper {p}' for p in papers],
+        'journal': [f'Journal {j}' for j in journals],
+    })
+
+def sparse_nbytes(matrix):
+    return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+
+def benchmark(loop_sizes=(250, 500, 1000), sizes=(2000, 4000, 8000)):
+    """Loop against sparse Jaccard on growing synthetic author counts"""
+    for n in loop_sizes + sizes:
+        feature_matrix, authors = build_feature_matrix(synthetic_author_papers(n))
+        dense_mb = feature_matrix.shape[0] * feature_matrix.shape[1] * 8 / 1e6
+        start = time.perf_counter()
+        jac_sim = jaccard_similarity(feature_matrix)
+        vectorized = time.perf_counter() - start
+        line = (f"  {len(authors):>6} authors  features {sparse_nbytes(feature_matrix) / 1e6:6.2f} MB "
+                f"(dense {dense_mb:8.1f} MB)  sparse {vectorized:7.3f}s")
+        if n in loop_sizes:
+            start = time.perf_counter()
+            expected = jaccard_similarity_loop(feature_matrix)
+            loop = time.perf_counter() - start
+            identical = np.array_equal(expected, jac_sim)
+            line += f"  loop {loop:7.2f}s ({loop / vectorized:,.0f}x)  {'✅ identical' if identical else '❌ differs'}"
+        print(line)
+
+def benchmark_top_k(sizes=(10_000, 50_000, 100_000), k=10):
+    """Top-k candidate generation where the all-pairs table would not fit"""
+    for n in sizes:
+        feature_matrix, authors = build_feature_matrix(synthetic_author_papers(n))
+        start = time.perf_counter()
+        table = top_k_similarity_table(feature_matrix, authors, k=k)
+        elapsed = time.perf_counter() - start
+        print(f"  {len(authors):>7} authors  top-{k}: {len(table):>8,} pairs in {elapsed:6.2f}s "
+              f"(all pairs: {len(authors) * (len(authors) - 1) // 2:,} rows)")
+
+def benchmark_blocked(sizes=(25_000, 50_000, 100_000, 200_000), worker_counts=(1, 2, 4), k=10,
+                      memory_budget_mb=64):
+    """
+    Peak traced memory of the exact top-k mode in one process as the author
+    count grows (tiles keep it bounded by the budget plus the O(n) inputs and
+    result), then throughput per worker count on the largest size.
+    """
+    for n in sizes:
+        feature_matrix, authors = build_feature_matrix(synthetic_author_papers(n))
+        tiles = len(tile_bounds((feature_matrix != 0).astype(np.int64), memory_budget_mb, 1))
+        tracemalloc.start()
+        start = time.perf_counter()
+        table = top_k_similarity_table(feature_matrix, authors, k=k, memory_budget_mb=memory_budget_mb, workers=1)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result = table.memory_usage(deep=True).sum()
+        print(f"  {len(authors):>7} authors  {tiles:>3} tiles  peak {peak / 1e6:7.1f} MB "
+              f"(result table {result / 1e6:6.1f} MB)  "
+              f"(dense n x n: {3 * n * n * 8 / 1e9:8.1f} GB)  {elapsed:6.2f}s")
+    for workers in worker_counts:
+        start = time.perf_counter()
+        top_k_similarity_table(feature_matrix, authors, k=k, memory_budget_mb=memory_budget_mb, workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"  {len(authors):>7} authors  {workers} worker(s): {len(authors) / elapsed:,.0f} authors/sec")
+
+def benchmark_incremental(n=100_000, new_papers=(20, 200, 2000), k=10):
+    """Incremental update after adding papers, against rebuilding the state"""
+    df = synthetic_author_papers(n)
+    start = time.perf_counter()
+    state = build_prediction_state(df, k)
+    print(f"  {n:,} authors: full build {time.perf_counter() - start:.2f}s")
+    rng = np.random.default_rng(1)
+    for count in new_papers:
+        authors = rng.integers(0, n, 3 * count)
+        added = pd.DataFrame({
+            'author': [f'Author {a}' for a in authors],
+            'paper': [f'New paper {count} {i // 3}' for i in range(3 * count)],
+            'journal': [f'Journal {j}' for j in rng.integers(0, n // 10, 3 * count)],
+        })
+        df = pd.concat([df, added], ignore_index=True)
+        start = time.perf_counter()
+        update_prediction_state(state, df)
+        print(f"  +{count} papers: incremental update {time.perf_counter() - start:.2f}s")
+
+def top_scores_per_author(table, n_authors, author_index, k):
+    """n_authors x k array of each author's best k scores in table, -inf where fewer"""
+    first = table['author1'].map(author_index).to_numpy()
+    second = table['author2'].map(author_index).to_numpy()
+    authors = np.concatenate([first, second])
+    scores = np.tile(table['average_score'].to_numpy(), 2)
+    order = np.lexsort((-scores, authors))
+    authors, scores = authors[order], scores[order]
+    rank = np.arange(len(authors)) - np.searchsorted(authors, authors)
+    best = np.full((n_authors, k), -np.inf)
+    best[authors[rank < k], rank[rank < k]] = scores[rank < k]
+    return best
+
+def lsh_recall_at_k(df, k=10, settings=((16, 1), (32, 1), (64, 1), (32, 2))):
+    """
+    Recall@k of LSH candidates against exact top-k for (bands, rows) settings.
+    A rank slot counts as recalled when LSH found a partner with the exact
+    score at that rank, so ties between equally scored partners do not count
+    as misses.
+    """
+    feature_matrix, authors = build_feature_matrix(df)
+    coauthors = coauthor_adjacency(df, authors)
+    author_index = {author: i for i, author in enumerate(authors)}
+    start = time.perf_counter()
+    exact = top_k_similarity_table(feature_matrix, authors, k=k, coauthors=coauthors, candidates='exact')
+    print(f"  exact: {len(exact):,} pairs in {time.perf_counter() - start:.2f}s")
+    expected = top_scores_per_author(exact, len(authors), author_index, k)
+    slots = np.isfinite(expected)
+    for bands, rows in settings:
+        start = time.perf_counter()
+        approximate = top_k_similarity_table(feature_matrix, authors, k=k, coauthors=coauthors,
+                                             candidates='lsh', lsh_bands=bands, lsh_rows=rows)
+        elapsed = time.perf_counter() - start
+        found = top_scores_per_author(approximate, len(authors), author_index, k)
+        recall = (np.isclose(found, expected) & slots).sum() / slots.sum()
+        print(f"  lsh {bands:>3} bands x {rows} rows: recall@{k} {recall:.3f}, "
+              f"{len(approximate):,} pairs in {elapsed:.2f}s")
+
+def benchmark_lsh(sizes=(25_000, 50_000, 100_000, 200_000), k=10):
+    """LSH top-k time on growing synthetic author counts (should grow about linearly)"""
+    for n in sizes:
+        feature_matrix, authors = build_feature_matrix(synthetic_author_papers(n))
+        start = time.perf_counter()
+        table = top_k_similarity_table(feature_matrix, authors, k=k, candidates='lsh')
+        elapsed = time.perf_counter() - start
+        print(f"  {len(authors):>7} authors  lsh top-{k}: {len(table):>9,} pairs in {elapsed:6.2f}s "
+              f"({elapsed / len(authors) * 1e6:5.1f} us/author)")
+
+def bundled_author_paper_journal(csv_file=csv_file):
+    """author_paper_journal() of the bundled CSV, imported into a throwaway in-memory graph"""
+    store = InMemoryGraphStore()
+    import_csv_to_store(store, csv_file, ledger_file=None)
+    return store.author_paper_journal()
+
+def benchmark_fetch(store=None):
+    """Time and peak traced memory of the id-array fetch and of the named DataFrame, against the configured store"""
+    own_store = store is None
+    if own_store:
+        store = open_graph_store(NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD)
+    for name, fetch in (('ids', lambda: store.author_paper_journal_ids()[0]), ('names', store.author_paper_journal)):
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = fetch()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"  {name:<5}: {len(result['author']):>9,} triples in {elapsed:6.2f}s, peak {peak / 1e6:7.1f} MB")
+    if own_store:
+        store.close()
+
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:] == ["benchmark", "fetch"]:
+        benchmark_fetch()
+    elif sys.argv[1:] == ["benchmark"]:
+        benchmark()
+        benchmark_top_k()
+        benchmark_blocked()
+        benchmark_incremental()
+        print(f"LSH recall against exact top-k on {csv_file}:")
+        lsh_recall_at_k(bundled_author_paper_journal())
+        benchmark_lsh()
+    else:
+        main()
@@ -0,0 +1,95 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+import numpy as np
+from csv_stream import CHUNK_SIZE, CSV_ENCODING, csv_columns, iter_csv_chunks
+from columnar_dataset import DATASET_DIR, METADATA_FILE, source_signature, load_dataset
+from KG_v2_neo4j import csv_file, PAPER_COLUMNS, parse_authors
+
+class Interner:
+    """Integer code per distinct string, in order of first appearance"""
+
+    def __init__(self):
+        self.codes = {}
+
+    def __call__(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.codes)
+        return code
+
+    @property
+    def vocabulary(self):
+        return list(self.codes)
+
+def prepare_dataset(csv_file, dataset_dir=DATASET_DIR, chunk_size=CHUNK_SIZE):
+    """
+    Parse csv_file once into dataset_dir: interned title, journal, document
+    type, year and author codes per paper plus the exploded author-paper
+    table, saved as .npy arrays and JSON vocabularies. The file is read like
+    iter_paper_chunks reads it (CSV_ENCODING, values as text) and normalized
+    with the importer's parse_authors and str(), so Dataset.iter_rows gives
+    the rows the chunked iter_csv_rows gives (canonical author names are
+    applied on load). The directory is replaced only when complete.
+    """
+    start = time.perf_counter()
+    encoding = CSV_ENCODING
+    interners = {name: Interner() for name in ['title', 'journal', 'doc_type', 'year', 'author']}
+    paper_columns = {name: [] for name in ['title', 'journal', 'doc_type', 'year', 'author_parts']}
+    wrote_paper = []
+    wrote_author = []
+    author = interners['author']
+
+    rows = 0
+    chunks = iter_csv_chunks(csv_file, chunk_size, encoding, columns=PAPER_COLUMNS,
+                             defaults={'Document Type': 'Unknown', 'Year': 'Unknown'})
+    for chunk in chunks:
+        for authors_field, title, journal, doc_type, year in zip(*(chunk[c] for c in PAPER_COLUMNS)):
+            for name, value in (('title', title), ('journal', journal), ('doc_type', doc_type), ('year', year)):
+                paper_columns[name].append(interners[name](str(value)))
+            paper_columns['author_parts'].append(len(str(authors_field).split(',')))
+            for name in parse_authors(authors_field):
+                wrote_paper.append(rows)
+                wrote_author.append(author(name))
+            rows += 1
+        print(f"  {rows} rows parsed")
+
+    metadata = source_signature(csv_file) | {
+        'encoding': encoding,
+        'columns': csv_columns(csv_file, encoding),
+        'rows': rows,
+        'author_paper_rows': len(wrote_paper),
+    }
+
+    parent = os.path.dirname(os.path.abspath(dataset_dir))
+    temp_dir = tempfile.mkdtemp(dir=parent, prefix='.dataset_')
+    try:
+        for name, codes in paper_columns.items():
+            np.save(os.path.join(temp_dir, f'paper_{name}.npy'), np.array(codes, dtype=np.int32))
+        np.save(os.path.join(temp_dir, 'wrote_paper.npy'), np.array(wrote_paper, dtype=np.int32))
+        np.save(os.path.join(temp_dir, 'wrote_author.npy'), np.array(wrote_author, dtype=np.int32))
+        for name, interner in interners.items():
+            with open(os.path.join(temp_dir, f'{name}.json'), 'w', encoding='utf-8') as f:
+                json.dump(interner.vocabulary, f, ensure_ascii=False)
+        # Written last: a directory without metadata is never loaded
+        with open(os.path.join(temp_dir, METADATA_FILE), 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        if os.path.exists(dataset_dir):
+            shutil.rmtree(dataset_dir)
+        os.replace(temp_dir, dataset_dir)
+    except BaseException:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+
+    elapsed = time.perf_counter() - start
+    print(f"✓ Prepared {dataset_dir}/ from {csv_file} ({encoding}) in {elapsed:.1f}s: "
+          f"{rows} papers, {len(interners['author'].codes)} authors, "
+          f"{len(interners['journal'].codes)} journals, {len(interners['year'].codes)} years, "
+          f"{len(wrote_paper)} author-paper rows")
+    return metadata
+
+if __name__ == "__main__":
+    prepare_dataset(csv_file)
+    load_dataset(csv_file)
@@ -0,0 +1,444 @@
+import atexit
+import json
+import os
+import re
+import random
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+import numpy as np
+from neo4j.exceptions import ResultNotSingleError
+
+# Statements slower than this are kept in the slow-query log with their parameters
+SLOW_QUERY_MS = 500
+# Longest parameter repr stored per slow query (UNWIND batches can be huge)
+MAX_PARAMETER_CHARS = 500
+# Slow-query log entries kept per run (the slowest ones win)
+MAX_SLOW_QUERIES = 200
+# Latencies kept per template for the percentiles (a uniform reservoir sample; totals and max stay exact)
+LATENCY_SAMPLES = 10_000
+
+COUNTERS = [
+    'nodes_created', 'nodes_deleted', 'relationships_created', 'relationships_deleted',
+    'properties_set', 'labels_added', 'indexes_added', 'constraints_added',
+]
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+
+def query_template(query):
+    """Statement text with literals replaced by ?, so f-string queries group together"""
+    template = _STRING_LITERAL.sub('?', query)
+    template = _NUMBER_LITERAL.sub('?', template)
+    return ' '.join(template.split())
+
+class QueryStats:
+    """Per-template latency, row and counter aggregates plus a slow-query log"""
+
+    def __init__(self, latency_samples=LATENCY_SAMPLES):
+        self.lock = threading.Lock()
+        self.templates = {}
+        self.slow_queries = []
+        self.latency_samples = latency_samples
+        self.random = random.Random(0)
+
+    def record(self, query, parameters, seconds, rows, summary):
+        template = query_template(query)
+        counters = summary.counters if summary is not None else None
+        with self.lock:
+            stats = self.templates.get(template)
+            if stats is None:
+                stats = self.templates[template] = {
+                    'count': 0, 'rows': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'latencies': [],
+                    'counters': {name: 0 for name in COUNTERS},
+                }
+            stats['count'] += 1
+            stats['rows'] += rows
+            latency = seconds * 1000
+            stats['total_ms'] += latency
+            stats['max_ms'] = max(stats['max_ms'], latency)
+            # Reservoir sampling: every statement so far has the same chance to be kept
+            samples = stats['latencies']
+            if len(samples) < self.latency_samples:
+                samples.append(latency)
+            else:
+                slot = self.random.randrange(stats['count'])
+                if slot < self.latency_samples:
+                    samples[slot] = latency
+            if counters is not None:
+                for name in COUNTERS:
+                    stats['counters'][name] += getattr(counters, name, 0)
+
+            if seconds * 1000 >= SLOW_QUERY_MS:
+                self.slow_queries.append({
+                    'ms': round(seconds * 1000, 2),
+                    'rows': rows,
+                    'template': template,
+                    'parameters': repr(parameters)[:MAX_PARAMETER_CHARS],
+                })
+                if len(self.slow_queries) > 2 * MAX_SLOW_QUERIES:
+                    self.slow_queries.sort(key=lambda q: q['ms'], reverse=True)
+                    del self.slow_queries[MAX_SLOW_QUERIES:]
+
+    def summary(self):
+        with self.lock:
+            templates = []
+            for template, stats in self.templates.items():
+                latencies = np.asarray(stats['latencies'])
+                p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+                templates.append({
+                    'template': template,
+                    'count': stats['count'],
+                    'total_ms': round(stats['total_ms'], 2),
+                    'p50_ms': round(float(p50), 2),
+                    'p95_ms': round(float(p95), 2),
+                    'p99_ms': round(float(p99), 2),
+                    'max_ms': round(stats['max_ms'], 2),
+                    'rows': stats['rows'],
+                    'counters': {k: v for k, v in stats['counters'].items() if v},
+                })
+            templates.sort(key=lambda t: t['total_ms'], reverse=True)
+            slow = sorted(self.slow_queries, key=lambda q: q['ms'], reverse=True)[:MAX_SLOW_QUERIES]
+        return {
+            'script': os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else None,
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'slow_query_ms': SLOW_QUERY_MS,
+            'statements': templates,
+            'slow_queries': slow,
+        }
+
+    def dump(self, path=None):
+        if not self.templates:
+            return None
+        if path is None:
+            script = os.path.splitext(os.path.basename(sys.argv[0] or 'session'))[0] or 'session'
+            path = f"query_stats_{script}.json"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2, ensure_ascii=False)
+        print(f"Query statistics saved to: {path}")
+        return path
+
+# Shared by every instrumented driver in the process and dumped at exit
+STATS = QueryStats()
+atexit.register(STATS.dump)
+
+class TimedResult:
+    """
+    Wraps a Result and records the statement once it has been fully read.
+    settle() buffers the remaining records, as the driver does before the
+    next statement runs on the same session or transaction.
+    """
+
+    def __init__(self, result, query, parameters, start, stats):
+        self._result = result
+        self._records = iter(result)
+        self._buffer = deque()
+        self._query = query
+        self._parameters = parameters
+        self._start = start
+        self._stats = stats
+        self._rows = 0
+        self._summary = None
+        self._done = False
+
+    def __iter__(self):
+        while True:
+            if self._buffer:
+                yield self._buffer.popleft()
+            elif self._done:
+                return
+            else:
+                record = next(self._records, None)
+                if record is None:
+                    self._finish()
+                else:
+                    self._rows += 1
+                    yield record
+
+    def settle(self):
+        if not self._done:
+            for record in self._records:
+                self._rows += 1
+                self._buffer.append(record)
+            self._finish()
+
+    def _take_all(self):
+        self.settle()
+        records = list(self._buffer)
+        self._buffer.clear()
+        return records
+
+    def single(self, strict=False):
+        records = self._take_all()
+        if strict and len(records) != 1:
+            raise ResultNotSingleError(f"Expected a single record, found {len(records)}")
+        return records[0] if records else None
+
+    def data(self, *keys):
+        return [record.data(*keys) for record in self._take_all()]
+
+    def values(self, *keys):
+        return [record.values(*keys) for record in self._take_all()]
+
+    def consume(self):
+        self._buffer.clear()
+        self._finish()
+        return self._summary
+
+    def _finish(self):
+        if not self._done:
+            self._done = True
+            self._summary = self._result.consume()
+            self._stats.record(self._query, self._parameters, time.perf_counter() - self._start,
+                               self._rows, self._summary)
+
+    def __getattr__(self, name):
+        return getattr(self._result, name)
+
+class InstrumentedTransaction:
+    def __init__(self, tx, stats):
+        self._tx = tx
+        self._stats = stats
+        self._result = None
+
+    def run(self, query, parameters=None, **kwargs):
+        if self._result is not None:
+            self._result.settle()
+        start = time.perf_counter()
+        self._result = TimedResult(self._tx.run(query, parameters, **kwargs), query,
+                                   parameters or kwargs, start, self._stats)
+        return self._result
+
+    def finish(self):
+        if self._result is not None:
+            self._result.settle()
+
+    def __getattr__(self, name):
+        return getattr(self._tx, name)
+
+class InstrumentedSession:
+    """Session whose run/execute_write/execute_read statements are recorded in STATS"""
+
+    def __init__(self, session, stats=STATS):
+        self._session = session
+        self._stats = stats
+        self._result = None
+
+    def run(self, query, parameters=None, **kwargs):
+        if self._result is not None:
+            self._result.settle()
+        start = time.perf_counter()
+        self._result = TimedResult(self._session.run(query, parameters, **kwargs), query,
+                                   parameters or kwargs, start, self._stats)
+        return self._result
+
+    def _wrap(self, transaction_function):
+        def work(tx, *args, **kwargs):
+            tx = InstrumentedTransaction(tx, self._stats)
+            value = transaction_function(tx, *args, **kwargs)
+            tx.finish()
+            return value
+        return work
+
+    def execute_write(self, transaction_function, *args, **kwargs):
+        if self._result is not None:
+            self._result.settle()
+        return self._session.execute_write(self._wrap(transaction_function), *args, **kwargs)
+
+    def execute_read(self, transaction_function, *args, **kwargs):
+        if self._result is not None:
+            self._result.settle()
+        return self._session.execute_read(self._wrap(transaction_function), *args, **kwargs)
+
+    def close(self):
+        if self._result is not None:
+            self._result.settle()
+            self._result = None
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+class InstrumentedDriver:
+    """Driver wrapper handing out InstrumentedSession objects"""
+
+    def __init__(self, driver, stats=STATS):
+        self._driver = driver
+        self._stats = stats
+
+    def session(self, **config):
+        return InstrumentedSession(self._driver.session(**config), self._stats)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._driver.close()
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+def instrument(driver, stats=STATS):
+    """Wrap a GraphDatabase driver so every statement it runs is measured"""
+    return InstrumentedDriver(driver, stats)
+
+class AsyncTimedResult:
+    """Async counterpart of TimedResult (iteration, single, data and consume)"""
+
+    def __init__(self, result, query, parameters, start, stats):
+        self._result = result
+        self._buffer = deque()
+        self._query = query
+        self._parameters = parameters
+        self._start = start
+        self._stats = stats
+        self._rows = 0
+        self._summary = None
+        self._done = False
+
+    async def __aiter__(self):
+        while True:
+            if self._buffer:
+                yield self._buffer.popleft()
+            elif self._done:
+                return
+            else:
+                try:
+                    record = await self._result.__anext__()
+                except StopAsyncIteration:
+                    await self._finish()
+                else:
+                    self._rows += 1
+                    yield record
+
+    async def settle(self):
+        if not self._done:
+            async for record in self._result:
+                self._rows += 1
+                self._buffer.append(record)
+            await self._finish()
+
+    async def _take_all(self):
+        await self.settle()
+        records = list(self._buffer)
+        self._buffer.clear()
+        return records
+
+    async def single(self, strict=False):
+        records = await self._take_all()
+        if strict and len(records) != 1:
+            raise ResultNotSingleError(f"Expected a single record, found {len(records)}")
+        return records[0] if records else None
+
+    async def data(self, *keys):
+        return [record.data(*keys) for record in await self._take_all()]
+
+    async def consume(self):
+        self._buffer.clear()
+        await self._finish()
+        return self._summary
+
+    async def _finish(self):
+        if not self._done:
+            self._done = True
+            self._summary = await self._result.consume()
+            self._stats.record(self._query, self._parameters, time.perf_counter() - self._start,
+                               self._rows, self._summary)
+
+    def __getattr__(self, name):
+        return getattr(self._result, name)
+
+class AsyncInstrumentedTransaction:
+    def __init__(self, tx, stats):
+        self._tx = tx
+        self._stats = stats
+        self._result = None
+
+    async def run(self, query, parameters=None, **kwargs):
+        if self._result is not None:
+            await self._result.settle()
+        start = time.perf_counter()
+        self._result = AsyncTimedResult(await self._tx.run(query, parameters, **kwargs), query,
+                                        parameters or kwargs, start, self._stats)
+        return self._result
+
+    async def finish(self):
+        if self._result is not None:
+            await self._result.settle()
+
+    def __getattr__(self, name):
+        return getattr(self._tx, name)
+
+class AsyncInstrumentedSession:
+    """Async session whose run/execute_write/execute_read statements are recorded in STATS"""
+
+    def __init__(self, session, stats=STATS):
+        self._session = session
+        self._stats = stats
+        self._result = None
+
+    async def run(self, query, parameters=None, **kwargs):
+        await self._settle()
+        start = time.perf_counter()
+        self._result = AsyncTimedResult(await self._session.run(query, parameters, **kwargs), query,
+                                        parameters or kwargs, start, self._stats)
+        return self._result
+
+    async def _settle(self):
+        if self._result is not None:
+            await self._result.settle()
+            self._result = None
+
+    def _wrap(self, transaction_function):
+        async def work(tx, *args, **kwargs):
+            tx = AsyncInstrumentedTransaction(tx, self._stats)
+            value = await transaction_function(tx, *args, **kwargs)
+            await tx.finish()
+            return value
+        return work
+
+    async def execute_write(self, transaction_function, *args, **kwargs):
+        await self._settle()
+        return await self._session.execute_write(self._wrap(transaction_function), *args, **kwargs)
+
+    async def execute_read(self, transaction_function, *args, **kwargs):
+        await self._settle()
+        return await self._session.execute_read(self._wrap(transaction_function), *args, **kwargs)
+
+    async def close(self):
+        await self._settle()
+        await self._session.close()
+
+    async def __aenter__(self):
+        await self._session.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._settle()
+        await self._session.__aexit__(*exc)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+class AsyncInstrumentedDriver:
+    def __init__(self, driver, stats=STATS):
+        self._driver = driver
+        self._stats = stats
+
+    def session(self, **config):
+        return AsyncInstrumentedSession(self._driver.session(**config), self._stats)
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+def instrument_async(driver, stats=STATS):
+    """Async counterpart of instrument() for AsyncGraphDatabase drivers"""
+    return AsyncInstrumentedDriver(driver, stats)
@@ -0,0 +1,49 @@
+import sys
+import time
+from graph_store import GRAPH_STORE, open_graph_store
+from KG_v2_neo4j import uri, user, password, csv_file, import_csv_to_store
+from create_journal_year_links import create_journal_year_relationships
+from create_count_nodes import create_count_nodes_for_visualization
+import predict_coauthorship
+import calculate_metrics
+
+def run_pipeline(backend=GRAPH_STORE, csv_file=csv_file):
+    """
+    Import, Journal-Year links, PublicationCount nodes, link prediction and
+    metrics against one graph store, timing each stage. With the memory
+    backend nothing needs a running database.
+    """
+    store = open_graph_store(uri, user, password, backend)
+    timings = []
+
+    def stage(name, run):
+        print(f"\n=== {name} ===")
+        start = time.perf_counter()
+        run()
+        timings.append((name, time.perf_counter() - start))
+
+    def metrics():
+        graph_metrics = calculate_metrics.fetch_graph_metrics(store)
+        csv_metrics = calculate_metrics.analyze_csv_data()
+        calculate_metrics.print_results(graph_metrics, csv_metrics)
+        calculate_metrics.save_to_file(graph_metrics, csv_metrics)
+
+    try:
+        stage('import', lambda: import_csv_to_store(store, csv_file, ledger_file=None))
+        stage('journal-year links', lambda: create_journal_year_relationships(uri, user, password, store))
+        stage('publication counts', lambda: create_count_nodes_for_visualization(uri, user, password, store))
+        stage('link prediction', lambda: predict_coauthorship.main(store))
+        stage('metrics', metrics)
+    finally:
+        store.close()
+
+    print("\n" + "=" * 60)
+    print(f"PIPELINE TIMINGS ({backend} store, {csv_file})")
+    print("=" * 60)
+    for name, elapsed in timings:
+        print(f"  {name:<20} {elapsed:8.2f}s")
+    print(f"  {'total':<20} {sum(elapsed for _, elapsed in timings):8.2f}s")
+    return timings
+
+if __name__ == "__main__":
+    run_pipeline(*sys.argv[1:2])
@@ -0,0 +1,29 @@
+import os
+import sys
+import shutil
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+@pytest.fixture
+def bundled_csv(tmp_path, monkeypatch):
+    """research_csv.csv copied into an empty working directory (no dataset/, ledger or store files)"""
+    path = tmp_path / 'research_csv.csv'
+    shutil.copy(os.path.join(REPO_DIR, 'research_csv.csv'), path)
+    monkeypatch.chdir(tmp_path)
+    return str(path)
+
+def graph_snapshot(store):
+    """{label: node keys} and {(type, start label, end label): (start key, end key) pairs} of an InMemoryGraphStore"""
+    nodes = {label: set(table['keys']) for label, table in store.nodes.items()}
+    edges = {}
+    for key, table in store.edges.items():
+        start_keys = store.nodes[key[1]]['keys']
+        end_keys = store.nodes[key[2]]['keys']
+        edges[key] = {(start_keys[s], end_keys[e]) for s, e in zip(table['start'], table['end'])}
+    return nodes, edges
+
+@pytest.fixture
+def snapshot():
+    return graph_snapshot
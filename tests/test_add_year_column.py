@@ -0,0 +1,26 @@
+import os
+import stat
+from add_year_column import add_columns_by_key, normalize_key
+
+def write_csv(path, text, encoding):
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        f.write(text)
+
+def test_join_keeps_bytes_and_permissions(tmp_path):
+    target = tmp_path / 'target.csv'
+    source = tmp_path / 'source.csv'
+    # utf-8 target with a character that is not ISO-8859-1, utf-8 source with a BOM
+    write_csv(target, 'Authors,Title,Source title\nKumar S.,Café – study,Journal\nRao K.,Unknown,Journal\n', 'utf-8')
+    write_csv(source, 'Authors,Title,Source title,Year\nKumar S.,CAFE - Study,journal,2021\n', 'utf-8-sig')
+    os.chmod(target, 0o644)
+
+    counts = add_columns_by_key(str(target), str(source), report_file=None)
+
+    assert counts == {'matched': 1, 'unmatched': 1, 'ambiguous': 0}
+    assert stat.S_IMODE(os.stat(target).st_mode) == 0o644
+    assert target.read_text(encoding='utf-8') == (
+        'Authors,Title,Source title,Year\nKumar S.,Café – study,Journal,2021\nRao K.,Unknown,Journal,\n')
+
+def test_normalize_key_ignores_encoding_of_utf8_text():
+    title = 'Café – study'
+    assert normalize_key(title.encode('utf-8').decode('ISO-8859-1')) == normalize_key(title) == 'cafe study'
@@ -0,0 +1,39 @@
+from collections import Counter
+import pytest
+from author_resolution import name_key, resolve_author_names, resolve_block
+
+@pytest.mark.parametrize('name, key', [
+    ('Kumar P.V.N', ('kumar', 'PVN')),
+    ('Kumar P V N.', ('kumar', 'PVN')),
+    ('Müller-Lüdenscheidt J.-P.', ('muller ludenscheidt', 'JP')),
+    ('Dupont É.M.', ('dupont', 'ÉM')),
+    ('Kumar', None),
+    ('P.V.N.', None),
+])
+def test_name_key(name, key):
+    assert name_key(name) == key
+
+def test_initials_resolve_to_the_only_full_form():
+    mapping, blocks = resolve_author_names(Counter({'Kumar P.': 1, 'Kumar P.V.': 1, 'Kumar P.V.N': 3,
+                                                    'Kumar P V N': 1, 'Rao K.': 2}))
+    assert mapping == {'Kumar P.': 'Kumar P.V.N', 'Kumar P.V.': 'Kumar P.V.N', 'Kumar P V N': 'Kumar P.V.N'}
+    assert blocks == 2
+
+def test_ambiguous_prefix_stays_separate():
+    mapping, _ = resolve_author_names(Counter({'Kumar P': 1, 'Kumar P.': 2, 'Kumar P.V.N': 2, 'Kumar P.K': 2}))
+    # "P" extends to both "PVN" and "PK": only its own spellings are merged
+    assert mapping == {'Kumar P': 'Kumar P.'}
+
+def test_other_surnames_and_first_initials_are_not_merged():
+    mapping, blocks = resolve_author_names(Counter({'Kumar P.': 1, 'Kumari P.V.': 1, 'Kumar S.P.': 1}))
+    assert mapping == {} and blocks == 3
+
+def test_non_ascii_initials():
+    mapping, _ = resolve_author_names(Counter({'Dupont É.': 1, 'Dupont É.M.': 2, 'Hansen Ø': 1, 'Hansen Ø.K.': 1}))
+    assert mapping == {'Dupont É.': 'Dupont É.M.', 'Hansen Ø': 'Hansen Ø.K.'}
+
+@pytest.mark.parametrize('extensions', [('PK', 'PÉ'), ('PÉ', 'PØK'), ('PK', 'PZ')])
+def test_prefix_of_two_extensions_is_ambiguous_whatever_the_letters(extensions):
+    variants = {'P': Counter({'Kumar P.': 1})}
+    variants.update({initials: Counter({f'Kumar {".".join(initials)}.': 1}) for initials in extensions})
+    assert resolve_block(variants) == {}
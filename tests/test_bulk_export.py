@@ -0,0 +1,70 @@
+import csv
+import os
+import re
+from itertools import combinations
+from graph_store import NODE_KEYS, InMemoryGraphStore
+from KG_v2_neo4j import import_csv_to_store, year_number
+from bulk_export import COAUTHORED_FILE, NODE_FILES, RELATIONSHIP_FILES, export_bulk_import
+
+ID_COLUMN = re.compile(r':(ID|START_ID|END_ID)\((\w+)\)')
+
+def read_export(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        rows = list(csv.reader(f))
+    return rows[0], rows[1:]
+
+def parse_export(export_dir):
+    """Nodes and relationships of a neo4j-admin export, resolved through its :ID / :START_ID / :END_ID headers"""
+    nodes, by_id = {}, {}
+    for _, file_name, *_ in NODE_FILES:
+        header, rows = read_export(os.path.join(export_dir, file_name))
+        kind, label = ID_COLUMN.fullmatch(header[0]).groups()
+        assert kind == 'ID' and header[-1] == ':LABEL'
+        assert header[1:-1] == list(NODE_KEYS[label])
+        assert all(row[-1] == label for row in rows)
+        ids = {row[0]: tuple(row[1:-1]) for row in rows}
+        assert len(ids) == len(rows) == len(set(ids.values()))
+        nodes[label] = set(ids.values())
+        by_id[label] = ids
+
+    edges = {}
+    for _, file_name, rel_type, *_ in RELATIONSHIP_FILES:
+        header, rows = read_export(os.path.join(export_dir, file_name))
+        (start_kind, start_label), (end_kind, end_label) = (ID_COLUMN.fullmatch(c).groups() for c in header[:2])
+        assert (start_kind, end_kind, header[2]) == ('START_ID', 'END_ID', ':TYPE')
+        assert all(row[2] == rel_type for row in rows)
+        pairs = [(by_id[start_label][start], by_id[end_label][end]) for start, end, _ in rows]
+        assert len(pairs) == len(set(pairs))
+        edges[(rel_type, start_label, end_label)] = set(pairs)
+    return nodes, edges, by_id
+
+def test_export_describes_the_imported_graph(bundled_csv, snapshot, tmp_path):
+    export_dir = str(tmp_path / 'neo4j_import')
+    assert export_bulk_import(bundled_csv, export_dir) == 1691
+    nodes, edges, by_id = parse_export(export_dir)
+
+    store = InMemoryGraphStore()
+    import_csv_to_store(store, bundled_csv, ledger_file=None)
+    assert (nodes, edges) == snapshot(store)
+
+    # COAUTHORED: every pair of authors sharing a Paper node, with the papers' count and year range
+    expected = {}
+    paper_authors = {}
+    for (author,), paper in edges[('WROTE', 'Author', 'Paper')]:
+        paper_authors.setdefault(paper, set()).add(author)
+    for (_, year), authors in paper_authors.items():
+        year = year_number(year)
+        for pair in combinations(authors, 2):
+            weight, years = expected.get(frozenset(pair), (0, set()))
+            expected[frozenset(pair)] = (weight + 1, years | ({year} - {None}))
+    expected = {pair: (weight, min(years, default=None), max(years, default=None))
+                for pair, (weight, years) in expected.items()}
+
+    header, rows = read_export(os.path.join(export_dir, COAUTHORED_FILE))
+    assert header == [':START_ID(Author)', ':END_ID(Author)', 'weight:int', 'firstYear:int', 'lastYear:int', ':TYPE']
+    assert all(row[-1] == 'COAUTHORED' for row in rows)
+    exported = {frozenset((by_id['Author'][start][0], by_id['Author'][end][0])):
+                (int(weight), int(first) if first else None, int(last) if last else None)
+                for start, end, weight, first, last, _ in rows}
+    assert len(exported) == len(rows)
+    assert exported == expected
@@ -0,0 +1,50 @@
+import os
+import random
+import pandas as pd
+import pytest
+from clean import clean_author, clean_authors, clean_authors_column
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def per_row(authors):
+    """The original per-row cleaning (which fails on missing values, so they are passed through)"""
+    return pd.Series([author if pd.isna(author) else clean_author(clean_authors(author)) for author in authors],
+                     index=authors.index, dtype=object)
+
+@pytest.mark.parametrize('filename', ['research_csv.csv', 'research_csv_2.csv'])
+def test_column_matches_per_row_on_bundled_data(filename):
+    authors = pd.read_csv(os.path.join(REPO_DIR, filename), encoding='utf-8-sig', dtype=object)['Authors']
+    assert clean_authors_column(authors).equals(per_row(authors))
+
+EDGE_CASES = [
+    "Punyasamudram, S., Puthalapattu, R.P., Bathinapatla, A., Mulpuri, R., Kanchi, S., Kumar, P.V.N.",
+    "S., Kumar", "R.P., S., T.", "Kumar, ", ", S.", "", " ", "Kumar,,S", "a, B", "Kumar  P.,   S .",
+    "Rao, K", "Rao, KV, Devi, S", "Name\twith tab, X.", None,
+]
+TOKENS = ['Kumar', 'S.', 'R.P.', 'P.V.N.', 'AB', 'S', ' ', '', 'rao', 'Devi S.', '  Rao  K. ', 'X.Y', '.']
+
+def test_column_matches_per_row_on_edge_cases():
+    authors = pd.Series(EDGE_CASES, dtype=object)
+    assert clean_authors_column(authors).equals(per_row(authors))
+
+def test_column_matches_per_row_on_random_rows():
+    rng = random.Random(0)
+    rows = [None if rng.random() < 0.02 else
+            ','.join(rng.choice(TOKENS) for _ in range(rng.randint(1, 8)))
+            for _ in range(20_000)]
+    authors = pd.Series(rows, dtype=object)
+    assert clean_authors_column(authors).equals(per_row(authors))
+
+def test_missing_values_stay_missing():
+    authors = pd.Series([None, float('nan')], dtype=object)
+    assert clean_authors_column(authors).isna().all()
+
+def test_streaming_clean_keeps_permissions_and_cleans(tmp_path):
+    from clean import clean_csv_streaming
+    path = tmp_path / 'papers.csv'
+    pd.DataFrame({'Authors': ['Kumar, P.V.N., Rao, S', 'Devi  S.'], 'Title': ['A', 'B']}).to_csv(path, index=False)
+    os.chmod(path, 0o644)
+    assert clean_csv_streaming(str(path), chunk_size=1, workers=1) == 2
+    assert os.stat(path).st_mode & 0o777 == 0o644
+    assert pd.read_csv(path)['Authors'].tolist() == ['Kumar P.V.N., Rao S.', 'Devi S.']
+    assert (tmp_path / 'papers.csv.backup').exists()
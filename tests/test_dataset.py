@@ -0,0 +1,53 @@
+import json
+import os
+import pandas as pd
+import pytest
+from csv_stream import authors_per_paper_stats, publication_year_counts
+from columnar_dataset import METADATA_FILE, load_dataset
+from prepare_dataset import prepare_dataset
+from KG_v2_neo4j import iter_csv_rows
+
+def rows_without_dataset(csv_file):
+    assert load_dataset(csv_file) is None
+    return list(iter_csv_rows(csv_file, chunk_size=100))
+
+def test_iter_csv_rows_same_with_and_without_dataset(bundled_csv):
+    expected = rows_without_dataset(bundled_csv)
+    prepare_dataset(bundled_csv)
+    assert load_dataset(bundled_csv) is not None
+    rows = list(iter_csv_rows(bundled_csv, chunk_size=100))
+    assert rows == expected
+    # The bundled CSV is utf-8 with non-ASCII titles; both paths decode it the same way
+    assert any('â' in title for _, title, *_ in rows)
+
+def test_year_counts_and_author_stats_same_with_and_without_dataset(bundled_csv):
+    counts, papers = publication_year_counts(bundled_csv)
+    stats = authors_per_paper_stats(bundled_csv)
+    prepare_dataset(bundled_csv)
+    dataset = load_dataset(bundled_csv)
+    dataset_counts, dataset_papers = dataset.publication_year_counts()
+    assert (dataset_counts, dataset_papers) == ({year: dict(journals) for year, journals in counts.items()}, papers)
+    assert dataset.authors_per_paper_stats() == stats
+
+@pytest.mark.parametrize('encoding', ['utf-8', 'ISO-8859-1'])
+def test_non_ascii_rows_same_with_and_without_dataset(tmp_path, monkeypatch, encoding):
+    monkeypatch.chdir(tmp_path)
+    pd.DataFrame({
+        'Authors': ['Müller J., Ñúñez A.', 'Østergård P.'],
+        'Title': ['Encoder–decoder networks', 'Café “quoted” title'.encode('latin-1', 'replace').decode('latin-1')],
+        'Source title': ['Revue d’IA', 'Zürich Journal'],
+        'Year': [2020, 2021],
+    }).to_csv('papers.csv', index=False, encoding=encoding, errors='replace')
+    expected = rows_without_dataset('papers.csv')
+    prepare_dataset('papers.csv')
+    assert list(iter_csv_rows('papers.csv')) == expected
+
+def test_dataset_with_another_encoding_is_not_used(bundled_csv):
+    prepare_dataset(bundled_csv)
+    path = os.path.join('dataset', METADATA_FILE)
+    with open(path, encoding='utf-8') as f:
+        metadata = json.load(f)
+    metadata['encoding'] = 'utf-8-sig'
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f)
+    assert load_dataset(bundled_csv) is None
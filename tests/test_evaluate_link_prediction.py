@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+from scipy.stats import rankdata
+from evaluate_link_prediction import evaluate, evaluate_scores, print_evaluation, temporal_split
+
+def symmetric(rng, n, density):
+    upper = np.triu(rng.random((n, n)) < density, k=1)
+    return upper | upper.T
+
+def brute_force(scores, train_coauthors, future, ks):
+    """AUC from average ranks and tie-aware precision@k over every candidate pair"""
+    first, second = np.triu_indices(scores.shape[0], k=1)
+    candidate = ~train_coauthors[first, second]
+    values, labels = scores[first, second][candidate], future[first, second][candidate]
+    ranks = rankdata(values)
+    positives = labels.sum()
+    result = {'auc': (ranks[labels].sum() - positives * (positives + 1) / 2) / (positives * (~labels).sum())}
+    for k in ks:
+        threshold = np.sort(values)[::-1][k - 1]
+        above, tied = values > threshold, values == threshold
+        result[f'precision_at_{k}'] = (labels[above].sum() + (k - above.sum()) * labels[tied].mean()) / k
+    return result
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('block_rows', [7, None])
+def test_streamed_metrics_match_brute_force(seed, block_rows):
+    rng = np.random.default_rng(seed)
+    n = 60
+    train_coauthors = symmetric(rng, n, 0.05)
+    future = symmetric(rng, n, 0.05) & ~train_coauthors
+    # Few distinct values, so many pairs tie
+    scores = np.round(rng.random((n, n)), 1)
+    scores = np.triu(scores, k=1) + np.triu(scores, k=1).T
+    ks = (1, 10, 100)
+    result = evaluate_scores(sparse.csr_matrix(scores), sparse.csr_matrix(train_coauthors),
+                             sparse.csr_matrix(future), ks, block_rows)
+    expected = brute_force(scores, train_coauthors, future, ks)
+    for key, value in expected.items():
+        assert result[key] == pytest.approx(value)
+
+def test_undated_papers_are_left_out_and_counted():
+    df = pd.DataFrame({
+        'author': ['A', 'B', 'A', 'C', 'B', 'C', 'D'],
+        'paper': ['P1', 'P1', 'P2', 'P2', 'P3', 'P3', 'P4'],
+        'journal': ['J'] * 7,
+        'year': [2020, 2020, 2021, 2021, 2023, 2023, None],
+    })
+    _, authors, _, future, split = temporal_split(df, 2022)
+    assert split['undated_papers'] == 1
+    assert authors == ['A', 'B', 'C']
+    assert split['future_pairs'] == 1 and future[1, 2]
+
+@pytest.mark.parametrize('split_year', [2023, 1900])
+def test_split_without_future_pairs_reports_nan(split_year, capsys):
+    df = pd.DataFrame({
+        'author': ['A', 'B', 'A', 'C', 'D'],
+        'paper': ['P1', 'P1', 'P2', 'P2', 'P3'],
+        'journal': ['J', 'J', 'J', 'J', 'K'],
+        'year': [2020, 2020, 2021, 2021, 2022],
+    })
+    evaluation = evaluate(df, split_year)
+    print_evaluation(evaluation)
+    assert evaluation['future_pairs'] == 0
+    assert "No positives after split year" in capsys.readouterr().out
+    for result in evaluation['methods'].values():
+        assert all(np.isnan(result[key]) for key in result if key.startswith(('auc', 'precision_at_', 'mrr')))
+    if split_year == 2023:
+        assert evaluation['methods']
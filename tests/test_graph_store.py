@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from neo4j import Record
+import graph_store
+from graph_store import TRIPLE_COLUMNS, InMemoryGraphStore, Neo4jGraphStore
+from KG_v2_neo4j import import_csv_to_store
+
+class PathSession:
+    """Serves author_paper_journal_ids and node_names queries from an in-memory store's paths"""
+
+    def __init__(self, records, names):
+        self.records = records
+        self.names = names
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute_read(self, work):
+        return work(self)
+
+    def run(self, query, ids=None):
+        if ids is None:
+            return iter(self.records)
+        return [(node_id, self.names[node_id]) for node_id in ids if node_id in self.names]
+
+class PathDriver:
+    def __init__(self, store):
+        codes, node_ids = store.author_paper_journal_ids()
+        # Element ids are strings, unique across labels
+        element_ids = {column: np.array([f'4:db:{label}:{i}' for i in node_ids[column]], dtype=object)
+                       for column, (label, _) in TRIPLE_COLUMNS.items()}
+        self.records = [Record(zip(TRIPLE_COLUMNS, values))
+                        for values in zip(*(element_ids[column][codes[column]] for column in TRIPLE_COLUMNS))]
+        self.names = {}
+        for column, (label, property) in TRIPLE_COLUMNS.items():
+            self.names.update(zip(element_ids[column], store.node_names(label, node_ids[column], property)))
+
+    def session(self, **config):
+        return PathSession(self.records, self.names)
+
+def sorted_frame(df):
+    return df.sort_values(list(df.columns), ignore_index=True)
+
+@pytest.mark.parametrize('fetch_size', [1, 7, 10_000])
+def test_streamed_element_ids_match_in_memory_store(bundled_csv, monkeypatch, fetch_size):
+    memory = InMemoryGraphStore()
+    import_csv_to_store(memory, bundled_csv, ledger_file=None)
+    neo4j = Neo4jGraphStore.__new__(Neo4jGraphStore)
+    neo4j.driver = PathDriver(memory)
+    monkeypatch.setattr(graph_store, 'FETCH_SIZE', fetch_size)
+
+    codes, node_ids = neo4j.author_paper_journal_ids()
+    assert all(len(codes[column]) == len(neo4j.driver.records) for column in TRIPLE_COLUMNS)
+    # One code per distinct element id
+    for column in TRIPLE_COLUMNS:
+        assert len(set(node_ids[column])) == len(node_ids[column]) == codes[column].max() + 1
+
+    expected = sorted_frame(memory.author_paper_journal())
+    assert len(expected) > 0
+    assert sorted_frame(neo4j.author_paper_journal()).equals(expected)
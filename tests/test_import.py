@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+from graph_store import InMemoryGraphStore
+from KG_v2_neo4j import (read_papers, clean_author, canonical_author, import_csv_to_store,
+                         iter_csv_rows, iter_batches)
+
+def per_row_graph(csv_file):
+    """
+    The graph import_csv_to_neo4j builds, replayed in Python: one MERGE per
+    node, and relationships MATCHed on the paper title alone, i.e. linked to
+    every Paper with that title created so far.
+    """
+    nodes = {label: set() for label in ['Paper', 'Journal', 'DocumentType', 'Year', 'Author']}
+    edges = {key: set() for key in [('PUBLISHED_IN_YEAR', 'Paper', 'Year'), ('PUBLISHED_IN', 'Paper', 'Journal'),
+                                    ('HAS_TYPE', 'Paper', 'DocumentType'), ('WROTE', 'Author', 'Paper')]}
+    df = read_papers(csv_file)
+    for _, row in df.iterrows():
+        authors_field = str(row['Authors'])
+        if authors_field.startswith('"') and authors_field.endswith('"'):
+            authors_field = authors_field[1:-1]
+        authors = [a.strip() for a in authors_field.split(",") if a.strip()]
+        title, journal = str(row['Title']), str(row['Source title'])
+        doc_type, year = str(row['Document Type']), str(row['Year'])
+        nodes['Paper'].add((title, year))
+        nodes['Journal'].add((journal,))
+        nodes['DocumentType'].add((doc_type,))
+        nodes['Year'].add((year,))
+        papers = [paper for paper in nodes['Paper'] if paper[0] == title]
+        for paper in papers:
+            edges[('PUBLISHED_IN_YEAR', 'Paper', 'Year')].add((paper, (year,)))
+            edges[('PUBLISHED_IN', 'Paper', 'Journal')].add((paper, (journal,)))
+            edges[('HAS_TYPE', 'Paper', 'DocumentType')].add((paper, (doc_type,)))
+        for author in authors:
+            author = canonical_author(clean_author(author))
+            if author:
+                nodes['Author'].add((author,))
+                for paper in papers:
+                    edges[('WROTE', 'Author', 'Paper')].add(((author,), paper))
+    return nodes, edges
+
+def imported_graph(csv_file, snapshot, **kwargs):
+    store = InMemoryGraphStore()
+    import_csv_to_store(store, csv_file, ledger_file=None, **kwargs)
+    return snapshot(store)
+
+@pytest.mark.parametrize('batch_size, chunk_size', [(1000, 500), (7, 3), (1, None)])
+def test_batched_import_matches_per_row_import(bundled_csv, snapshot, batch_size, chunk_size):
+    assert imported_graph(bundled_csv, snapshot, batch_size=batch_size, chunk_size=chunk_size) == per_row_graph(bundled_csv)
+
+def test_repeated_title_links_every_year(tmp_path, monkeypatch, snapshot):
+    monkeypatch.chdir(tmp_path)
+    pd.DataFrame({
+        'Authors': ['"Rao K., Devi S."', 'Rao K.', 'Devi S., Rao K.'],
+        'Title': ['Graph Mining', 'Graph Mining', 'Other'],
+        'Source title': ['J1', 'J2', 'J1'],
+        'Year': [2020, 2021, 2021],
+    }).to_csv('papers.csv', index=False)
+    assert imported_graph('papers.csv', snapshot, batch_size=1) == per_row_graph('papers.csv')
+    # The 2021 row also links to the 2020 paper of the same title, as the per-row MATCH did
+    _, edges = per_row_graph('papers.csv')
+    assert ((('Graph Mining', '2020'), ('J2',)) in edges[('PUBLISHED_IN', 'Paper', 'Journal')])
+
+def test_blank_year_does_not_depend_on_chunk_size(tmp_path, monkeypatch, snapshot):
+    monkeypatch.chdir(tmp_path)
+    with open('papers.csv', 'w', encoding='utf-8') as f:
+        f.write('Authors,Title,Source title,Year\nA B.,t1,J,2020\nC D.,t2,J,\nE F.,t3,K,2021\n')
+    years = [row[4] for row in iter_csv_rows('papers.csv', None)]
+    assert years == [row[4] for row in iter_csv_rows('papers.csv', 2)] == ['2020', 'nan', '2021']
+    whole = imported_graph('papers.csv', snapshot, chunk_size=None)
+    assert whole == imported_graph('papers.csv', snapshot, chunk_size=2)
+    assert whole == per_row_graph('papers.csv')
+
+def test_batches_hold_at_most_batch_size_rows(bundled_csv):
+    sizes = [rows for rows, _ in iter_batches(iter_csv_rows(bundled_csv), batch_size=100)]
+    assert sum(sizes) == 1691 and max(sizes) == 100
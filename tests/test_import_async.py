@@ -0,0 +1,75 @@
+import random
+import asyncio
+import pandas as pd
+import pytest
+from graph_store import InMemoryGraphStore
+from KG_v2_neo4j import NODE_QUERIES, import_csv_to_store, store_operations
+from KG_v2_neo4j_async import import_async
+
+class StoreSession:
+    """
+    Async session whose write transactions are applied to an InMemoryGraphStore
+    after a random delay, so concurrent writers commit out of order. Like a
+    MATCH, the store drops relationships whose nodes do not exist yet.
+    """
+
+    def __init__(self, store, rng):
+        self.store = store
+        self.rng = rng
+
+    async def execute_write(self, transaction_function, queries, batch):
+        operations = store_operations(batch)
+        nodes = queries is NODE_QUERIES
+        await asyncio.sleep(self.rng.uniform(0, 0.002) if nodes else 0)
+        self.store.write([op for op in operations if (op[0] == 'nodes') == nodes])
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+class StoreDriver:
+    def __init__(self, store, seed):
+        self.store = store
+        self.rng = random.Random(seed)
+
+    def session(self, **config):
+        return StoreSession(self.store, self.rng)
+
+    async def close(self):
+        pass
+
+def async_graph(csv_file, snapshot, seed, batch_size):
+    store = InMemoryGraphStore()
+    rows, _ = asyncio.run(import_async(None, None, None, csv_file, concurrency=4, batch_size=batch_size,
+                                       chunk_size=None, ledger_file=None, driver=StoreDriver(store, seed)))
+    return rows, snapshot(store)
+
+def batched_graph(csv_file, snapshot):
+    store = InMemoryGraphStore()
+    import_csv_to_store(store, csv_file, ledger_file=None)
+    return snapshot(store)
+
+@pytest.mark.parametrize('seed', range(3))
+def test_async_import_matches_batched_import_when_titles_repeat(tmp_path, monkeypatch, snapshot, seed):
+    # Every title recurs in later years, so batches depend on Papers created by earlier ones
+    monkeypatch.chdir(tmp_path)
+    pd.DataFrame({
+        'Authors': [f'Author {i % 7}., Author {i % 11}.' for i in range(120)],
+        'Title': [f'Paper {i // 3}' for i in range(120)],
+        'Source title': [f'Journal {i % 5}' for i in range(120)],
+        'Year': [2000 + i % 3 for i in range(120)],
+    }).to_csv('papers.csv', index=False)
+    rows, graph = async_graph('papers.csv', snapshot, seed, batch_size=1)
+    assert rows == 120
+    assert graph == batched_graph('papers.csv', snapshot)
+
+def test_async_import_matches_batched_import(bundled_csv, snapshot):
+    rows, graph = async_graph(bundled_csv, snapshot, seed=0, batch_size=50)
+    assert rows == 1691
+    nodes, edges = graph
+    expected_nodes, expected_edges = batched_graph(bundled_csv, snapshot)
+    assert {label: len(keys) for label, keys in nodes.items()} == {label: len(keys) for label, keys in expected_nodes.items()}
+    assert {key: len(pairs) for key, pairs in edges.items()} == {key: len(pairs) for key, pairs in expected_edges.items()}
+    assert graph == (expected_nodes, expected_edges)
@@ -0,0 +1,91 @@
+import threading
+from collections import defaultdict
+import pytest
+from graph_store import InMemoryGraphStore
+from KG_v2_neo4j import (BATCH_FIELDS, NODE_QUERIES, RELATIONSHIP_QUERIES, import_csv_to_neo4j_parallel,
+                         import_csv_to_store, iter_batches, iter_csv_rows, partition_batch, store_operations)
+
+QUERY_NAMES = {query: name for name, query in NODE_QUERIES + RELATIONSHIP_QUERIES}
+
+class StoreTransaction:
+    """Collects the rows a transaction function sends with each importer query"""
+
+    def __init__(self):
+        self.batch = {name: [] for name in BATCH_FIELDS}
+
+    def run(self, query, rows):
+        self.batch[QUERY_NAMES[query]].extend(rows)
+        return self
+
+    def consume(self):
+        pass
+
+class StoreSession:
+    """Session whose write transactions are applied to an InMemoryGraphStore, one commit at a time"""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def execute_write(self, transaction_function):
+        tx = StoreTransaction()
+        transaction_function(tx)
+        with self.driver.lock:
+            self.driver.transactions.append(tx.batch)
+            self.driver.store.write(store_operations(tx.batch))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+class StoreDriver:
+    def __init__(self, store):
+        self.store = store
+        self.lock = threading.Lock()
+        self.transactions = []
+
+    def session(self, **config):
+        return StoreSession(self)
+
+    def close(self):
+        pass
+
+def batched_graph(csv_file, snapshot):
+    store = InMemoryGraphStore()
+    import_csv_to_store(store, csv_file, ledger_file=None)
+    return snapshot(store)
+
+def merge_key(name, row):
+    """What a row MERGEs on in its phase: its node's key, or for relationships its Paper"""
+    if name in dict(NODE_QUERIES):
+        return name, tuple(row[field] for field in BATCH_FIELDS[name])
+    return 'paper', (row['title'], row['paper_year'])
+
+@pytest.mark.parametrize('workers', [1, 4, 7])
+def test_every_merge_key_lands_in_one_partition(bundled_csv, workers):
+    node_names = [name for name, _ in NODE_QUERIES]
+    relationship_names = [name for name, _ in RELATIONSHIP_QUERIES]
+    for _, batch in iter_batches(iter_csv_rows(bundled_csv), batch_size=200):
+        for names in (node_names, relationship_names):
+            parts = partition_batch(batch, names, workers)
+            assert len(parts) <= workers
+            owners = defaultdict(set)
+            for i, part in enumerate(parts):
+                for name in names:
+                    for row in part[name]:
+                        owners[merge_key(name, row)].add(i)
+            assert all(len(parts_with_key) == 1 for parts_with_key in owners.values())
+            # Every row is sent exactly once
+            sent = sorted((name, sorted(row.items())) for part in parts for name in names for row in part[name])
+            assert sent == sorted((name, sorted(row.items())) for name in names for row in batch[name])
+
+@pytest.mark.parametrize('workers, batch_size', [(4, 100), (3, 7)])
+def test_parallel_import_matches_batched_import(bundled_csv, snapshot, workers, batch_size):
+    store = InMemoryGraphStore()
+    driver = StoreDriver(store)
+    rows = import_csv_to_neo4j_parallel(None, None, None, bundled_csv, workers=workers, batch_size=batch_size,
+                                        ledger_file=None, driver=driver)
+    assert rows == 1691
+    assert len(driver.transactions) > workers
+    assert snapshot(store) == batched_graph(bundled_csv, snapshot)
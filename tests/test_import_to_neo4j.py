@@ -0,0 +1,64 @@
+from graph_store import InMemoryGraphStore
+from KG_v2_neo4j import aggregate_coauthorships, import_csv_to_store, iter_csv_rows
+from import_to_neo4j import COAUTHORED_QUERY, create_graph
+
+class RecordingSession:
+    """Session that records the Author names MERGEd per row and the rows of each COAUTHORED transaction"""
+
+    def __init__(self):
+        self.authors = set()
+        self.coauthored = []
+
+    def run(self, query, rows=None, **params):
+        if query == COAUTHORED_QUERY:
+            self.coauthored.extend(rows)
+        elif query.startswith("MERGE (a:Author"):
+            self.authors.add(params['author'])
+        return self
+
+    def consume(self):
+        pass
+
+    def execute_write(self, transaction_function, *args):
+        transaction_function(self, *args)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+class RecordingDriver:
+    def __init__(self):
+        self.recorded = RecordingSession()
+
+    def session(self, **config):
+        return self.recorded
+
+    def close(self):
+        pass
+
+def test_coauthored_edges_match_aggregated_papers(bundled_csv, snapshot):
+    driver = RecordingDriver()
+    create_graph(bundled_csv, driver=driver)
+    session = driver.recorded
+
+    # Authors are parsed and named like the KG_v2_neo4j importers
+    store = InMemoryGraphStore()
+    import_csv_to_store(store, bundled_csv, ledger_file=None)
+    nodes, _ = snapshot(store)
+    assert {(name,) for name in session.authors} == nodes['Author']
+
+    # One Paper node per title, with the year of its first row
+    paper_authors, paper_years = {}, {}
+    for authors, title, _, _, year in iter_csv_rows(bundled_csv):
+        paper_authors.setdefault(title, set()).update(authors)
+        paper_years.setdefault(title, year)
+    expected = aggregate_coauthorships((authors, paper_years[title]) for title, authors in paper_authors.items())
+
+    coauthored = {(row['author1'], row['author2']): [row['weight'], row['first_year'], row['last_year']]
+                  for row in session.coauthored}
+    assert len(coauthored) == len(session.coauthored)
+    assert coauthored == expected
+    assert {author for pair in coauthored for author in pair} <= session.authors
+    assert any(weight > 1 and first_year for weight, first_year, _ in coauthored.values())
@@ -0,0 +1,42 @@
+import pandas as pd
+from graph_store import InMemoryGraphStore
+from KG_v2_neo4j import ImportLedger, import_csv_to_store, iter_batches, report_skipped
+
+def test_second_import_with_ledger_sends_nothing(bundled_csv, snapshot):
+    store = InMemoryGraphStore()
+    assert import_csv_to_store(store, bundled_csv, ledger_file='ledger.txt') == 1691
+    graph = snapshot(store)
+    assert import_csv_to_store(store, bundled_csv, ledger_file='ledger.txt') == 0
+    assert snapshot(store) == graph
+    with open('ledger.txt', encoding='utf-8') as f:
+        assert len(f.read().split()) == 1691
+
+def test_incremental_import_matches_full_import(bundled_csv, snapshot):
+    full = InMemoryGraphStore()
+    import_csv_to_store(full, bundled_csv, ledger_file=None)
+
+    df = pd.read_csv(bundled_csv, encoding='ISO-8859-1')
+    df.iloc[:1000].to_csv('part.csv', index=False, encoding='ISO-8859-1')
+    store = InMemoryGraphStore()
+    import_csv_to_store(store, 'part.csv', ledger_file='ledger.txt')
+    # Only the rows after the first 1000 are new
+    assert import_csv_to_store(store, bundled_csv, ledger_file='ledger.txt') == 691
+    assert snapshot(store) == snapshot(full)
+
+def test_repeated_rows_are_not_reported_as_recorded(tmp_path, capsys):
+    row = (['Rao K'], 'Graph Mining', 'J1', 'Article', '2020')
+    other = (['Devi S'], 'Other', 'J1', 'Article', '2021')
+    path = str(tmp_path / 'ledger.txt')
+
+    ledger = ImportLedger(path)
+    assert [rows for rows, _ in iter_batches([row, other, row], batch_size=10, ledger=ledger)] == [2]
+    ledger.commit()
+    assert (ledger.skipped, ledger.duplicates) == (0, 1)
+    report_skipped(ledger)
+    assert capsys.readouterr().out == (f"  Skipped 0 rows already recorded in {path}\n"
+                                       "  Skipped 1 repeated rows of this CSV\n")
+
+    ledger = ImportLedger(path)
+    new = (['Rao K'], 'New', 'J2', 'Article', '2022')
+    assert [rows for rows, _ in iter_batches([row, new, other, new], batch_size=10, ledger=ledger)] == [1]
+    assert (ledger.skipped, ledger.duplicates) == (2, 1)
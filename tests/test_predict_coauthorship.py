@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+from sklearn.preprocessing import normalize
+from predict_coauthorship import (add_topological_scores, build_feature_matrix, build_prediction_state,
+                                  coauthor_adjacency, compute_similarity_table, jaccard_similarity, jaccard_similarity_loop,
+                                  lsh_candidate_scores, state_table, synthetic_author_papers,
+                                  top_k_similarity_table, top_scores_per_author, update_prediction_state)
+
+SCORE_COLUMNS = ['cosine_similarity', 'jaccard_similarity', 'average_score']
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_sparse_jaccard_matches_loop(seed):
+    feature_matrix, _ = build_feature_matrix(synthetic_author_papers(120, seed))
+    assert np.array_equal(jaccard_similarity(feature_matrix), jaccard_similarity_loop(feature_matrix))
+
+def test_sparse_jaccard_matches_loop_with_empty_and_weighted_rows():
+    dense = np.array([[0, 0, 0, 0], [1, 2, 0, 0], [0, 3, 1, 0], [0, 0, 0, 0], [1, 1, 1, 1]])
+    expected = jaccard_similarity_loop(dense)
+    assert np.array_equal(jaccard_similarity(sparse.csr_matrix(dense)), expected)
+    assert expected[0, 3] == 0 and expected[1, 4] == 0.5
+
+def dense_reference(n_authors, seed, exclude):
+    """Inputs of a synthetic graph and its all-pairs table, cut to the pairs scoring above 0"""
+    df = synthetic_author_papers(n_authors, seed)
+    feature_matrix, authors = build_feature_matrix(df)
+    coauthors = coauthor_adjacency(df, authors) if exclude else None
+    table = compute_similarity_table(feature_matrix, authors, coauthors)
+    return feature_matrix, authors, coauthors, table[table['average_score'] > 0]
+
+def pair_scores_by_key(table):
+    return {(a, b): scores for a, b, *scores in table[['author1', 'author2'] + SCORE_COLUMNS].itertuples(index=False)}
+
+@pytest.mark.parametrize('exclude', [False, True])
+@pytest.mark.parametrize('memory_budget_mb', [256, 0.001])
+def test_top_k_without_limit_matches_dense_table(exclude, memory_budget_mb):
+    feature_matrix, authors, coauthors, dense = dense_reference(150, 0, exclude)
+    table = top_k_similarity_table(feature_matrix, authors, coauthors=coauthors,
+                                   memory_budget_mb=memory_budget_mb, workers=1)
+    expected = pair_scores_by_key(dense)
+    actual = pair_scores_by_key(table)
+    assert actual.keys() == expected.keys()
+    assert np.allclose([actual[key] for key in expected], list(expected.values()))
+    assert table['average_score'].is_monotonic_decreasing
+
+@pytest.mark.parametrize('seed', [0, 1])
+@pytest.mark.parametrize('k', [1, 3, 10])
+def test_top_k_matches_best_dense_partners(seed, k):
+    feature_matrix, authors, coauthors, dense = dense_reference(150, seed, True)
+    table = top_k_similarity_table(feature_matrix, authors, k=k, coauthors=coauthors,
+                                   memory_budget_mb=0.001, workers=1)
+    author_index = {author: i for i, author in enumerate(authors)}
+    # Compared by score per rank, so partners tied at the cut may differ
+    expected = top_scores_per_author(dense, len(authors), author_index, k)
+    found = top_scores_per_author(table, len(authors), author_index, k)
+    assert np.array_equal(np.isinf(found), np.isinf(expected))
+    assert np.allclose(found[np.isfinite(found)], expected[np.isfinite(expected)])
+    scores = pair_scores_by_key(dense)
+    assert np.allclose([scores[key] for key in pair_scores_by_key(table)], table[SCORE_COLUMNS].to_numpy())
+
+def test_top_n_keeps_best_dense_pairs():
+    feature_matrix, authors, coauthors, dense = dense_reference(150, 0, True)
+    table = top_k_similarity_table(feature_matrix, authors, top_n=25, coauthors=coauthors,
+                                   memory_budget_mb=0.001, workers=1)
+    assert len(table) == 25
+    expected = np.sort(dense['average_score'].to_numpy())[::-1][:25]
+    assert np.allclose(table['average_score'].to_numpy(), expected)
+
+def test_lsh_chunks_hold_complete_rows_within_budget():
+    feature_matrix, _ = build_feature_matrix(synthetic_author_papers(2000))
+    binary = (feature_matrix != 0).astype(np.int64)
+    normalized = normalize(feature_matrix.astype(np.float64))
+    cardinality = np.asarray(binary.sum(axis=1)).ravel()
+    whole = list(lsh_candidate_scores(normalized, binary, cardinality, memory_budget_mb=1e6))
+    chunks = list(lsh_candidate_scores(normalized, binary, cardinality, memory_budget_mb=0.01))
+    assert len(whole) == 1 and len(chunks) > 10
+
+    def by_pair(parts):
+        rows, columns, *scores = (np.concatenate(values) for values in zip(*parts))
+        order = np.lexsort((columns, rows))
+        return [rows[order], columns[order]] + [values[order] for values in scores]
+
+    assert all(np.array_equal(a, b) for a, b in zip(by_pair(chunks), by_pair(whole)))
+    seen = [set(chunk[0].tolist()) for chunk in chunks]
+    assert all(not a & b for i, a in enumerate(seen) for b in seen[i + 1:])
+
+@pytest.mark.parametrize('k', [None, 5])
+def test_lsh_table_does_not_depend_on_memory_budget(k):
+    df = synthetic_author_papers(2000)
+    feature_matrix, authors = build_feature_matrix(df)
+    coauthors = coauthor_adjacency(df, authors)
+    expected = top_k_similarity_table(feature_matrix, authors, k=k, coauthors=coauthors, candidates='lsh')
+    actual = top_k_similarity_table(feature_matrix, authors, k=k, coauthors=coauthors, candidates='lsh',
+                                    memory_budget_mb=0.01)
+    assert actual.equals(expected)
+
+def changed_papers(df, rng, count):
+    """df with count rows removed and papers of 1-3 authors added (some authors new)"""
+    df = df.drop(index=rng.choice(df.index, count, replace=False))
+    n = len(df['author'].unique())
+    rows = []
+    for i in range(count):
+        journal = f'Journal {rng.integers(0, 20)}'
+        for author in rng.integers(0, n + 10, rng.integers(1, 4)):
+            rows.append({'author': f'Author {author}', 'paper': f'New paper {rng.integers(0, 1 << 30)} {i}',
+                         'journal': journal})
+    return pd.concat([df, pd.DataFrame(rows)], ignore_index=True)
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('k', [1, 3])
+def test_incremental_update_matches_rebuild(seed, k):
+    rng = np.random.default_rng(seed)
+    df = synthetic_author_papers(300, seed)
+    state = build_prediction_state(df, k, workers=1)
+    for count in (1, 5, 40):
+        df = changed_papers(df, rng, count)
+        update_prediction_state(state, df)
+        rebuilt = build_prediction_state(df, k, workers=1)
+        author_index = {author: i for i, author in enumerate(state['authors'])}
+        # Compared by score per rank, so partners tied at the cut may differ
+        found = top_scores_per_author(state_table(state), len(author_index), author_index, k)
+        expected = top_scores_per_author(state_table(rebuilt), len(author_index), author_index, k)
+        assert np.array_equal(np.isinf(found), np.isinf(expected))
+        assert np.allclose(found[np.isfinite(found)], expected[np.isfinite(expected)])
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_topological_scores_match_brute_force(seed):
+    df = synthetic_author_papers(80, seed)
+    # A solo author (degree 0) and a pair that only wrote together (degree 1)
+    df = pd.concat([df, pd.DataFrame({'author': ['Solo', 'Pair 1', 'Pair 2'], 'paper': ['Alone', 'Duo', 'Duo'],
+                                      'journal': ['Journal 0'] * 3})], ignore_index=True)
+    authors = pd.unique(df['author'])
+    coauthors = coauthor_adjacency(df, authors)
+    neighbours = [set(np.flatnonzero(row)) for row in coauthors.toarray()]
+    n = len(authors)
+    pairs = [(i, j) for i in range(n) for j in range(n) if i != j]
+    table = add_topological_scores(pd.DataFrame({'author1': [authors[i] for i, _ in pairs],
+                                                 'author2': [authors[j] for _, j in pairs]}), authors, coauthors)
+
+    common = [neighbours[i] & neighbours[j] for i, j in pairs]
+    assert table['common_neighbours'].tolist() == [len(shared) for shared in common]
+    assert np.allclose(table['adamic_adar'], [sum(1 / np.log(len(neighbours[z])) for z in shared) for shared in common])
+    assert np.allclose(table['resource_allocation'], [sum(1 / len(neighbours[z]) for z in shared) for shared in common])
+    assert table['preferential_attachment'].tolist() == [len(neighbours[i]) * len(neighbours[j]) for i, j in pairs]
+    assert table['common_neighbours'].max() > 1 and (table['common_neighbours'] == 0).any()
@@ -0,0 +1,51 @@
+import asyncio
+from query_stats import QueryStats, AsyncInstrumentedSession
+
+def test_latency_samples_stay_bounded_and_totals_exact():
+    stats = QueryStats(latency_samples=100)
+    for i in range(10_000):
+        stats.record("MATCH (n) WHERE n.id = 1 RETURN n", {}, i / 1000, 1, None)
+    [template] = stats.summary()['statements']
+    assert len(stats.templates["MATCH (n) WHERE n.id = ? RETURN n"]['latencies']) == 100
+    assert template['count'] == 10_000
+    assert template['total_ms'] == round(sum(range(10_000)), 2)
+    assert template['max_ms'] == 9999
+    # A uniform sample of 0..9999 ms has its median near the middle
+    assert 3000 < template['p50_ms'] < 7000
+
+class Result:
+    def __init__(self, records):
+        self.records = iter(records)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.records)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def consume(self):
+        return None
+
+class Session:
+    async def run(self, query, parameters=None, **kwargs):
+        return Result([{'n': 1}, {'n': 2}])
+
+    async def close(self):
+        pass
+
+def test_async_session_run_is_recorded():
+    stats = QueryStats()
+
+    async def run():
+        session = AsyncInstrumentedSession(Session(), stats)
+        first = await session.run("RETURN 1 AS n")
+        assert [record async for record in first] == [{'n': 1}, {'n': 2}]
+        # Left unread: recorded when the next statement runs or the session closes
+        await session.run("RETURN 2 AS n")
+        await session.close()
+
+    asyncio.run(run())
+    assert {t['template']: (t['count'], t['rows']) for t in stats.summary()['statements']} == {'RETURN ? AS n': (2, 4)}